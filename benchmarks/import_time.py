@@ -0,0 +1,86 @@
+"""
+Measures how long `import packing_tape` takes in a fresh interpreter.
+
+Python 2 has no `python -X importtime`, so this installs an equivalent
+hook that times each import (the "self" time excludes nested imports),
+and prints the same kind of table, followed by the best and median wall
+clock times of several fresh imports:
+
+    python benchmarks/import_time.py [module] [--runs N]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys
+import time
+import __builtin__
+
+original_import = __builtin__.__import__
+records = []
+stack = [0.0]
+
+
+def timed_import(name, *args, **kwargs):
+    already_imported = name in sys.modules
+    stack.append(0.0)
+    start = time.time()
+    try:
+        return original_import(name, *args, **kwargs)
+    finally:
+        elapsed = time.time() - start
+        nested = stack.pop()
+        stack[-1] += elapsed
+        if not already_imported and elapsed > nested:
+            records.append((len(stack) - 1, name, elapsed - nested, elapsed))
+
+__builtin__.__import__ = timed_import
+start = time.time()
+import %(module)s
+total = time.time() - start
+__builtin__.__import__ = original_import
+
+print("import time: self [us] | cumulative | imported package")
+for depth, name, self_time, cumulative in records:
+    print("import time: %%9d | %%10d | %%s%%s" %% (
+        self_time * 1e6, cumulative * 1e6, "  " * depth, name))
+print("total: %%f" %% total)
+"""
+
+TIMER = """
+import time
+start = time.time()
+import %(module)s
+print(time.time() - start)
+"""
+
+
+def run(code):
+    return subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT).strip()
+
+
+def main(args):
+    module = "packing_tape"
+    runs = 20
+    if "--runs" in args:
+        runs = int(args[args.index("--runs") + 1])
+        del args[args.index("--runs"):args.index("--runs") + 2]
+    if args:
+        module = args[0]
+
+    print(run(CHILD % {'module': module}))
+
+    times = sorted([
+        float(run(TIMER % {'module': module})) for _ in xrange(runs)
+    ])
+    print("%s over %d fresh imports: best %.2fms, median %.2fms" % (
+        module, runs, times[0] * 1000, times[len(times) // 2] * 1000))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,27 +1,88 @@
 from __future__ import print_function
 
+import re
+from struct import error as struct_error
+
 from field_classes import \
-    BinaryProperty, LogicalProperty, Nameable, ProxyTarget
+    BinaryProperty, LogicalProperty, Nameable, ProxyTarget, FieldProxy, \
+    FusedFields, EmbeddedField, PointerField, ChecksumField, checksum_pieces, \
+    parses_views
+
+from bases import \
+    StorageTarget, Walk, FieldChange, format_path, parse_path
+
+from streaming import parse_stream, iter_stream, Parser
 
-from bases import StorageTarget
+# The hex dump machinery (utils, xxd and colorama) and hashlib are only
+# imported when first needed, to keep `import packing_tape` cheap for
+# processes that only parse (see benchmarks/import_time.py).
 
-from utils import as_xxd
-from xxd import generate_colors_and_header
+
+class StructType(type):
+    """
+    The metaclass of Struct, which finalizes each struct class as soon as
+    it's created (see Struct.finalize).
+    """
+    def __init__(cls, name, bases, attrs):
+        super(StructType, cls).__init__(name, bases, attrs)
+        cls.finalize()
 
 
 class Struct(object, StorageTarget):
+    """
+    The base class of all structs.
+
+    Thread safety: everything that a struct class needs to parse and
+    serialize is computed when the class is created, and never changes
+    afterwards; anything else that's computed later (like signatures and
+    projections) is computed in full before it's published, so threads
+    that race to compute it just compute the same thing. parse_from,
+    parse_into, serialize and the other read-only methods can therefore be
+    called from any number of threads at once, as long as no instance is
+    changed (or parsed into) by one thread while another is using it.
+    """
+    __metaclass__ = StructType
+
+    @classmethod
+    def finalize(cls):
+        """
+        Names this struct's fields and computes the metadata needed to parse
+        and serialize it, so that none of it is written while parsing.
+
+        This metadata isn't saved for other processes to load. It takes a
+        fraction of a millisecond per struct to compute, and checking saved
+        metadata against a struct would start with the same scan of its
+        properties that computing it does. (Structs are pickled by their
+        values, so worker processes only need to import the struct's
+        module; see Struct.__reduce__.)
+        """
+        setattr(cls, '__cached', {})
+        cls.propagate_names()
+        cls.binary_properties()
+        cls.logical_properties()
+        cls.all_properties()
+        cls.parse_plan()
+        cls.min_size()
+        cls.static_size()
+        cls.pointer_properties()
+        cls.embeds_pointers()
+        cls.contains_views()
+        cls.checksum_plan()
 
     @classmethod
     def memoize(cls, func):
-        cache = getattr(cls, '__cached', {})
-        key = func.__name__
-        if key not in cache:
-            value = func()
-            cache[key] = value
+        # Each class has its own cache, never one inherited from a superclass.
+        cache = vars(cls).get('__cached')
+        if cache is None:
+            cache = {}
             setattr(cls, '__cached', cache)
-        else:
-            value = cache[key]
-        return value
+        key = func.__name__
+        try:
+            return cache[key]
+        except KeyError:
+            # Publish the value only once it's complete, and if another
+            # thread got there first, use its value instead.
+            return cache.setdefault(key, func())
 
     @classmethod
     def binary_properties(cls):
@@ -29,11 +90,11 @@ class Struct(object, StorageTarget):
 
     @classmethod
     def compute_binary_properties(cls):
-        return sorted([
+        return tuple(sorted([
             (p, getattr(cls, p))
             for p in dir(cls)
             if isinstance(getattr(cls, p), BinaryProperty)
-        ], key=lambda x: x[1].sort_order)
+        ], key=lambda x: x[1].sort_order))
 
     @classmethod
     def logical_properties(cls):
@@ -41,11 +102,11 @@ class Struct(object, StorageTarget):
 
     @classmethod
     def compute_logical_properties(cls):
-        return sorted([
+        return tuple(sorted([
             (p, getattr(cls, p))
             for p in dir(cls)
             if isinstance(getattr(cls, p), LogicalProperty)
-        ], key=lambda x: x[1].sort_order)
+        ], key=lambda x: x[1].sort_order))
 
     @classmethod
     def all_properties(cls):
@@ -53,12 +114,12 @@ class Struct(object, StorageTarget):
 
     @classmethod
     def compute_all_properties(cls):
-        return sorted([
+        return tuple(sorted([
             (p, getattr(cls, p))
             for p in dir(cls)
             if isinstance(getattr(cls, p), LogicalProperty) or
             isinstance(getattr(cls, p), BinaryProperty)
-        ], key=lambda x: x[1].sort_order)
+        ], key=lambda x: x[1].sort_order))
 
     @classmethod
     def propagate_names(cls):
@@ -83,54 +144,798 @@ class Struct(object, StorageTarget):
     def compute_min_size(cls):
         return sum([p.min_size for _, p in cls.binary_properties()])
 
+    @classmethod
+    def static_size(cls):
+        """
+        The number of bytes that every instance of this struct occupies,
+        or None if that depends on the values stored in the instance.
+        """
+        return cls.memoize(cls.compute_static_size)
+
+    @classmethod
+    def compute_static_size(cls):
+        sizes = [p.static_size for _, p in cls.binary_properties()]
+        if None in sizes:
+            return None
+        return sum(sizes)
+
+    @classmethod
+    def static_layout(cls):
+        """
+        Returns a tuple of (name, offset, property) triples, one for each
+        binary property, giving where it lies in every instance of this
+        struct; or None if this struct has no static size.
+        """
+        return cls.memoize(cls.compute_static_layout)
+
+    @classmethod
+    def compute_static_layout(cls):
+        if cls.static_size() is None:
+            return None
+        layout = []
+        offset = 0
+        for name, property in cls.binary_properties():
+            layout.append((name, offset, property))
+            offset += property.static_size
+        return tuple(layout)
+
+    @classmethod
+    def schema(cls):
+        """
+        Returns a tuple of (name, description) pairs, one for each binary
+        property, made up only of plain values. This only changes when the
+        way that this struct is parsed changes (see packing_tape.cache).
+        """
+        return cls.memoize(cls.compute_schema)
+
+    @classmethod
+    def compute_schema(cls):
+        return tuple([
+            (name, property.describe())
+            for name, property in cls.binary_properties()
+        ])
+
+    @classmethod
+    def schema_fingerprint(cls):
+        """
+        A hex digest of this struct's schema, which is the same in every
+        process (unlike anything derived from ids) until the struct changes.
+        """
+        return cls.memoize(cls.compute_schema_fingerprint)
+
+    @classmethod
+    def compute_schema_fingerprint(cls):
+        return fingerprint(cls.schema())
+
+    @classmethod
+    def nested_struct_types(cls):
+        """
+        Returns every struct type that this one embeds (directly or not),
+        with each struct type listed after the ones that it embeds.
+        """
+        results = []
+        for _, property in cls.binary_properties():
+            for struct_type in property.nested_struct_types():
+                for nested in struct_type.nested_struct_types() + [
+                        struct_type]:
+                    if nested not in results:
+                        results.append(nested)
+        return results
+
+    @classmethod
+    def pointer_properties(cls):
+        return cls.memoize(cls.compute_pointer_properties)
+
+    @classmethod
+    def compute_pointer_properties(cls):
+        return tuple([
+            (name, property)
+            for name, property in cls.logical_properties()
+            if isinstance(property, PointerField)
+        ])
+
+    @classmethod
+    def contains_pointers(cls):
+        """
+        Whether this struct, or any struct that it embeds, has pointer fields.
+        """
+        return bool(cls.pointer_properties()) or cls.embeds_pointers()
+
+    @classmethod
+    def embeds_pointers(cls):
+        return cls.memoize(cls.compute_embeds_pointers)
+
+    @classmethod
+    def compute_embeds_pointers(cls):
+        return any([
+            struct_type.pointer_properties()
+            for struct_type in cls.nested_struct_types()
+        ])
+
+    @classmethod
+    def contains_views(cls):
+        """
+        Whether this struct, or any struct that it embeds, has fields that are
+        parsed as views of the data they were parsed from.
+        """
+        return cls.memoize(cls.compute_contains_views)
+
+    @classmethod
+    def compute_contains_views(cls):
+        return any([
+            parses_views(property)
+            for struct_type in cls.nested_struct_types() + [cls]
+            for _, property in struct_type.binary_properties()
+        ])
+
+    @classmethod
+    def checksum_plan(cls):
+        return cls.memoize(cls.compute_checksum_plan)
+
+    @classmethod
+    def compute_checksum_plan(cls):
+        """
+        Returns a (checksum property index, first index, last index) tuple
+        for each checksum field, in the order that they must be computed
+        (so that every checksum comes after the checksums that it covers).
+        """
+        cls.propagate_names()
+        binary_properties = cls.binary_properties()
+        ranges = {}
+        for index, (name, property) in enumerate(binary_properties):
+            if isinstance(property, ChecksumField):
+                first, last = property.covered_range(binary_properties)
+                if first <= index <= last:
+                    raise ValueError(
+                        'Checksum "%s" cannot cover itself.' % name)
+                ranges[index] = (first, last)
+
+        plan = []
+        planned = set()
+        visiting = set()
+
+        def add(index):
+            if index in planned:
+                return
+            if index in visiting:
+                raise ValueError(
+                    'Checksum "%s" covers a checksum that covers it.' %
+                    binary_properties[index][0])
+            visiting.add(index)
+            first, last = ranges[index]
+            for covered in sorted(ranges):
+                if first <= covered <= last:
+                    add(covered)
+            visiting.remove(index)
+            planned.add(index)
+            plan.append((index, first, last))
+
+        for index in sorted(ranges):
+            add(index)
+        return tuple(plan)
+
+    def verify_checksums(self, data, offset=0, raise_exception=True):
+        """
+        Checks this struct's checksum fields against data, which this
+        struct was parsed from (starting at offset). The result is kept,
+        so that validating this struct later (like when it's embedded in
+        another struct) fails if a checksum didn't match.
+
+        This runs once parsing is done, over the data that was parsed
+        (without parsing it again, but reading the bytes a second time).
+        """
+        plan = self.checksum_plan()
+        properties = self.binary_properties()
+        offsets = [offset]
+        for _, property in properties:
+            offsets.append(offsets[-1] + property.get_size(self))
+        valid = True
+        for index, first, last in plan:
+            property = properties[index][1]
+            if not property.verify:
+                continue
+            expected = property.compute(
+                checksum_pieces(data, offsets[first], offsets[last + 1]))
+            matches = property.get(self) == expected
+            property.record_match(self, matches)
+            if not matches and raise_exception:
+                raise ValueError(
+                    'Checksum "%s" of %s does not match its data '
+                    '(stored %08x, computed %08x).' % (
+                        property.field_name, self.__class__.__name__,
+                        property.get(self), expected))
+            valid = valid and matches
+        return valid
+
+    def bind_source(self, data, offset=0):
+        """
+        Records that this struct (and every struct embedded in it) was parsed
+        from data, starting at offset, which is where their pointers will be
+        dereferenced from. Anything that they already dereferenced is dropped.
+        parse_from and parse_into call this for structs that have pointers.
+        """
+        if not isinstance(data, memoryview):
+            data = memoryview(data)
+        self.set_source(data, offset)
+        if not self.embeds_pointers():
+            return
+        for span in self.iter_spans():
+            value = span.value
+            if isinstance(value, Struct) and value.pointer_properties():
+                value.set_source(data, offset + span.start)
+
+    def set_source(self, data, offset):
+        self._source = (data, offset)
+        for _, pointer in self.pointer_properties():
+            pointer.forget(self)
+
+    @classmethod
+    def signature(cls):
+        """
+        Returns a list of (offset, values) pairs, each of which means that
+        the bytes at that offset must be one of the strings in values for
+        this struct to parse. This is derived from the validators (see
+        packing_tape.validators) of fields that always appear at the same
+        offset; override this method to provide a signature by hand.
+        """
+        return cls.memoize(cls.compute_signature)
+
+    @classmethod
+    def compute_signature(cls):
+        signature = []
+        offset = 0
+        for _, property in cls.binary_properties():
+            signature.extend(property.signature(offset))
+            if property.static_size is None:
+                break
+            offset += property.static_size
+        return [(o, values) for o, values in signature if values]
+
+    @classmethod
+    def scan(cls, data, start=0, end=None):
+        """
+        Finds instances of this struct within a larger string, yielding an
+        (offset, instance) pair for each valid, non-overlapping instance.
+
+        If this struct has a signature, only offsets that match it are
+        parsed, and the string is searched for them with str.find or a
+        regular expression; otherwise, every offset is tried in turn.
+        """
+        if end is None:
+            end = len(data)
+        view = memoryview(data)
+        min_size = cls.min_size()
+        static_size = cls.static_size()
+        signature = cls.signature()
+
+        if signature:
+            # Search for the most specific part of the signature,
+            # and then check the rest of it at each candidate offset.
+            anchor_offset, anchor_values = min(
+                signature,
+                key=lambda anchor: (
+                    -min([len(v) for v in anchor[1]]), len(anchor[1])))
+            others = [
+                (o, values, len(iter(values).next()))
+                for o, values in signature
+                if o != anchor_offset
+            ]
+            candidates = cls.find_candidates(
+                data,
+                start + anchor_offset,
+                end,
+                anchor_values)
+        else:
+            others = []
+            candidates = xrange(start, end)
+
+        position = start
+        for candidate in candidates:
+            offset = candidate - (anchor_offset if signature else 0)
+            if offset < position:
+                continue
+            if offset + min_size > end:
+                if signature:
+                    continue
+                break
+            if any(
+                data[offset + o:offset + o + size] not in values
+                for o, values, size in others
+            ):
+                continue
+            # Parse from a view, so that we don't copy the rest
+            # of the string for every candidate we look at.
+            window = view[offset:end]
+            if static_size is not None:
+                window = window[:static_size]
+            try:
+                instance = cls.parse_from(window, raise_exception=False)
+            except (ValueError, struct_error):
+                instance = None
+            if instance is not None:
+                yield offset, instance
+                position = offset + max(len(instance), 1)
+
+    @staticmethod
+    def find_candidates(data, start, end, values):
+        """
+        Yields each offset in data (between start and end) at which
+        one of the strings in values begins.
+        """
+        if len(values) == 1:
+            value = iter(values).next()
+            offset = data.find(value, start, end)
+            while offset != -1:
+                yield offset
+                offset = data.find(value, offset + 1, end)
+        else:
+            pattern = re.compile(
+                '(?=%s)' % '|'.join([re.escape(v) for v in values]),
+                re.DOTALL)
+            for match in pattern.finditer(data, start, end):
+                yield match.start()
+
+    @classmethod
+    def parse_plan(cls):
+        return cls.memoize(cls.compute_parse_plan)
+
+    @classmethod
+    def compute_parse_plan(cls):
+        """
+        Returns a list of (FusedFields or None, [(name, property), ...])
+        pairs, covering every binary property in order. Runs of adjacent
+        properties that can be parsed by the struct module (and that share
+        a byte order) are fused, so that they can be parsed all at once.
+        """
+        plan = []
+        run = []
+        run_order = None
+        for property_name, property in cls.binary_properties():
+            fused_format = property.fused_format
+            if fused_format is not None:
+                order = fused_format[0]
+                if order is None or run_order is None or order == run_order:
+                    run.append((property_name, property))
+                    run_order = run_order or order
+                    continue
+            if run:
+                plan.append((FusedFields(run) if len(run) > 1 else None, run))
+            if fused_format is not None:
+                run = [(property_name, property)]
+                run_order = fused_format[0]
+            else:
+                plan.append((None, [(property_name, property)]))
+                run = []
+                run_order = None
+        if run:
+            plan.append((FusedFields(run) if len(run) > 1 else None, run))
+        return tuple(plan)
+
     @classmethod
     def parse_from(
         cls,
         input_bytes,
         allow_invalid=False,
-        raise_exception=True
+        raise_exception=True,
+        fields=None
     ):
+        """
+        Parses an instance from the start of input_bytes. If a list of field
+        paths (like "object_header.name") is passed as fields, only those
+        fields are parsed (see parse_projected).
+        """
+        if fields is not None:
+            return cls.parse_projection(
+                input_bytes, fields, allow_invalid, raise_exception)
+
         cls.propagate_names()
 
         kwargs = {}
         offset = 0
-        for property_name, property in cls.binary_properties():
-            data = input_bytes[offset:]
+        available = len(input_bytes)
+        for fused, properties in cls.parse_plan():
+            if fused is not None and available - offset >= fused.size:
+                fused.unpack_into(kwargs, input_bytes, offset)
+                offset += fused.size
+                continue
+
+            for property_name, property in properties:
+                data = input_bytes[offset:]
+                min_size = property.min_size
+                if len(data) < min_size:
+                    if allow_invalid:
+                        # TODO: Should we store the fact that
+                        # the buffer was too small?
+                        return cls.construct_parsed(
+                            kwargs, allow_invalid, raise_exception,
+                            input_bytes)
+                    else:
+                        if raise_exception:
+                            raise cls.not_enough_data(
+                                offset + min_size, offset + len(data))
+                        return None
+                val, size = property.parse_and_get_size(data)
+                offset += size
+                if isinstance(property, LogicalProperty) \
+                        or isinstance(property, ProxyTarget):
+                    kwargs[property_name] = val
+
+        return cls.construct_parsed(
+            kwargs, allow_invalid, raise_exception, input_bytes)
+
+    def parse_into(
+        self,
+        input_bytes,
+        offset=0,
+        allow_invalid=False,
+        raise_exception=True
+    ):
+        """
+        Like parse_from, but parses input_bytes (starting at offset) into
+        this existing instance, overwriting its values in place. Embedded
+        structs and array elements are parsed into the instances and storage
+        that they already have, so parsing many similar structs in a loop
+        allocates far fewer objects. Returns the number of bytes parsed (or
+        None if the result is invalid and exceptions are disabled).
+        """
+        self.propagate_names()
+        view = input_bytes if isinstance(input_bytes, memoryview) \
+            else memoryview(input_bytes)
+        try:
+            storage = self._struct_values
+        except AttributeError:
+            storage = self._struct_values = {}
+
+        start = offset
+        available = len(view)
+        parsed = 0
+        for fused, properties in self.parse_plan():
+            if fused is not None and available - offset >= fused.size:
+                fused.store_into(storage, view, offset)
+                offset += fused.size
+                parsed += len(properties)
+                continue
+
+            for property_name, property in properties:
+                min_size = property.min_size
+                if available - offset < min_size:
+                    if allow_invalid:
+                        # Don't leave values from the last parse behind.
+                        for _, rest in self.binary_properties()[parsed:]:
+                            rest.initialize_with_default(self)
+                        return offset - start
+                    if raise_exception:
+                        raise self.not_enough_data(
+                            offset + min_size, available)
+                    return None
+                offset += property.parse_into(self, view, offset)
+                parsed += 1
+
+        if self.checksum_plan():
+            if not self.verify_checksums(
+                    input_bytes, start, raise_exception and not allow_invalid) \
+                    and not allow_invalid:
+                return None
+        if not allow_invalid and not self.validate(raise_exception):
+            return None
+        if self.contains_pointers():
+            self.bind_source(view, start)
+        return offset - start
+
+    @classmethod
+    def parse_projection(
+        cls,
+        input_bytes,
+        fields,
+        allow_invalid=False,
+        raise_exception=True
+    ):
+        """
+        Parses only the given fields (paths like "object_header.name") from
+        input_bytes, leaving every other field of the result set to None.
+        Fields with static sizes are skipped without being decoded, and
+        parsing stops as soon as the last of the fields has been parsed.
+        Only the validators of the parsed fields are run.
+        """
+        cls.propagate_names()
+        projection = cls.compile_projection(fields)
+        view = input_bytes if isinstance(input_bytes, memoryview) \
+            else memoryview(input_bytes)
+        instance = cls.allocate()
+        try:
+            instance.parse_projected(view, 0, projection, False, allow_invalid)
+        except (ValueError, struct_error):
+            if raise_exception:
+                raise
+            return None
+        if not allow_invalid:
+            if not instance.validate_projection(projection, raise_exception):
+                return None
+        return instance
+
+    @classmethod
+    def compile_projection(cls, fields):
+        """
+        Turns a list of field paths into a projection: a dict mapping the
+        names of binary properties to either None (meaning "parse all of it")
+        or the projection of the struct that the property embeds.
+        """
+        # Paths can be strings (of either type) or sequences of names and
+        # indexes; they're all cached as tuples of byte string names.
+        key = tuple([
+            tuple([
+                str(part) if isinstance(part, basestring) else part
+                for part in (
+                    parse_path(field) if isinstance(field, basestring)
+                    else field)
+            ])
+            for field in fields
+        ])
+        projections = cls.memoize(cls.compute_projections)
+        if key in projections:
+            return projections[key]
+
+        cls.propagate_names()
+        projection = {}
+        for path in key:
+            if not path:
+                raise ValueError("Empty field path.")
+            cls.add_to_projection(projection, path, path)
+        if not projection:
+            raise ValueError(
+                "No fields given to parse from %s (pass fields=None to parse "
+                "all of them)." % cls.__name__)
+        return projections.setdefault(key, projection)
+
+    @classmethod
+    def compute_projections(cls):
+        # Projections compiled so far, keyed by their tuple of field paths.
+        return {}
+
+    @classmethod
+    def add_to_projection(cls, projection, path, full_path):
+        name, rest = path[0], path[1:]
+        property = getattr(cls, name, None) if isinstance(name, str) else None
+        if isinstance(property, FieldProxy):
+            # Bits can only be parsed by parsing the whole bitfield.
+            property = property.parent
+            name = property.field_name
+            rest = ()
+        if not isinstance(property, BinaryProperty):
+            raise ValueError(
+                "%s has no field %s." % (cls.__name__, format_path(full_path)))
+        if not rest or (name in projection and projection[name] is None):
+            projection[name] = None
+            return
+        if not isinstance(property, EmbeddedField):
+            # Where arrays end and which alternative a one_of field holds
+            # depend on validating everything in them.
+            raise ValueError(
+                "Field %s can only be parsed as a whole (while projecting %s)."
+                % (name, format_path(full_path)))
+        subprojection = projection.setdefault(name, {})
+        property.struct_type.add_to_projection(subprojection, rest, full_path)
+
+    @classmethod
+    def allocate(cls):
+        """
+        Creates an instance without setting (or validating) any of its
+        fields, which will all be None until set.
+        """
+        cls.propagate_names()
+        instance = cls.__new__(cls)
+        instance._struct_values = {}
+        return instance
+
+    @classmethod
+    def measure(cls, view, offset):
+        """
+        Returns the size of the instance at offset in view,
+        decoding as few of its fields as possible.
+        """
+        static_size = cls.static_size()
+        if static_size is not None:
+            return static_size
+        start = offset
+        for _, property in cls.binary_properties():
+            offset += property.skip(view, offset)
+        return offset - start
+
+    def parse_projected(
+        self,
+        view,
+        offset,
+        projection,
+        need_size,
+        allow_invalid
+    ):
+        """
+        Parses the fields in projection (see compile_projection) into this
+        instance, skipping the others. Returns the size of the instance if
+        need_size is set; otherwise, it stops after the last field in the
+        projection and returns None. Also returns None if the data ran out
+        and allow_invalid is set.
+        """
+        properties = self.binary_properties()
+        last = max([
+            i for i, (name, _) in enumerate(properties) if name in projection
+        ])
+        static_size = self.static_size()
+        start = offset
+        available = len(view)
+        for i, (name, property) in enumerate(properties):
+            if i > last and static_size is not None:
+                return static_size
+            if name not in projection:
+                offset += property.skip(view, offset)
+                continue
+
             min_size = property.min_size
-            if len(data) < min_size:
+            if available - offset < min_size:
                 if allow_invalid:
-                    # TODO: Should we store the fact that
-                    # the buffer was too small?
-                    break
-                else:
-                    if raise_exception:
-                        raise ValueError(
-                            (
-                                "Not enough buffer left to decode %s "
-                                "(needed at least %d bytes, had %d)"
-                            ) % (
-                                cls.__name__,
-                                offset + min_size,
-                                offset + len(data)
-                            )
-                        )
                     return None
-            val, size = property.parse_and_get_size(data)
+                raise self.not_enough_data(offset + min_size, available)
+            subprojection = projection[name]
+            if subprojection is None:
+                size = property.parse_into(self, view, offset)
+            else:
+                size = property.parse_projected(
+                    self, view, offset, subprojection,
+                    need_size or i < last, allow_invalid)
+            if i == last and not need_size:
+                return None
+            if size is None:
+                return None
             offset += size
-            if isinstance(property, LogicalProperty) \
-                    or isinstance(property, ProxyTarget):
-                kwargs[property_name] = val
+        return offset - start
+
+    def validate_projection(self, projection, raise_exception=True):
+        """
+        Like validate, but only validates the fields in projection.
+        """
+        for name, property in self.logical_properties():
+            if isinstance(property, FieldProxy):
+                name = property.parent.field_name
+            if name not in projection:
+                continue
+            subprojection = projection[name]
+            if subprojection is None:
+                if not property.validate(self, raise_exception):
+                    return False
+            elif not property.get(self).validate_projection(
+                    subprojection, raise_exception):
+                return False
+        return True
+
+    @classmethod
+    def not_enough_data(cls, needed, had):
+        return ValueError(
+            (
+                "Not enough buffer left to decode %s "
+                "(needed at least %d bytes, had %d)"
+            ) % (cls.__name__, needed, had))
 
+    @classmethod
+    def construct_parsed(
+        cls,
+        kwargs,
+        allow_invalid,
+        raise_exception,
+        source=None
+    ):
+        """
+        Creates an instance from the values parsed for each of its fields,
+        returning None if the result is invalid and exceptions are disabled.
+        If the instance has pointers, they're bound to the source data.
+        """
         kwargs['allow_invalid'] = allow_invalid
         kwargs['raise_exception'] = raise_exception
         instance = cls(**kwargs)
-        if not allow_invalid:
+        # __init__ has already validated (and raised) if exceptions are on.
+        if not allow_invalid and not raise_exception:
             if not instance.validate(raise_exception):
                 return None
 
+        if source is not None and cls.checksum_plan():
+            if not instance.verify_checksums(
+                    source, 0, raise_exception and not allow_invalid) \
+                    and not allow_invalid:
+                return None
+        if source is not None and cls.contains_pointers():
+            instance.bind_source(source)
         return instance
 
+    @classmethod
+    def parse_steps(
+        cls,
+        buffer,
+        offset,
+        result,
+        allow_invalid=False,
+        raise_exception=True
+    ):
+        """
+        An incremental version of parse_from, for use with data that
+        arrives a piece at a time (see packing_tape.streaming). Yields the
+        offset that buffer must be filled up to before parsing can continue
+        (or None, for "everything"), then appends (instance, size) to result.
+        """
+        static_size = cls.static_size()
+        if static_size is not None:
+            yield offset + static_size
+            if buffer.end >= offset + static_size:
+                data = buffer.view(offset, static_size)
+                if cls.contains_views():
+                    # Views of the buffer would stop it from shrinking.
+                    data = data.tobytes()
+                instance = cls.parse_from(
+                    data, allow_invalid, raise_exception)
+                if instance is not None and cls.contains_pointers():
+                    # Streamed data is discarded as soon as it's parsed,
+                    # so there's nothing for pointers to point into (and
+                    # holding a view of the buffer would stop it shrinking).
+                    instance.bind_source('')
+                result.append((instance, static_size))
+                return
+
+        cls.propagate_names()
+        kwargs = {}
+        size = 0
+        for property_name, property in cls.binary_properties():
+            min_size = property.min_size
+            yield offset + size + min_size
+            if buffer.end < offset + size + min_size:
+                if allow_invalid:
+                    break
+                if raise_exception:
+                    raise cls.not_enough_data(
+                        size + min_size, buffer.end - offset)
+                result.append((None, size))
+                return
+            parsed = []
+            for need in property.parse_steps(buffer, offset + size, parsed):
+                yield need
+            val, property_size = parsed[0]
+            size += property_size
+            if isinstance(property, LogicalProperty) \
+                    or isinstance(property, ProxyTarget):
+                kwargs[property_name] = val
+
+        instance = cls.construct_parsed(kwargs, allow_invalid, raise_exception)
+        if instance is not None and cls.checksum_plan():
+            # Check against the buffer's own bytes (rather than a view of
+            # them, which zlib can't read and which would stop the buffer
+            # shrinking while it's held).
+            if not instance.verify_checksums(
+                    buffer.data, offset - buffer.base,
+                    raise_exception and not allow_invalid) \
+                    and not allow_invalid:
+                instance = None
+        if instance is not None and cls.contains_pointers():
+            instance.bind_source('')
+        result.append((instance, size))
+
+    @classmethod
+    def parse_stream(cls, stream, allow_invalid=False, raise_exception=True):
+        """
+        Parses one instance from a file-like object (or socket), reading
+        only as many bytes as are needed and leaving the rest unread.
+        """
+        return parse_stream(cls, stream, allow_invalid, raise_exception)
+
+    @classmethod
+    def iter_stream(cls, stream):
+        """
+        Parses this struct from a file-like object (or socket), yielding
+        the elements of its first array field as soon as each one has been
+        read, without keeping the elements (or their bytes) around.
+        """
+        return iter_stream(cls, stream)
+
     def __len__(self):
+        static_size = self.static_size()
+        if static_size is not None:
+            return static_size
         return sum([
             property.get_size(self)
             for (_, property) in self.binary_properties()
@@ -178,12 +983,174 @@ class Struct(object, StorageTarget):
                 and kwargs.get('raise_exception', True):
             self.validate(raise_exception=True)
 
+    def export_columns(self, array_field, sink, format='npy', chunk_size=None):
+        """
+        Writes the elements of the array field named array_field to the
+        file-like object sink as columns, in .npy, Arrow IPC ('arrow', which
+        needs pyarrow) or CSV format. Each leaf field of the elements is a
+        column, including those of embedded structs (like
+        "object_header.name"). Elements are written chunk_size at a time,
+        and elements with a fixed layout are written as they're serialized,
+        without unpacking their values. Returns the number of rows written.
+        """
+        from columns import export
+
+        property = dict(self.binary_properties()).get(array_field)
+        if not hasattr(property, 'element_steps'):
+            raise ValueError(
+                "%s has no array field %s." % (
+                    self.__class__.__name__, array_field))
+        return export(self, property, sink, format, chunk_size)
+
+    def dump_values(self):
+        """
+        Returns a tuple of the values of this struct's binary properties
+        as plain Python values (suitable for marshal), which load_values
+        can turn back into an equivalent struct.
+        """
+        return tuple([
+            property.dump_value(self)
+            for _, property in self.binary_properties()
+        ])
+
+    @classmethod
+    def load_values(cls, values):
+        """
+        Creates an instance from the result of dump_values, without parsing,
+        validating, or trying the alternatives of any one_of fields.
+        """
+        instance = cls.allocate()
+        for (_, property), value in zip(cls.binary_properties(), values):
+            property.load_value(instance, value)
+        return instance
+
+    def __reduce__(self):
+        # _struct_values is keyed by the ids of this struct's properties,
+        # which differ from process to process, so pickle the values alone.
+        return restore_struct, (self.__class__, self.dump_values())
+
     def serialize(self):
+        if self.checksum_plan():
+            return self.serialize_with_checksums()
         return "".join([
             property.serialize(self)
             for (_, property) in self.binary_properties()
         ])
 
+    def serialize_with_checksums(self):
+        """
+        Serializes this struct, computing each checksum field from the
+        serialized pieces of the fields it covers, and storing it.
+        """
+        properties = self.binary_properties()
+        plan = self.checksum_plan()
+        checksums = set([index for index, _, _ in plan])
+        pieces = [
+            None if index in checksums else property.serialize(self)
+            for index, (_, property) in enumerate(properties)
+        ]
+        for index, first, last in plan:
+            property = properties[index][1]
+            property.set(self, property.compute(pieces[first:last + 1]))
+            pieces[index] = property.serialize(self)
+        return "".join(pieces)
+
+    def iter_serialized(self, start=0, end=None):
+        """
+        Yields (offset, bytes) pairs covering the part of this struct that
+        overlaps the byte range [start, end), skipping over (rather than
+        serializing) any fields that lie outside of that range.
+        """
+        for span in self.iter_spans(start, end, serialize=True):
+            if span.data:
+                yield max(span.start, start), span.data
+
+    def iter_spans(self, start=0, end=None, serialize=False):
+        """
+        Yields a Span (path, start, end, field, value, depth, data) for
+        every field in this struct that overlaps the byte range [start, end),
+        in the order that the fields appear in the serialized output. Fields
+        that contain other fields are yielded before their contents.
+        """
+        return self.walk_spans(Walk(start, end, serialize), 0, (), 1)
+
+    def walk_spans(self, walk, offset, path, depth):
+        for property_name, property in self.binary_properties():
+            if walk.end is not None and offset >= walk.end:
+                break
+            size = property.get_size(self)
+            if walk.overlaps(offset, offset + size):
+                for span in property.iter_spans(
+                        self, path + (property_name,), offset, depth, walk):
+                    yield span
+            offset += size
+
+    def field_spans(self):
+        """
+        Returns a list of FieldSpans (path, start, end, field_type), one for
+        every field in this struct, including fields within embedded structs
+        and arrays. Paths look like "objects[17].object_header.name".
+        """
+        return [span.compact() for span in self.iter_spans()]
+
+    def locate(self, path):
+        """
+        Returns the Span of the field at the given path (either a string like
+        "objects[17].object_header.name" or a tuple of names and indices),
+        computing its offset from the sizes of the fields that precede it.
+        """
+        if isinstance(path, str):
+            path = parse_path(path)
+        return self.locate_within((), tuple(path), 0, 1)
+
+    @staticmethod
+    def diff(a, b):
+        """
+        Yields a FieldChange (path, offset_a, offset_b, old, new) for every
+        leaf field whose value differs between the structs a and b, walking
+        into embedded structs, array elements and switch alternatives.
+        """
+        return a.diff_fields(b, (), 0, 0)
+
+    def diff_fields(self, other, path, offset_a, offset_b):
+        if self is other:
+            return
+        if self.__class__ is not other.__class__:
+            yield FieldChange(path, offset_a, offset_b, self, other)
+            return
+        # Values are stored by field, so if the two value dicts are equal
+        # (i.e.: they hold the same primitives and the same nested objects),
+        # nothing within these two structs can differ.
+        if getattr(self, '_struct_values', None) == \
+                getattr(other, '_struct_values', None):
+            return
+        for property_name, property in self.binary_properties():
+            for change in property.iter_changes(
+                    self, other, path + (property_name,), offset_a, offset_b):
+                yield change
+            offset_a += property.get_size(self)
+            offset_b += property.get_size(other)
+
+    def locate_within(self, path, rest, offset, depth):
+        name = rest[0]
+        field = dict(self.all_properties()).get(name)
+        if isinstance(field, FieldProxy):
+            # Bits live inside of their parent bitfield's byte(s).
+            parent = field.parent
+            span = self.locate_within(
+                path, (parent.field_name,) + rest[1:], offset, depth)
+            return span._replace(
+                path=path + (name,), field=field, value=field.get(self))
+        for property_name, property in self.binary_properties():
+            if property_name == name:
+                return property.locate(
+                    self, path + (name,), rest[1:], offset, depth)
+            offset += property.get_size(self)
+        raise ValueError(
+            "%s has no field %s." % (
+                format_path(path) or self.__class__.__name__,
+                format_path(rest[:1])))
+
     @property
     def is_valid(self):
         return self.validate(False)
@@ -194,7 +1161,57 @@ class Struct(object, StorageTarget):
                 return False
         return True
 
-    def as_hex(self, colorize=False, show_legend=True):
-        color_array, header = generate_colors_and_header(self, colorize, show_legend)
-        data = as_xxd(self.serialize(), colors=color_array)
-        return header + data
+    def as_hex(
+        self,
+        colorize=False,
+        show_legend=True,
+        start=0,
+        end=None,
+        stream=None
+    ):
+        """
+        Returns an xxd-style hex dump of this struct, optionally limited to
+        the byte range [start, end). If a stream is passed, each line is
+        written to it as soon as it is rendered and nothing is returned.
+        """
+        lines = self.iter_hex(colorize, show_legend, start, end)
+        if stream is None:
+            return "\n".join(lines)
+        for line in lines:
+            stream.write(line + "\n")
+
+    def iter_hex(self, colorize=False, show_legend=True, start=0, end=None):
+        """
+        Yields the lines of this struct's hex dump (legend first) one by one.
+        Only fields overlapping the byte range [start, end) are serialized.
+        """
+        from utils import iter_xxd, iter_colored_xxd
+        from xxd import LegendGenerator
+
+        legend = LegendGenerator(self, colorize, show_legend, start, end)
+        for line in legend.header_lines:
+            yield line
+
+        if legend.pieces:
+            lines = iter_colored_xxd(legend.pieces, start=start)
+        else:
+            lines = iter_xxd(
+                (chunk for _, chunk in self.iter_serialized(start, end)),
+                start=start)
+        for line in lines:
+            yield line
+
+
+def fingerprint(value):
+    """
+    Returns a hex digest of repr(value).
+    """
+    from hashlib import sha1
+    return sha1(repr(value)).hexdigest()
+
+
+def restore_struct(struct_type, values):
+    """
+    Unpickles a struct (see Struct.__reduce__).
+    """
+    return struct_type.load_values(values)
@@ -1,4 +1,6 @@
-from validatable import Validatable
+from validatable import Validatable, describe_validator
+from spans import \
+    Span, FieldSpan, FieldChange, Walk, format_path, parse_path
 
 
 class Sizeable:
@@ -9,6 +11,14 @@ class Sizeable:
         """
         return self.size
 
+    @property
+    def static_size(self):
+        """
+        The number of bytes that this property always occupies,
+        or None if that depends on the value being stored.
+        """
+        return self.size
+
 
 class SpaceOccupyingProperty:
     """
@@ -27,6 +37,94 @@ class BinaryProperty(SpaceOccupyingProperty, Sizeable):
     def sort_order(self):
         return self.index
 
+    # Properties with a fixed size that the struct module can parse directly
+    # set fused_format to a (byte order or None, format code) pair, so that
+    # runs of them can be parsed together (see Struct.parse_plan). If the
+    # value unpacked by struct needs converting, from_fused does that.
+    fused_format = None
+    from_fused = None
+    produces_value = True
+
+    def parse_steps(self, buffer, offset, result):
+        """
+        An incremental version of parse_and_get_size (see Struct.parse_steps
+        and packing_tape.streaming) that appends (value, size) to result.
+        Properties with a static size simply wait for that many bytes.
+        """
+        size = self.static_size
+        yield None if size is None else offset + size
+        buffer.require(offset, size or 0)
+        result.append(self.parse_and_get_size(buffer.view(offset, size)))
+
+    # The attributes that determine how this property parses its value,
+    # which (along with its validator) make up its entry in Struct.schema.
+    schema_attributes = ()
+
+    def describe(self):
+        """
+        Returns a tuple of plain values describing how this property
+        is parsed, that only changes if the way it's parsed changes.
+        """
+        return (self.__class__.__name__,) + tuple([
+            getattr(self, attribute) for attribute in self.schema_attributes
+        ]) + (describe_validator(getattr(self, 'validator', None)),)
+
+    def nested_struct_types(self):
+        """
+        Returns the struct types that this property embeds directly.
+        """
+        return []
+
+    def column_format(self):
+        """
+        Returns the struct module format (with a byte order) that a column
+        of this property's values is stored in by Struct.export_columns,
+        or None if its values can't be stored in a column.
+        """
+        return None
+
+    def dump_value(self, instance):
+        """
+        Returns this property's value in instance as plain Python values
+        (see Struct.dump_values), which load_value can turn back into
+        a value without parsing or validating anything.
+        """
+        return self.get(instance)
+
+    def load_value(self, target, dumped):
+        self.set(target, dumped)
+
+    def parse_into(self, instance, view, offset):
+        """
+        Parses this property's value from view (a memoryview) at offset into
+        instance, reusing any storage that instance already has for it (see
+        Struct.parse_into). Returns the number of bytes parsed.
+        """
+        value, size = self.parse_and_get_size(view[offset:])
+        if self.produces_value:
+            self.set(instance, value)
+        return size
+
+    def skip(self, view, offset):
+        """
+        Returns the size of this property's value at offset in view without
+        storing it (and, if this property has a static size, without even
+        decoding it). Used to skip properties that a projection leaves out.
+        """
+        size = self.static_size
+        if size is None:
+            size = self.parse_and_get_size(view[offset:])[1]
+        return size
+
+    def signature(self, offset):
+        """
+        Returns a list of (offset, values) pairs, each of which means that
+        this property can only be parsed if the bytes at that offset are
+        one of the strings in values. Most properties can't tell, and
+        return an empty list.
+        """
+        return []
+
 
 class LogicalProperty(Sizeable):
     """
@@ -62,6 +160,50 @@ class Serializable:
     def serialize(self, instance):
         return self.serialize_value(self.get(instance))
 
+    def iter_spans(self, instance, path, offset, depth, walk):
+        """
+        Yields a Span for this property (starting at offset) followed by
+        Spans for any properties nested within it. Properties that contain
+        other properties should override this, skipping nested properties
+        that lie entirely outside of the walk's range.
+        """
+        yield Span(
+            path,
+            offset,
+            offset + self.get_size(instance),
+            self,
+            self.get(instance),
+            depth,
+            walk.clip(offset, self.serialize(instance))
+            if walk.serialize else None)
+
+    def locate(self, instance, path, rest, offset, depth):
+        """
+        Returns the Span of the field at the end of path, where rest is the
+        part of path that lies within this property (starting at offset).
+        """
+        if rest:
+            raise ValueError(
+                "Field %s has no field %s." % (
+                    format_path(path), format_path(rest)))
+        return Span(
+            path,
+            offset,
+            offset + self.get_size(instance),
+            self,
+            self.get(instance),
+            depth,
+            None)
+
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        """
+        Yields a FieldChange for each difference between this property's
+        value in a (which starts at offset_a) and its value in b.
+        """
+        old, new = self.get(a), self.get(b)
+        if old != new:
+            yield FieldChange(path, offset_a, offset_b, old, new)
+
 
 class DummyProperty(BinaryProperty):
     """
@@ -0,0 +1,131 @@
+import re
+from collections import namedtuple
+
+
+PATH_PART = re.compile(r'\.?([A-Za-z_][A-Za-z0-9_]*)|\[(\d+)\]')
+
+
+def format_path(path):
+    """
+    Turns a path tuple like ('objects', 17, 'name') into a
+    string like "objects[17].name".
+    """
+    parts = []
+    for part in path:
+        if isinstance(part, str):
+            if parts:
+                parts.append('.')
+            parts.append(part)
+        else:
+            parts.append('[%d]' % part)
+    return ''.join(parts)
+
+
+def parse_path(name):
+    """
+    The inverse of format_path: turns "objects[17].name"
+    into ('objects', 17, 'name').
+    """
+    path = []
+    position = 0
+    while position < len(name):
+        match = PATH_PART.match(name, position)
+        if match is None or (position == 0 and name.startswith('.')):
+            raise ValueError("Invalid field path: %s" % repr(name))
+        attribute, index = match.groups()
+        path.append(attribute if attribute is not None else int(index))
+        position = match.end()
+    return tuple(path)
+
+
+class FieldSpan(namedtuple('FieldSpan', [
+    'path',
+    'start',
+    'end',
+    'field_type',
+])):
+    """
+    A compact record of where one field lives in a Struct's serialized
+    bytes: its formatted path (like "objects[17].name"), its [start, end)
+    byte range and the class of the field that was found there.
+    """
+    __slots__ = ()
+
+
+class Span(namedtuple('Span', [
+    'path',
+    'start',
+    'end',
+    'field',
+    'value',
+    'depth',
+    'data',
+])):
+    """
+    The location of one field within a Struct's serialized bytes.
+
+    path is a tuple of attribute names and array indices leading from the
+    root struct to the field. For leaf fields, data contains the field's
+    serialized bytes, clipped to the range that was asked for; for fields
+    that contain other fields (and when not serializing), it is None.
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return format_path(self.path)
+
+    @property
+    def size(self):
+        return self.end - self.start
+
+    def compact(self):
+        return FieldSpan(
+            self.name, self.start, self.end, self.field.__class__)
+
+
+class FieldChange(namedtuple('FieldChange', [
+    'path',
+    'offset_a',
+    'offset_b',
+    'old',
+    'new',
+])):
+    """
+    One difference found by Struct.diff: the field at path (a tuple, as in
+    Span) has the value old in the first struct, at byte offset_a, but the
+    value new in the second struct, at byte offset_b. Fields that only
+    exist in one of the structs (like extra array elements) have None as
+    their offset and value in the other.
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return format_path(self.path)
+
+
+class Walk(namedtuple('Walk', ['start', 'end', 'serialize'])):
+    """
+    The parameters shared by every level of a single traversal over a
+    Struct's fields: the byte range of interest and whether or not to
+    serialize leaf fields along the way.
+    """
+    __slots__ = ()
+
+    def overlaps(self, start, end):
+        if self.end is not None and start >= self.end:
+            return False
+        return end > self.start or start == end == self.start
+
+    def clip(self, offset, data):
+        """
+        Trims data (which begins at offset) to this walk's range.
+        """
+        lo = max(self.start - offset, 0)
+        hi = len(data)
+        if self.end is not None:
+            hi = min(self.end - offset, hi)
+        if lo == 0 and hi == len(data):
+            return data
+        return data[lo:max(lo, hi)]
@@ -1,3 +1,88 @@
+from functools import partial
+from struct import error as struct_error
+from types import CodeType, FunctionType, MethodType, ModuleType
+
+
+def describe_validator(validator):
+    """
+    Returns a description of a validator that stays the same from one run
+    to the next (unlike its id), for use in schema fingerprints. Functions
+    are described by their code and by the values that it refers to: the
+    globals that it uses, the variables that it closes over and its default
+    arguments. (Values without a stable repr make the description differ
+    from run to run, which is safe, if not useful.)
+    """
+    if validator is None:
+        return None
+    return describe_value(validator, set())
+
+
+def describe_value(value, seen):
+    if isinstance(value, FunctionType):
+        if id(value) in seen:
+            # A recursive function; its code is already described.
+            return value.__name__
+        seen.add(id(value))
+        code = value.__code__
+        return (
+            describe_code(code),
+            tuple([
+                (name, describe_value(value.__globals__[name], seen))
+                for name in code.co_names
+                if name in value.__globals__
+            ]),
+            tuple([
+                describe_cell(cell, seen)
+                for cell in value.__closure__ or ()
+            ]),
+            describe_value(value.__defaults__, seen),
+        )
+    if isinstance(value, MethodType):
+        return (
+            describe_value(value.__func__, seen),
+            describe_value(value.__self__, seen))
+    if isinstance(value, partial):
+        return (
+            describe_value(value.func, seen),
+            describe_value(value.args, seen),
+            describe_value(sorted((value.keywords or {}).items()), seen))
+    if isinstance(value, ModuleType):
+        return value.__name__
+    if isinstance(value, (tuple, list)):
+        return tuple([describe_value(item, seen) for item in value])
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted([repr(item) for item in value]))
+    if callable(value) and hasattr(value, '__dict__') \
+            and not isinstance(value, type):
+        # Validator objects, described by what they hold (which may
+        # include other validators).
+        return (value.__class__.__name__, tuple([
+            (name, describe_value(attribute, seen))
+            for name, attribute in sorted(vars(value).items())
+        ]))
+    return repr(value)
+
+
+def describe_code(code):
+    return (
+        code.co_code,
+        code.co_names,
+        tuple([
+            describe_code(const) if isinstance(const, CodeType)
+            else repr(const)
+            for const in code.co_consts
+        ]),
+    )
+
+
+def describe_cell(cell, seen):
+    try:
+        return describe_value(cell.cell_contents, seen)
+    except ValueError:
+        # The variable hasn't been assigned yet.
+        return None
+
+
 class Validatable:
     def validate(self, instance, raise_exception=True):
         return self.validate_value(
@@ -26,3 +111,39 @@ class Validatable:
 
     def replace_validator(self, validator=None):
         self.validator = validator
+
+    @property
+    def literal_values(self):
+        """
+        The complete set of values accepted by this field's validator,
+        if the validator is able to describe them (or None, if not).
+        """
+        return getattr(self.validator, 'literal_values', None)
+
+    def literal_encoding(self, value):
+        """
+        Returns the bytes that parse as value. Usually that's how value is
+        serialized, but fields that accept more than one encoding of a
+        value override this with the one that they parse.
+        """
+        return self.serialize_value(value)
+
+    def literal_signature(self, offset):
+        """
+        A signature (see BinaryProperty.signature) made up of the encoded
+        forms of this field's literal values, if it has any.
+        """
+        values = self.literal_values
+        if not values:
+            return []
+        encoded = set()
+        for value in values:
+            try:
+                raw = self.literal_encoding(value)
+                parsed, _ = self.parse_and_get_size(raw)
+            except (struct_error, TypeError, ValueError):
+                # This value can never be parsed from this field.
+                continue
+            if parsed == value:
+                encoded.add(raw)
+        return [(offset, frozenset(encoded))]
@@ -0,0 +1,108 @@
+"""
+An optional on-disk cache of parse results, so that files that haven't
+changed since the last run don't have to be parsed again:
+
+    cache = ParseCache("parsed.db")
+    instrument = cache.parse_file(EXSFile, "68 Bell Player.exs")
+
+Entries are keyed by the struct's schema fingerprint (so that changing the
+struct invalidates its entries) and either a hash of the data or the path,
+modification time and size of the file it was read from. The decoded values
+(see Struct.dump_values) are stored with marshal in a SQLite database, and
+loaded back without running any validators or trial parses.
+
+Only those values are stored, not what parsing learned about the data
+they came from. Checksum fields of instances loaded from the cache count as
+matching (even if allow_invalid let a mismatched one through when it was
+parsed), and pointer fields can't be followed until the instance is given
+its data again with bind_source.
+"""
+
+import marshal
+import os
+import sqlite3
+from hashlib import sha1
+
+# Bump this whenever the format of dumped values changes.
+CACHE_FORMAT_VERSION = 1
+
+
+def schema_fingerprint(struct_type):
+    """
+    Returns a hex digest that identifies the way that struct_type is parsed
+    and stored in the cache (see Struct.schema_fingerprint).
+    """
+    return sha1(repr((
+        CACHE_FORMAT_VERSION,
+        marshal.version,
+        struct_type.schema_fingerprint(),
+    ))).hexdigest()
+
+
+class ParseCache(object):
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            "fingerprint TEXT, key TEXT, data BLOB, "
+            "PRIMARY KEY (fingerprint, key))")
+        self.connection.commit()
+
+    def get(self, struct_type, key):
+        """
+        Returns the instance of struct_type cached under key, or None.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM parsed WHERE fingerprint = ? AND key = ?",
+            (schema_fingerprint(struct_type), key)).fetchone()
+        if row is None:
+            return None
+        return struct_type.load_values(marshal.loads(str(row[0])))
+
+    def put(self, struct_type, key, instance):
+        data = marshal.dumps(instance.dump_values(), 2)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO parsed VALUES (?, ?, ?)",
+            (schema_fingerprint(struct_type), key, buffer(data)))
+        self.connection.commit()
+
+    def parse_from(self, struct_type, data, allow_invalid=False):
+        """
+        Like struct_type.parse_from(data), but returns a cached result
+        if the same data has been parsed before.
+        """
+        key = "sha1:%s:%d" % (sha1(data).hexdigest(), allow_invalid)
+        return self.get_or_parse(struct_type, key, lambda: data, allow_invalid)
+
+    def parse_file(self, struct_type, path, allow_invalid=False):
+        """
+        Parses the file at path, reusing the result from the last time it
+        was parsed if its modification time and size haven't changed
+        (without reading the file at all).
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = "stat:%s:%r:%d:%d" % (
+            path, stat.st_mtime, stat.st_size, allow_invalid)
+
+        def read():
+            with open(path, 'rb') as f:
+                return f.read()
+        return self.get_or_parse(struct_type, key, read, allow_invalid)
+
+    def get_or_parse(self, struct_type, key, read, allow_invalid):
+        instance = self.get(struct_type, key)
+        if instance is None:
+            instance = struct_type.parse_from(
+                read(), allow_invalid=allow_invalid)
+            if instance is not None:
+                self.put(struct_type, key, instance)
+        return instance
+
+    def clear(self):
+        self.connection.execute("DELETE FROM parsed")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,257 @@
+"""
+Export of the elements of an array field as columns (see
+Struct.export_columns), written out a chunk of elements at a time.
+
+Each leaf field of the elements becomes a column, named by its path
+within the element (like "object_header.name"). Every leaf field
+describes its column with a struct module format (see
+BinaryProperty.column_format), which is what the writers below
+translate into .npy, Arrow or CSV types.
+"""
+
+import ast
+import csv
+from struct import Struct as CompiledFormat, calcsize
+
+from field_classes import EmbeddedField, PrimitiveArrayField
+
+NPY_TYPES = {
+    'b': 'i1', 'B': 'u1', '?': 'b1',
+    'h': 'i2', 'H': 'u2',
+    'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+    'q': 'i8', 'Q': 'u8',
+    'f': 'f4', 'd': 'f8',
+}
+
+ARROW_TYPES = {
+    'b': 'int8', 'B': 'uint8', '?': 'bool_',
+    'h': 'int16', 'H': 'uint16',
+    'i': 'int32', 'I': 'uint32', 'l': 'int32', 'L': 'uint32',
+    'q': 'int64', 'Q': 'uint64',
+    'f': 'float32', 'd': 'float64',
+}
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class Column(object):
+    """
+    One column: its name, the properties to follow to get from an element
+    to its value (the last of which holds the value), and its format.
+    Padding (like empty fields) has a format but no name or value.
+    """
+    def __init__(self, name, path, format):
+        self.name = name
+        self.path = path
+        self.format = format
+        self.byte_order = format[0] if format[0] in '<>' else '<'
+        self.code = format.lstrip('<>')
+
+    @property
+    def is_padding(self):
+        return self.code.endswith('x')
+
+    @property
+    def is_string(self):
+        return self.code.endswith('s')
+
+    @property
+    def size(self):
+        return calcsize(self.format)
+
+    def value(self, element):
+        for property in self.path:
+            element = property.get(element)
+        return element
+
+    def npy_type(self):
+        if self.is_padding:
+            return '|V%d' % self.size
+        if self.is_string:
+            return '|S%d' % self.size
+        byte_order = '|' if self.size == 1 else self.byte_order
+        return byte_order + NPY_TYPES[self.code]
+
+
+def element_columns(array_field):
+    """
+    Returns the columns of the elements of array_field, and whether the
+    serialized form of every element is laid out exactly like a row of
+    those columns (in which case rows can be written without unpacking
+    any values).
+    """
+    subfield = array_field.subfield
+    if isinstance(array_field, PrimitiveArrayField):
+        format = subfield.column_format()
+        columns = [Column(array_field.field_name, (), format)]
+        return columns, True
+    if not isinstance(subfield, EmbeddedField):
+        raise ValueError(
+            'Field "%s" does not hold numbers or structs, so it has no '
+            'columns.' % array_field.field_name)
+    columns = []
+    raw = collect_columns(subfield.struct_type, (), (subfield,), columns)
+    return columns, raw and subfield.static_size is not None
+
+
+def collect_columns(struct_type, prefix, path, columns):
+    raw = True
+    for name, property in struct_type.binary_properties():
+        if isinstance(property, EmbeddedField):
+            raw = collect_columns(
+                property.struct_type, prefix + (name,),
+                path + (property,), columns) and raw
+            continue
+        format = property.column_format()
+        if format is None:
+            raise ValueError(
+                'Field "%s" of %s cannot be exported as a column.' % (
+                    name, struct_type.__name__))
+        columns.append(
+            Column(".".join(prefix + (name,)), path + (property,), format))
+        raw = raw and calcsize(format) == property.static_size
+    return raw
+
+
+def iter_chunks(items, chunk_size):
+    for start in xrange(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def export(instance, array_field, sink, format, chunk_size):
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    writers = {
+        'npy': write_npy,
+        'arrow': write_arrow,
+        'csv': write_csv,
+    }
+    if format not in writers:
+        raise ValueError(
+            "Unknown column format %r (expected one of %s)." % (
+                format, ", ".join(sorted(writers))))
+    columns, raw = element_columns(array_field)
+    return writers[format](
+        instance, array_field, columns, raw, sink, chunk_size)
+
+
+def npy_header(columns, count):
+    if len(columns) == 1 and columns[0].path == ():
+        descr = repr(columns[0].npy_type())
+    else:
+        descr = repr([
+            ('' if column.is_padding else column.name, column.npy_type())
+            for column in columns
+        ])
+    header = "{'descr': %s, 'fortran_order': False, 'shape': (%d,), }" % (
+        descr, count)
+    # Version 1.0 headers are padded with spaces (and ended with a newline)
+    # so that the data starts on a multiple of 64 bytes.
+    length = len(header) + 1
+    header += ' ' * (-(10 + length) % 64) + '\n'
+    if len(header) > 0xFFFF:
+        raise ValueError("Too many columns for a .npy header.")
+    return '\x93NUMPY\x01\x00' + CompiledFormat('<H').pack(len(header)) + \
+        header
+
+
+def write_npy(instance, array_field, columns, raw, sink, chunk_size):
+    """
+    Writes a .npy file holding a one-dimensional array of records.
+    """
+    if isinstance(array_field, PrimitiveArrayField):
+        values = array_field.get_values(instance)
+        sink.write(npy_header(columns, len(values)))
+        for chunk in iter_chunks(values, chunk_size):
+            if array_field.byteswap:
+                chunk.byteswap()
+            sink.write(chunk.tostring())
+        return len(values)
+
+    subfield = array_field.subfield
+    targets = array_field.get_storage_targets(instance) or ()
+    if not raw:
+        # Rows are packed little-endian, whatever the data's byte order.
+        for column in columns:
+            column.byte_order = '<'
+        row = CompiledFormat('<' + ''.join([c.code for c in columns]))
+        values = [c for c in columns if not c.is_padding]
+    sink.write(npy_header(columns, len(targets)))
+    for chunk in iter_chunks(targets, chunk_size):
+        if raw:
+            # The serialized elements are already laid out as records.
+            sink.write(''.join([subfield.serialize(t) for t in chunk]))
+        else:
+            sink.write(''.join([
+                row.pack(*[column.value(target) for column in values])
+                for target in chunk
+            ]))
+    return len(targets)
+
+
+def column_values(columns, array_field, instance, chunk_size):
+    """
+    Yields a list of lists (one per column) for each chunk of elements.
+    """
+    if isinstance(array_field, PrimitiveArrayField):
+        for chunk in iter_chunks(
+                array_field.get_values(instance), chunk_size):
+            yield [chunk.tolist()]
+        return
+    for chunk in iter_chunks(
+            array_field.get_storage_targets(instance) or [], chunk_size):
+        yield [
+            [column.value(target) for target in chunk]
+            for column in columns
+        ]
+
+
+def write_csv(instance, array_field, columns, raw, sink, chunk_size):
+    columns = [column for column in columns if not column.is_padding]
+    writer = csv.writer(sink)
+    writer.writerow([column.name for column in columns])
+    count = 0
+    for values in column_values(columns, array_field, instance, chunk_size):
+        rows = zip(*values)
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def write_arrow(instance, array_field, columns, raw, sink, chunk_size):
+    """
+    Writes an Arrow IPC file, with a record batch for each chunk.
+    Needs pyarrow, which is only imported when it's used.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("Exporting Arrow columns needs pyarrow.")
+    columns = [column for column in columns if not column.is_padding]
+    schema = pyarrow.schema([
+        (column.name, pyarrow.binary() if column.is_string
+         else getattr(pyarrow, ARROW_TYPES[column.code])())
+        for column in columns
+    ])
+    writer = pyarrow.ipc.new_file(sink, schema)
+    count = 0
+    try:
+        for values in column_values(
+                columns, array_field, instance, chunk_size):
+            writer.write_batch(pyarrow.record_batch([
+                pyarrow.array(vals, type=field.type)
+                for vals, field in zip(values, schema)
+            ], schema=schema))
+            count += len(values[0])
+    finally:
+        writer.close()
+    return count
+
+
+def read_npy_header(data):
+    """
+    Returns the header dict of the .npy file in data (for tests and
+    tools that don't have NumPy), and the offset that its data starts at.
+    """
+    length = CompiledFormat('<H').unpack_from(data, 8)[0]
+    return ast.literal_eval(data[10:10 + length]), 10 + length
@@ -0,0 +1,93 @@
+"""
+The compression codecs that compressed() fields can use. Each codec's
+module is only imported when a field that uses it is created.
+"""
+
+
+class Codec(object):
+    def __init__(self, name, compress, decompressor):
+        self.name = name
+        self.compress = compress
+        self.decompressor = decompressor
+
+    def decompress(self, data):
+        return "".join(self.iter_decompressed(data))
+
+    def iter_decompressed(self, data, chunk_size=65536):
+        """
+        Yields the decompressed form of data a piece at a time,
+        decompressing at most chunk_size bytes of data at once.
+        """
+        decompressor = self.decompressor()
+        for start in xrange(0, len(data), chunk_size):
+            chunk = decompressor.decompress(data[start:start + chunk_size])
+            if chunk:
+                yield chunk
+        flush = getattr(decompressor, 'flush', None)
+        if flush is not None:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.name)
+
+
+def zlib_codec(wbits):
+    import zlib
+
+    def compress(data):
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, wbits)
+        return compressor.compress(data) + compressor.flush()
+    return compress, lambda: zlib.decompressobj(wbits)
+
+
+def bz2_codec():
+    import bz2
+    return bz2.compress, bz2.BZ2Decompressor
+
+
+def lzma_codec():
+    try:
+        import lzma
+    except ImportError:
+        try:
+            from backports import lzma
+        except ImportError:
+            raise ValueError(
+                "The lzma codec needs the lzma module "
+                "(on Python 2, install backports.lzma).")
+    return lzma.compress, lzma.LZMADecompressor
+
+
+CODECS = {
+    'zlib': lambda: zlib_codec(15),
+    'gzip': lambda: zlib_codec(31),
+    'deflate': lambda: zlib_codec(-15),
+    'bz2': bz2_codec,
+    'lzma': lzma_codec,
+}
+
+
+def get_codec(name):
+    if name not in CODECS:
+        raise ValueError(
+            "Unknown codec %r (expected one of %s)." % (
+                name, ", ".join(sorted(CODECS))))
+    compress, decompressor = CODECS[name]()
+    return Codec(name, compress, decompressor)
+
+
+class DecompressingReader(object):
+    """
+    A file-like object that reads the decompressed form of some data,
+    for use with packing_tape.streaming.
+    """
+    def __init__(self, codec, data):
+        self.chunks = codec.iter_decompressed(data)
+
+    def read(self, size=-1):
+        # Chunks are returned as they're decompressed, which the streaming
+        # functions allow for (they only need more than nothing).
+        return next(self.chunks, '')
@@ -9,3 +9,16 @@ LITTLE_ENDIAN_SIGNED_INT = '<i'
 BIG_ENDIAN_UNSIGNED_INT = '>I'
 BIG_ENDIAN_SIGNED_INT = '>i'
 STRING = 's'
+
+LITTLE_ENDIAN = '<'
+BIG_ENDIAN = '>'
+
+# Format codes without a byte order, to be prefixed with one of the above.
+UNSIGNED_SHORT = 'H'
+SIGNED_SHORT = 'h'
+UNSIGNED_INT = 'I'
+SIGNED_INT = 'i'
+UNSIGNED_LONG_LONG = 'Q'
+SIGNED_LONG_LONG = 'q'
+FLOAT = 'f'
+DOUBLE = 'd'
@@ -1,4 +1,8 @@
-from struct import unpack_from, pack, calcsize
+import sys
+from array import array
+from collections import MutableSequence
+from struct import unpack_from, pack, calcsize, error as struct_error, \
+    Struct as CompiledFormat
 from bases import BinaryProperty, \
     LogicalProperty, \
     DummyProperty, \
@@ -7,7 +11,16 @@ from bases import BinaryProperty, \
     Parseable, \
     Serializable, \
     Storable, \
-    StorageTarget
+    StorageTarget, \
+    Span, \
+    FieldChange, \
+    format_path, \
+    describe_validator
+from constants import Little, LITTLE_ENDIAN, BIG_ENDIAN
+from validators import compile_validator, check_all
+
+
+INTEGER_FORMATS = 'bBhHiIlLqQ'
 
 
 class ByteAlignedStructField(
@@ -39,7 +52,11 @@ class ByteAlignedStructField(
         self.endianness = endianness
         self.index = index
         self.default = default
-        self.validator = validate
+        self.validator = compile_validator(validate, self.integral)
+
+    @property
+    def integral(self):
+        return self.format_string[-1] in INTEGER_FORMATS
 
     def initialize_with_default(self, instance):
         self.set(instance, self.default)
@@ -54,8 +71,28 @@ class ByteAlignedStructField(
     def min_size(self):
         return calcsize(self.format_string)
 
-    def serialize(self, instance):
-        return pack(self.format_string, self.get(instance))
+    schema_attributes = ('format_string', 'signed', 'endianness')
+
+    def column_format(self):
+        if self.format_string[0] in '<>':
+            return self.format_string
+        return '<' + self.format_string
+
+    @property
+    def fused_format(self):
+        if self.format_string[0] in '<>' and self.size > 1:
+            return self.format_string[0], self.format_string[1:]
+        return None, self.format_string.lstrip('<>')
+
+    def serialize_value(self, value):
+        return pack(self.format_string, value)
+
+    @property
+    def array_typecode(self):
+        return array_typecode_for(self.format_string, self.size)
+
+    def signature(self, offset):
+        return self.literal_signature(offset)
 
     def __repr__(self):
         attrs = (
@@ -86,22 +123,45 @@ class StringField(
     Serializable,
     Storable
 ):
+    """
+    A string of size bytes, with any trailing nulls removed. Pass encoding
+    to decode values into unicode (and encode them when serializing),
+    intern=True to intern byte string values (so that repeated values
+    share one copy), or view=True to get the raw bytes as a memoryview of
+    the data they were parsed from rather than as a copy.
+    """
     def __init__(
         self,
         size,
         index,
         null_terminated=True,
         default='',
-        validate=None
+        validate=None,
+        encoding=None,
+        errors='strict',
+        intern=False,
+        view=False
     ):
         super(StringField, self).__init__(
             fget=self.get, fset=self.set)
 
+        if intern and encoding is not None:
+            raise ValueError("Only byte strings can be interned.")
+        if view and (null_terminated or encoding is not None or intern):
+            raise ValueError(
+                "Only strings that are not null terminated, decoded or "
+                "interned can be parsed as views.")
         self.size = size
         self.index = index
         self.null_terminated = null_terminated
         self.default = default
-        self.validator = validate
+        self.validator = compile_validator(validate)
+        self.encoding = encoding
+        self.errors = errors
+        self.intern = intern
+        self.view = view
+        self.format_string = str(size) + 's'
+        self.compiled = CompiledFormat(self.format_string)
 
     @property
     def sort_order(self):
@@ -110,25 +170,90 @@ class StringField(
     def initialize_with_default(self, instance):
         self.set(instance, self.default)
 
-    @property
-    def format_string(self):
-        return str(self.size) + 's'
+    def decode(self, raw):
+        """
+        Turns the size bytes of a parsed string into its value.
+        """
+        if self.encoding is not None:
+            # Decode before stripping: in encodings like UTF-16, null
+            # bytes at the end can be part of the last character.
+            return raw.decode(self.encoding, self.errors).rstrip(u"\x00")
+        value = raw.rstrip("\x00")
+        if self.intern:
+            return intern(value)
+        return value
 
     def parse_and_get_size(self, stream):
+        if self.view:
+            if isinstance(stream, memoryview):
+                return stream[:self.size], self.size
+            # Strings and buffers have no memoryview of their own on
+            # Python 2 if they're slices, so copy just this field.
+            return memoryview(stream[:self.size]), self.size
         return (
-            unpack_from(self.format_string, stream, 0)[0].rstrip("\x00"),
-            calcsize(self.format_string)
+            self.decode(self.compiled.unpack_from(stream, 0)[0]),
+            self.size
         )
 
+    def parse_steps(self, buffer, offset, result):
+        if not self.view:
+            for need in super(StringField, self).parse_steps(
+                    buffer, offset, result):
+                yield need
+            return
+        yield offset + self.size
+        buffer.require(offset, self.size)
+        # A view of the stream's buffer would stop it from discarding the
+        # data that's been parsed, so view a copy of just this field.
+        result.append((
+            memoryview(buffer.view(offset, self.size).tobytes()),
+            self.size))
+
     @property
     def min_size(self):
-        return calcsize(self.format_string)
+        return self.size
 
-    def serialize(self, instance):
+    def signature(self, offset):
+        return self.literal_signature(offset)
+
+    schema_attributes = (
+        'size', 'null_terminated', 'encoding', 'errors', 'view')
+
+    def column_format(self):
+        return '%ds' % self.size
+
+    @property
+    def fused_format(self):
+        if self.view:
+            return None
+        return None, self.format_string
+
+    def from_fused(self, value):
+        return self.decode(value)
+
+    def encode(self, value):
+        if isinstance(value, memoryview):
+            return value.tobytes()
+        if isinstance(value, unicode) and self.encoding is not None:
+            return value.encode(self.encoding, self.errors)
+        return value
+
+    def serialize_value(self, value):
         if self.null_terminated:
-            return pack(self.format_string, self.get(instance))[:-1] + "\x00"
+            return self.compiled.pack(self.encode(value))[:-1] + "\x00"
         else:
-            return pack(self.format_string, self.get(instance))
+            return self.compiled.pack(self.encode(value))
+
+    def literal_encoding(self, value):
+        # Only trailing nulls are stripped when parsing, so a value that
+        # fills the whole field parses without its terminator.
+        return self.compiled.pack(self.encode(value))
+
+    def dump_value(self, instance):
+        value = self.get(instance)
+        if isinstance(value, memoryview):
+            return value.tobytes()
+        return value
 
     def __repr__(self):
         attrs = (
@@ -146,6 +271,19 @@ class StringField(
         )
 
 
+def parses_views(property):
+    """
+    Whether property (or any of its subfields) parses values that are views
+    of the data that they were parsed from.
+    """
+    if getattr(property, 'view', False):
+        return True
+    subfields = list(getattr(property, 'subfields', ()))
+    if getattr(property, 'subfield', None) is not None:
+        subfields.append(property.subfield)
+    return any([parses_views(subfield) for subfield in subfields])
+
+
 class EmbeddedField(
     property,
     BinaryProperty,
@@ -168,11 +306,18 @@ class EmbeddedField(
         self.struct_type = struct_type
         self.index = index
         self.default = default
-        self.validator = validate
+        self.validator = compile_validator(validate)
 
     def get_size(self, instance):
+        static_size = self.static_size
+        if static_size is not None:
+            return static_size
         return len(self.get(instance))
 
+    @property
+    def static_size(self):
+        return self.struct_type.static_size()
+
     @property
     def sort_order(self):
         return self.index
@@ -184,13 +329,117 @@ class EmbeddedField(
         instance = self.struct_type.parse_from(stream, allow_invalid=True)
         return instance, len(instance)
 
+    def parse_steps(self, buffer, offset, result):
+        return self.struct_type.parse_steps(
+            buffer, offset, result, allow_invalid=True)
+
+    def skip(self, view, offset):
+        static_size = self.static_size
+        if static_size is not None:
+            return static_size
+        return self.struct_type.measure(view, offset)
+
+    def parse_projected(
+        self,
+        instance,
+        view,
+        offset,
+        projection,
+        need_size,
+        allow_invalid
+    ):
+        """
+        Parses only the fields in projection of the struct embedded at
+        offset (see Struct.parse_projected).
+        """
+        child = self.owned_child(instance)
+        if child is None:
+            child = self.struct_type.allocate()
+            Storable.set(self, instance, child)
+        static_size = self.static_size
+        size = child.parse_projected(
+            view, offset, projection,
+            need_size and static_size is None, allow_invalid)
+        if need_size and static_size is not None:
+            return static_size
+        return size
+
+    def owned_child(self, instance):
+        """
+        Returns the struct embedded in instance if it can be parsed into in
+        place, or None if there isn't one, or if it's this field's default
+        (which every instance that hasn't been given its own shares).
+        """
+        child = self.get(instance)
+        if type(child) is not self.struct_type or child is self.default:
+            return None
+        return child
+
+    def parse_into(self, instance, view, offset):
+        child = self.owned_child(instance)
+        if child is None:
+            return super(EmbeddedField, self).parse_into(
+                instance, view, offset)
+        child.parse_into(view, offset, allow_invalid=True)
+        return self.get_size(instance)
+
     @property
     def min_size(self):
         return self.struct_type.min_size()
 
+    def signature(self, offset):
+        return [
+            (offset + inner_offset, values)
+            for inner_offset, values in self.struct_type.signature()
+        ]
+
     def serialize(self, instance):
         return self.get(instance).serialize()
 
+    def describe(self):
+        return (
+            self.__class__.__name__,
+            self.struct_type.schema(),
+            describe_validator(self.validator))
+
+    def nested_struct_types(self):
+        return [self.struct_type]
+
+    def dump_value(self, instance):
+        value = self.get(instance)
+        return None if value is None else value.dump_values()
+
+    def load_value(self, target, dumped):
+        Storable.set(
+            self, target,
+            None if dumped is None else self.struct_type.load_values(dumped))
+
+    def iter_spans(self, instance, path, offset, depth, walk):
+        value = self.get(instance)
+        yield Span(
+            path,
+            offset,
+            offset + self.get_size(instance),
+            self,
+            value,
+            depth,
+            None)
+        for span in value.walk_spans(walk, offset, path, depth + 1):
+            yield span
+
+    def locate(self, instance, path, rest, offset, depth):
+        if not rest:
+            return super(EmbeddedField, self).locate(
+                instance, path, rest, offset, depth)
+        return self.get(instance).locate_within(path, rest, offset, depth + 1)
+
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        old, new = self.get(a), self.get(b)
+        if old is None or new is None:
+            return super(EmbeddedField, self).iter_changes(
+                a, b, path, offset_a, offset_b)
+        return old.diff_fields(new, path, offset_a, offset_b)
+
     def validate(self, instance, raise_exception=True):
         value = self.get(instance)
         if value is None:
@@ -198,6 +447,13 @@ class EmbeddedField(
         return self.validate_value(value, raise_exception, instance)
 
     def validate_value(self, value, raise_exception=False, instance='unknown'):
+        if not isinstance(value, self.struct_type):
+            if not raise_exception:
+                return False
+            raise ValueError(
+                'Field "%s" requires a %s (value "%s", instance %s)' % (
+                    self.field_name, self.struct_type.__name__,
+                    value, instance))
         if self.validator is not None:
             if self.validator(value):
                 pass
@@ -230,6 +486,378 @@ class EmbeddedField(
         )
 
 
+class PointerField(property, LogicalProperty, Nameable, Storable):
+    """
+    A struct stored elsewhere in the data, at the offset held by another
+    field (offset_field) of the same struct. Pointers take up no space
+    themselves: the struct they point to is only parsed when the pointer
+    is first read, from the data that the struct holding the pointer was
+    parsed from (see Struct.bind_source), and is then kept.
+
+    Offsets count from the start of that data, or if relative is True,
+    from the start of the struct holding the pointer. An offset equal to
+    null (if given) means that there is nothing to point to.
+    """
+    def __init__(
+        self,
+        struct_type,
+        offset_field,
+        index,
+        relative=False,
+        null=None
+    ):
+        super(PointerField, self).__init__(
+            fget=self.get, fset=self.set)
+        self.struct_type = struct_type
+        self.offset_field = offset_field
+        self.index = index
+        self.relative = relative
+        self.null = null
+
+    size = 0
+
+    @property
+    def sort_order(self):
+        # Pointers take up no space, so sit between the fields around them.
+        return self.index - 0.5
+
+    def target_offset(self, instance):
+        """
+        Returns the offset (within the data that instance was parsed from)
+        of the struct that this pointer points to, or None.
+        """
+        source = getattr(instance, '_source', None)
+        offset = getattr(instance, self.offset_field)
+        if source is None or offset is None or offset == self.null:
+            return None
+        data, start = source
+        return start + offset if self.relative else offset
+
+    def get(self, instance):
+        value = Storable.get(self, instance)
+        if value is None:
+            value = self.dereference(instance)
+            if value is not None:
+                Storable.set(self, instance, value)
+        return value
+
+    def dereference(self, instance):
+        offset = self.target_offset(instance)
+        if offset is None:
+            return None
+        data = instance._source[0]
+        if not 0 <= offset < len(data):
+            raise ValueError(
+                'Field "%s" points to offset %d, outside of the %d bytes '
+                'that %s was parsed from.' % (
+                    self.field_name, offset, len(data), instance))
+        value = self.struct_type.parse_from(data[offset:])
+        if value is not None and self.struct_type.contains_pointers():
+            value.bind_source(data, offset)
+        return value
+
+    def forget(self, instance):
+        """
+        Drops the struct that this pointer has already dereferenced, if any.
+        """
+        Storable.set(self, instance, None)
+
+    def validate(self, instance, raise_exception=True):
+        # Validating the target would mean parsing it, which is exactly
+        # what pointers avoid; it's validated when it's first read instead.
+        return True
+
+    def __repr__(self):
+        attrs = (
+            "field_name",
+            "struct_type",
+            "offset_field",
+            "relative",
+        )
+
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join([
+                "%s=%s" % (attr, getattr(self, attr))
+                for attr in attrs
+            ])
+        )
+
+
+class CompressedData(object):
+    """
+    The state of a CompressedField in one instance: the compressed bytes
+    (raw) and, once they've been decompressed and parsed (or the value has
+    been set), the uncompressed bytes that raw holds (plain, or None if
+    nothing has been compressed yet). current is True while raw is known to
+    hold the field's value, which is only the case until a value that can
+    be changed in place (like a struct or a list) has been set or read.
+    """
+    __slots__ = ('raw', 'plain', 'decoded', 'current')
+
+    def __init__(self, raw, plain=None, decoded=False):
+        self.raw = raw
+        self.plain = plain
+        self.decoded = decoded
+        self.current = False
+
+
+# Values that can't be changed in place, so that a CompressedField holding
+# one only has to compress it again when it's set.
+IMMUTABLE_TYPES = (basestring, int, long, float, bool, type(None))
+
+
+class CompressedField(
+    property,
+    BinaryProperty,
+    LogicalProperty,
+    Nameable,
+    Parseable,
+    Serializable,
+    Storable
+):
+    """
+    Wraps another field (subfield) whose bytes are compressed with codec
+    (see packing_tape.compression), and optionally preceded by their
+    compressed size, in the format of length_field. Without a length_field,
+    the compressed data runs to the end of the data being parsed.
+
+    Parsing only copies the compressed bytes: they're decompressed and
+    parsed the first time the value is read. When serializing, the original
+    bytes are reused unless the value has changed.
+    """
+    def __init__(self, subfield, codec, index, length_field=None):
+        super(CompressedField, self).__init__(
+            fget=self.get, fset=self.set)
+        self.subfield = subfield
+        self.codec = codec
+        self.index = index
+        self.length_field = length_field
+        self.default = None
+
+    @property
+    def header_size(self):
+        if self.length_field is None:
+            return 0
+        return self.length_field.static_size
+
+    def get_size(self, instance):
+        return self.header_size + len(self.compressed(instance))
+
+    static_size = None
+
+    @property
+    def min_size(self):
+        return self.header_size
+
+    @property
+    def sort_order(self):
+        return self.index
+
+    def initialize_with_default(self, instance):
+        if getattr(self.subfield, 'default', None) is None:
+            Storable.set(self, instance, None)
+            return
+        self.subfield.initialize_with_default(instance)
+        Storable.set(self, instance, CompressedData(None, decoded=True))
+
+    def get(self, instance):
+        state = Storable.get(self, instance)
+        if state is None:
+            return None
+        if not state.decoded:
+            self.decode(instance, state)
+        value = self.subfield.get(instance)
+        if not isinstance(value, IMMUTABLE_TYPES):
+            # Whoever reads the value can change it without setting it.
+            state.current = False
+        return value
+
+    def set(self, instance, value):
+        if isinstance(value, CompressedData):
+            Storable.set(self, instance, value)
+            return
+        self.subfield.set(instance, value)
+        Storable.set(self, instance, CompressedData(None, decoded=True))
+
+    def decode(self, instance, state):
+        plain = self.codec.decompress(state.raw)
+        value, _ = self.subfield.parse_and_get_size(plain)
+        self.subfield.set(instance, value)
+        state.plain = plain
+        state.decoded = True
+        self.subfield.validate(instance, raise_exception=True)
+
+    def compressed(self, instance):
+        """
+        Returns the compressed bytes of this field's value in instance,
+        only compressing them again if the value has changed.
+        """
+        state = Storable.get(self, instance)
+        if state is None:
+            raise ValueError(
+                'Field "%s" of %s has no value to compress.' % (
+                    self.field_name, instance.__class__.__name__))
+        if not state.decoded or state.current:
+            return state.raw
+        plain = self.subfield.serialize(instance)
+        if plain != state.plain:
+            state.raw = self.codec.compress(plain)
+            state.plain = plain
+        state.current = isinstance(
+            self.subfield.get(instance), IMMUTABLE_TYPES)
+        return state.raw
+
+    def iter_elements(self, instance):
+        """
+        Yields the elements of the array that this field holds in instance,
+        decompressing and parsing them a piece at a time, without keeping
+        the decompressed data (or the elements) around.
+        """
+        from compression import DecompressingReader
+        from streaming import StreamBuffer, iter_elements
+
+        if not hasattr(self.subfield, 'element_steps'):
+            raise ValueError(
+                'Field "%s" does not hold an array.' % self.field_name)
+        state = Storable.get(self, instance)
+        if state is None:
+            return iter(())
+        if state.decoded:
+            return iter(self.get(instance))
+        reader = DecompressingReader(self.codec, state.raw)
+        return iter_elements(self.subfield, StreamBuffer(), reader.read)
+
+    def parse_and_get_size(self, stream):
+        if self.length_field is None:
+            header_size, length = 0, len(stream)
+        else:
+            length, header_size = self.length_field.parse_and_get_size(stream)
+        if len(stream) < header_size + length:
+            raise ValueError(
+                "Not enough data left to decode %s (needed %d bytes of "
+                "compressed data, had %d)" % (
+                    self.field_name, length, len(stream) - header_size))
+        raw = stream[header_size:header_size + length]
+        if not isinstance(raw, str):
+            raw = bytes(bytearray(raw))
+        return CompressedData(raw), header_size + length
+
+    def parse_steps(self, buffer, offset, result):
+        if self.length_field is None:
+            # The compressed data runs to the end of the stream.
+            for need in super(CompressedField, self).parse_steps(
+                    buffer, offset, result):
+                yield need
+            return
+        header_size = self.header_size
+        yield offset + header_size
+        buffer.require(offset, header_size)
+        length, _ = self.length_field.parse_and_get_size(
+            buffer.view(offset, header_size))
+        yield offset + header_size + length
+        buffer.require(offset + header_size, length)
+        raw = buffer.view(offset + header_size, length).tobytes()
+        result.append((CompressedData(raw), header_size + length))
+
+    def serialize(self, instance):
+        raw = self.compressed(instance)
+        if self.length_field is None:
+            return raw
+        return self.length_field.serialize_value(len(raw)) + raw
+
+    def validate(self, instance, raise_exception=True):
+        state = Storable.get(self, instance)
+        if state is None or not state.decoded:
+            # Compressed data is validated when it's first decompressed.
+            return True
+        return self.subfield.validate(instance, raise_exception)
+
+    def validate_value(self, value, raise_exception=True, instance='unknown'):
+        if isinstance(value, CompressedData):
+            return True
+        return self.subfield.validate_value(value, raise_exception, instance)
+
+    def describe(self):
+        return (
+            self.__class__.__name__,
+            self.codec.name,
+            None if self.length_field is None
+            else self.length_field.describe(),
+            self.subfield.describe())
+
+    def nested_struct_types(self):
+        return self.subfield.nested_struct_types()
+
+    def dump_value(self, instance):
+        if Storable.get(self, instance) is None:
+            return None
+        return self.compressed(instance)
+
+    def load_value(self, target, dumped):
+        Storable.set(
+            self, target, None if dumped is None else CompressedData(dumped))
+
+    def __repr__(self):
+        attrs = (
+            "field_name",
+            "subfield",
+            "codec",
+            "index",
+        )
+
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join([
+                "%s=%s" % (attr, getattr(self, attr))
+                for attr in attrs
+            ])
+        )
+
+
+class ParsedAlternative(object):
+    """
+    A value parsed by a SwitchField, along with the subfield that parsed
+    and validated it, so that setting the value doesn't have to find (and
+    validate against) the right subfield all over again.
+    """
+    __slots__ = ('subfield', 'value')
+
+    def __init__(self, subfield, value):
+        self.subfield = subfield
+        self.value = value
+
+    def __repr__(self):
+        return "<%s %r from %s>" % (
+            self.__class__.__name__, self.value, self.subfield)
+
+
+def parsed_value(value):
+    """
+    Returns the value that a SwitchField parsed, without its subfield.
+    """
+    while isinstance(value, ParsedAlternative):
+        value = value.value
+    return value
+
+
+def signature_by_offset(signature):
+    """
+    Turns a signature (see BinaryProperty.signature) into a dict that maps
+    (offset, size) to the values allowed there, leaving out any entries
+    whose values aren't all the same size.
+    """
+    result = {}
+    for offset, values in signature:
+        sizes = set([len(value) for value in values])
+        if len(sizes) == 1:
+            key = (offset, sizes.pop())
+            if key in result:
+                values = result[key] & values
+            result[key] = frozenset(values)
+    return result
+
+
 class SwitchField(
     property,
     BinaryProperty,
@@ -251,10 +879,18 @@ class SwitchField(
         self.subfields = subfields
         self.index = index
         self.default = default
+        self.discriminator = self.compute_discriminator()
 
     def get_size(self, instance):
         return self.get_real_type(instance).get_size(instance)
 
+    @property
+    def static_size(self):
+        sizes = set([s.static_size for s in self.subfields])
+        if len(sizes) == 1:
+            return sizes.pop()
+        return None
+
     @property
     def sort_order(self):
         return self.index
@@ -262,11 +898,18 @@ class SwitchField(
     def initialize_with_default(self, instance):
         self.set(instance, self.default)
 
+    # Each instance stores a (real type, validated) pair for this field:
+    # the subfield that holds its value and whether that value is already
+    # known to be valid, which set() clears whenever the value changes.
+    # Structs can change without being set again, so their validity is
+    # never remembered.
+
     def get_real_type(self, instance):
-        return super(SwitchField, self).get(instance)
+        choice = super(SwitchField, self).get(instance)
+        return choice[0] if choice else None
 
-    def set_real_type(self, instance, type):
-        super(SwitchField, self).set(instance, type)
+    def set_real_type(self, instance, type, validated=False):
+        super(SwitchField, self).set(instance, (type, validated))
 
     def get(self, instance):
         real_type = self.get_real_type(instance)
@@ -276,22 +919,96 @@ class SwitchField(
             return None
 
     def set(self, instance, val):
+        if isinstance(val, ParsedAlternative):
+            subfield = val.subfield
+            subfield.set(instance, val.value)
+            self.set_real_type(
+                instance, subfield,
+                not isinstance(parsed_value(val), StorageTarget))
+            return
+        super(SwitchField, self).set(instance, None)
         for subfield in self.subfields:
             if subfield.validate_value(val, raise_exception=False):
                 subfield.set(instance, val)
-                self.set_real_type(instance, subfield)
+                self.set_real_type(
+                    instance, subfield, not isinstance(val, StorageTarget))
                 return
 
+    def compute_discriminator(self):
+        """
+        Returns an (offset, size, table, others) tuple that narrows down
+        which subfields could parse some data by looking at size bytes at
+        offset: table maps those bytes to the subfields that accept them
+        (in order), and others are the subfields to try for any other bytes.
+        Built from the subfields' signatures (see packing_tape.validators),
+        or None if they don't have any.
+        """
+        signatures = [
+            signature_by_offset(subfield.signature(0))
+            for subfield in self.subfields
+        ]
+        # Discriminate on the bytes that the most subfields constrain.
+        counts = {}
+        for signature in signatures:
+            for key in signature:
+                counts[key] = counts.get(key, 0) + 1
+        if not counts:
+            return None
+        offset, size = min(counts, key=lambda key: (-counts[key], key))
+
+        others = tuple([
+            subfield
+            for subfield, signature in zip(self.subfields, signatures)
+            if (offset, size) not in signature
+        ])
+        table = {}
+        for subfield, signature in zip(self.subfields, signatures):
+            for value in signature.get((offset, size), ()):
+                table[value] = table.get(value, ()) + (subfield,)
+        order = self.subfields.index
+        for value, subfields in table.items():
+            table[value] = tuple(sorted(subfields + others, key=order))
+        return offset, size, table, others
+
+    def candidates(self, stream):
+        """
+        Returns the subfields that could parse stream, in the order
+        that they should be tried.
+        """
+        discriminator = self.discriminator
+        if discriminator is None:
+            return self.subfields
+        offset, size, table, others = discriminator
+        if len(stream) < offset + size:
+            return self.subfields
+        key = stream[offset:offset + size]
+        if not isinstance(key, str):
+            key = bytes(bytearray(key))
+        return table.get(key, others)
+
+    def signature(self, offset):
+        # Only bytes that every subfield constrains (to values of the
+        # same length) are part of the signature of the switch itself.
+        signatures = [
+            signature_by_offset(subfield.signature(offset))
+            for subfield in self.subfields
+        ]
+        common = set(signatures[0]).intersection(*signatures[1:])
+        return [
+            (o, frozenset().union(*[
+                signature[(o, size)] for signature in signatures
+            ]))
+            for o, size in sorted(common)
+        ]
+
     def parse_and_get_size(self, stream):
-        for subfield in self.subfields:
+        for subfield in self.candidates(stream):
             if len(stream) < subfield.min_size:
                 continue
             result, size = subfield.parse_and_get_size(stream)
 
-            # TODO: Expose a better API from subfields so that we don't
-            # have to do this hackety hack:
             if subfield.validate_value(result, raise_exception=False):
-                return result, size
+                return ParsedAlternative(subfield, result), size
         if all(len(stream) < subfield.min_size for subfield in self.subfields):
             raise ValueError(
                 "All subfields had minimum sizes greater than the available "
@@ -300,6 +1017,50 @@ class SwitchField(
             raise ValueError("No subfields parsed! (stream = %s)" % repr(
                 stream))
 
+    def parse_into(self, instance, view, offset):
+        # Each alternative keeps its own storage in instance, so trying
+        # one alternative doesn't disturb the storage of the others.
+        available = len(view) - offset
+        for subfield in self.candidates(view[offset:]):
+            if available < subfield.min_size:
+                continue
+            size = subfield.parse_into(instance, view, offset)
+            value = subfield.get(instance)
+            if subfield.validate_value(value, raise_exception=False):
+                self.set_real_type(
+                    instance, subfield, not isinstance(value, StorageTarget))
+                return size
+        if all(available < subfield.min_size for subfield in self.subfields):
+            raise ValueError(
+                "All subfields had minimum sizes greater than the available "
+                "data - no subfields parsed! (at offset %d)" % offset)
+        else:
+            raise ValueError(
+                "No subfields parsed! (at offset %d)" % offset)
+
+    def parse_steps(self, buffer, offset, result):
+        subfields = self.subfields
+        if self.discriminator is not None:
+            discriminator_offset, size = self.discriminator[:2]
+            yield offset + discriminator_offset + size
+            subfields = self.candidates(buffer.view(offset))
+        for subfield in subfields:
+            yield offset + subfield.min_size
+            if buffer.end < offset + subfield.min_size:
+                continue
+            parsed = []
+            try:
+                for need in subfield.parse_steps(buffer, offset, parsed):
+                    yield need
+            except (ValueError, struct_error):
+                continue
+            value, size = parsed[0]
+            if subfield.validate_value(value, raise_exception=False):
+                result.append((ParsedAlternative(subfield, value), size))
+                return
+        raise ValueError(
+            "No subfields parsed! (at offset %d of stream)" % offset)
+
     @property
     def min_size(self):
         return min([s.min_size for s in self.subfields])
@@ -307,36 +1068,79 @@ class SwitchField(
     def serialize(self, instance):
         return self.get_real_type(instance).serialize(instance)
 
-    def validate(self, instance, raise_exception=True):
+    def describe(self):
+        return (self.__class__.__name__,) + tuple([
+            subfield.describe() for subfield in self.subfields
+        ])
+
+    def nested_struct_types(self):
+        return sum([
+            subfield.nested_struct_types() for subfield in self.subfields
+        ], [])
+
+    def dump_value(self, instance):
         real_type = self.get_real_type(instance)
-        if not real_type:
+        if real_type is None:
+            return None
+        return (
+            self.subfields.index(real_type),
+            real_type.dump_value(instance))
+
+    def load_value(self, target, dumped):
+        # Loading the alternative that was chosen when parsing,
+        # rather than trying each of them in turn.
+        if dumped is None:
+            return
+        choice, value = dumped
+        real_type = self.subfields[choice]
+        real_type.load_value(target, value)
+        self.set_real_type(target, real_type)
+
+    def iter_spans(self, instance, path, offset, depth, walk):
+        return self.get_real_type(instance).iter_spans(
+            instance, path, offset, depth, walk)
+
+    def locate(self, instance, path, rest, offset, depth):
+        return self.get_real_type(instance).locate(
+            instance, path, rest, offset, depth)
+
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        real_type = self.get_real_type(a)
+        if real_type is None or real_type is not self.get_real_type(b):
+            return super(SwitchField, self).iter_changes(
+                a, b, path, offset_a, offset_b)
+        return real_type.iter_changes(a, b, path, offset_a, offset_b)
+
+    def validate(self, instance, raise_exception=True):
+        choice = super(SwitchField, self).get(instance)
+        if not choice:
             if raise_exception:
                 raise ValueError("No valid subfields found for %s" % self)
             else:
                 return False
-        val = self.get(instance)
-        return real_type.validate_value(
+        real_type, validated = choice
+        if validated:
+            return True
+        val = real_type.get(instance)
+        valid = real_type.validate_value(
             val,
             raise_exception=raise_exception,
             instance=instance)
+        if valid and not isinstance(val, StorageTarget):
+            self.set_real_type(instance, real_type, True)
+        return valid
 
     def validate_value(self, val, raise_exception=True, instance='unknown'):
+        if isinstance(val, ParsedAlternative):
+            return True
         for subfield in self.subfields:
             if subfield.validate_value(val, raise_exception=False):
-                real_type = subfield
-                break
-        else:
-            if raise_exception:
-                raise ValueError(
-                    "No valid subfields would accept value %s for %s" % (
-                        val, self))
-            else:
-                return False
-
-        return real_type.validate_value(
-            val,
-            raise_exception=raise_exception,
-            instance=instance)
+                return True
+        if raise_exception:
+            raise ValueError(
+                "No valid subfields would accept value %s for %s" % (
+                    val, self))
+        return False
 
     def __repr__(self):
         attrs = (
@@ -355,6 +1159,99 @@ class SwitchField(
         )
 
 
+class ElementList(MutableSequence):
+    """
+    The value of an ArrayField: a live view of the elements stored in one
+    instance, rather than a copy of them. Indexing and len are O(1), and
+    changes (like append or slice assignment) write through to storage.
+    """
+    def __init__(self, field, items):
+        self.field = field
+        self.items = items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        get = self.field.subfield.get
+        if isinstance(index, slice):
+            return [get(target) for target in self.items[index]]
+        return get(self.items[index])
+
+    def __iter__(self):
+        get = self.field.subfield.get
+        for target in self.items:
+            yield get(target)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.items[index] = self.field.store_elements(value)
+        else:
+            self.items[index] = self.field.store_element(value)
+
+    def __delitem__(self, index):
+        del self.items[index]
+
+    def insert(self, index, value):
+        self.items.insert(index, self.field.store_element(value))
+
+    def extend(self, values):
+        self.items.extend(self.field.store_elements(values))
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def tolist(self):
+        return list(self)
+
+    def __add__(self, other):
+        return self.tolist() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.tolist()
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ElementList)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class TypedElementList(ElementList):
+    """
+    An ElementList over the typed array that a PrimitiveArrayField stores
+    its values in, which holds the values themselves rather than targets.
+    """
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.items[index].tolist()
+        return self.items[index]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.items[index] = self.field.store_elements(value)
+        else:
+            self.items[index] = value
+
+    def insert(self, index, value):
+        self.items.insert(index, value)
+
+    def tolist(self):
+        return self.items.tolist()
+
+
 class ArrayField(
     property,
     BinaryProperty,
@@ -378,10 +1275,13 @@ class ArrayField(
         self.default = default
 
     def get_size(self, instance):
-        return sum([
-            self.subfield.get_size(target)
-            for target in super(ArrayField, self).get(instance)
-        ])
+        targets = super(ArrayField, self).get(instance)
+        static_size = self.subfield.static_size
+        if static_size is not None:
+            return static_size * len(targets)
+        return sum([self.subfield.get_size(target) for target in targets])
+
+    static_size = None
 
     @property
     def sort_order(self):
@@ -398,27 +1298,43 @@ class ArrayField(
 
     def get(self, instance):
         targets = super(ArrayField, self).get(instance)
-        return [self.subfield.get(target) for target in targets]
+        if targets is None:
+            return None
+        return ElementList(self, targets)
 
     def set(self, instance, vals):
-        if not isinstance(vals, list) and not isinstance(vals, tuple):
+        if not isinstance(vals, (list, tuple, ElementList)):
             raise ValueError(
                 "This property (%s) requires an array or tuple value." % (
                     instance))
-        # Create a new StorageTarget for each of the sub-values present.
-        self.set_storage_targets(instance, [StorageTarget() for _ in vals])
+        self.set_storage_targets(instance, self.store_elements(vals))
 
-        # Call the subfield's setter but passing each of these targets
+    def store_element(self, val):
+        """
+        Returns a new StorageTarget holding val, for use as an element.
+        """
+        # Call the subfield's setter but passing this target
         # instead of the original instance.
-        for target, val in zip(self.get_storage_targets(instance), vals):
-            self.subfield.set(target, val)
+        target = StorageTarget()
+        self.subfield.set(target, val)
+        return target
+
+    def store_elements(self, vals):
+        return [self.store_element(val) for val in vals]
 
     def parse_and_get_size(self, stream):
+        parse_array = getattr(self.subfield, 'parse_array', None)
+        if parse_array is not None:
+            return parse_array(stream)
+
+        # Slice a memoryview rather than the stream itself, to avoid
+        # copying the rest of the stream for every element.
+        view = stream if isinstance(stream, memoryview) else memoryview(stream)
         results = []
         total_size = 0
         while (total_size + self.subfield.min_size) <= len(stream):
             result, size = self.subfield.parse_and_get_size(
-                stream[total_size:])
+                view[total_size:])
 
             if not self.subfield.validate_value(result, raise_exception=False):
                 break
@@ -427,6 +1343,60 @@ class ArrayField(
             total_size += size
         return results, total_size
 
+    def parse_into(self, instance, view, offset):
+        subfield = self.subfield
+        if getattr(subfield, 'parse_array', None) is not None:
+            return super(ArrayField, self).parse_into(instance, view, offset)
+
+        # Parse into the existing elements' storage, adding more if needed.
+        targets = self.get_storage_targets(instance)
+        if targets is None:
+            targets = []
+            self.set_storage_targets(instance, targets)
+        start = offset
+        count = 0
+        end = len(view)
+        while offset + subfield.min_size <= end:
+            if count == len(targets):
+                targets.append(StorageTarget())
+            target = targets[count]
+            size = subfield.parse_into(target, view, offset)
+            if not subfield.validate_value(
+                    subfield.get(target), raise_exception=False):
+                break
+            count += 1
+            offset += size
+        del targets[count:]
+        return offset - start
+
+    def parse_steps(self, buffer, offset, result):
+        elements = []
+        for need in self.element_steps(buffer, offset, elements):
+            yield need
+        result.append((
+            [value for value, _ in elements],
+            sum([size for _, size in elements])))
+
+    def element_steps(self, buffer, offset, elements):
+        """
+        Like parse_steps, but appends (value, size) to elements as soon
+        as each element is parsed, so that they can be consumed (and removed
+        from the list) while the rest of the array is still arriving.
+        """
+        min_size = max(self.subfield.min_size, 1)
+        while True:
+            yield offset + min_size
+            if buffer.end < offset + min_size:
+                break
+            parsed = []
+            for need in self.subfield.parse_steps(buffer, offset, parsed):
+                yield need
+            value, size = parsed[0]
+            if not self.subfield.validate_value(value, raise_exception=False):
+                break
+            elements.append(parsed[0])
+            offset += size
+
     @property
     def min_size(self):
         return 0
@@ -438,26 +1408,646 @@ class ArrayField(
             for target in targets
         ])
 
+    def describe(self):
+        return (self.__class__.__name__, self.subfield.describe())
+
+    def nested_struct_types(self):
+        return self.subfield.nested_struct_types()
+
+    def dump_value(self, instance):
+        targets = self.get_storage_targets(instance)
+        if targets is None:
+            return None
+        return [self.subfield.dump_value(target) for target in targets]
+
+    def load_value(self, target, dumped):
+        if dumped is None:
+            return
+        targets = [StorageTarget() for _ in dumped]
+        for element, value in zip(targets, dumped):
+            self.subfield.load_value(element, value)
+        self.set_storage_targets(target, targets)
+
+    def iter_spans(self, instance, path, offset, depth, walk):
+        yield Span(
+            path,
+            offset,
+            offset + self.get_size(instance),
+            self,
+            self.get(instance),
+            depth,
+            None)
+        for i, target in enumerate(self.get_storage_targets(instance)):
+            if walk.end is not None and offset >= walk.end:
+                break
+            size = self.subfield.get_size(target)
+            if walk.overlaps(offset, offset + size):
+                for span in self.subfield.iter_spans(
+                        target, path + (i,), offset, depth + 1, walk):
+                    yield span
+            offset += size
+
+    def locate(self, instance, path, rest, offset, depth):
+        if not rest:
+            return super(ArrayField, self).locate(
+                instance, path, rest, offset, depth)
+        index = rest[0]
+        targets = self.get_storage_targets(instance)
+        if isinstance(index, str) or not 0 <= index < len(targets):
+            raise ValueError(
+                "Field %s has no element %s (it has %d elements)." % (
+                    format_path(path), format_path(rest[:1]), len(targets)))
+        static_size = self.subfield.static_size
+        if static_size is not None:
+            offset += static_size * index
+        else:
+            offset += sum([
+                self.subfield.get_size(target)
+                for target in targets[:index]
+            ])
+        return self.subfield.locate(
+            targets[index], path + (index,), rest[1:], offset, depth + 1)
+
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        targets_a = self.get_storage_targets(a)
+        targets_b = self.get_storage_targets(b)
+        if targets_a is targets_b:
+            return
+        for i in xrange(max(len(targets_a), len(targets_b))):
+            if i >= len(targets_b):
+                yield FieldChange(
+                    path + (i,), offset_a, None,
+                    self.subfield.get(targets_a[i]), None)
+            elif i >= len(targets_a):
+                yield FieldChange(
+                    path + (i,), None, offset_b,
+                    None, self.subfield.get(targets_b[i]))
+            else:
+                for change in self.subfield.iter_changes(
+                        targets_a[i], targets_b[i],
+                        path + (i,), offset_a, offset_b):
+                    yield change
+            if i < len(targets_a):
+                offset_a += self.subfield.get_size(targets_a[i])
+            if i < len(targets_b):
+                offset_b += self.subfield.get_size(targets_b[i])
+
     def validate(self, instance, raise_exception=True):
-        values = self.get(instance)
-        storage_targets = self.get_storage_targets(instance)
-        if values:
-            return all([
-                self.subfield.validate_value(
-                    value,
-                    raise_exception=raise_exception,
-                    instance=target)
-                for (target, value) in zip(storage_targets, values)
+        subfield = self.subfield
+        for target in self.get_storage_targets(instance) or ():
+            if not subfield.validate(target, raise_exception):
+                return False
+        return True
+
+    def __repr__(self):
+        attrs = (
+            "field_name",
+            "subfield",
+            "index",
+            "default",
+        )
+
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join([
+                "%s=%s" % (attr, getattr(self, attr))
+                for attr in attrs
             ])
+        )
+
+
+def array_typecode_for(format_string, size):
+    """
+    Returns the array module typecode that stores values of the given
+    struct format at the same size, or None if there isn't one.
+    """
+    code = format_string[-1:]
+    if not code or code not in 'bBhHiIlLqQfd':
+        return None
+    if code in 'fd':
+        candidates = code
+    elif code.isupper():
+        candidates = 'BHIL'
+    else:
+        candidates = 'bhil'
+    for candidate in candidates:
+        if array(candidate).itemsize == size:
+            return candidate
+    return None
+
+
+def needs_byteswap(format_string):
+    """
+    Whether values packed with format_string have the opposite
+    byte order to this machine's (and so to the array module's).
+    """
+    order = format_string[:1]
+    if order == '<':
+        return sys.byteorder != 'little'
+    if order in '>!':
+        return sys.byteorder != 'big'
+    return False
+
+
+class PrimitiveArrayField(ArrayField):
+    """
+    An ArrayField of fixed-size numeric subfields (see array_typecode),
+    which stores all of its values in a single typed array.array rather
+    than in a StorageTarget per element, and parses and serializes them
+    all at once. Elements are only given StorageTargets of their own
+    when something needs to look at them individually (like iter_spans).
+    """
+    def __init__(self, subfield, index, default=None):
+        super(PrimitiveArrayField, self).__init__(subfield, index, default)
+        self.typecode = subfield.array_typecode
+        self.element_size = subfield.static_size
+        self.byteswap = self.element_size > 1 and \
+            needs_byteswap(subfield.format_string)
+
+    def get_values(self, instance):
+        return Storable.get(self, instance)
+
+    def get_size(self, instance):
+        return len(self.get_values(instance)) * self.element_size
+
+    def get(self, instance):
+        values = self.get_values(instance)
+        if values is None:
+            return None
+        return TypedElementList(self, values)
+
+    def set(self, instance, vals):
+        if not isinstance(vals, (list, tuple, array, ElementList)):
+            raise ValueError(
+                "This property (%s) requires an array or tuple value." % (
+                    instance))
+        Storable.set(self, instance, self.store_elements(vals))
+
+    def store_elements(self, vals):
+        if isinstance(vals, TypedElementList):
+            vals = vals.items
+        return array(self.typecode, vals)
+
+    def element_target(self, values, i):
+        target = StorageTarget()
+        self.subfield.set(target, values[i])
+        return target
+
+    def get_storage_targets(self, instance):
+        values = self.get_values(instance)
+        return [self.element_target(values, i) for i in xrange(len(values))]
+
+    def set_storage_targets(self, instance, targets):
+        return self.set(
+            instance, [self.subfield.get(target) for target in targets])
+
+    def parse_and_get_size(self, stream):
+        values = array(self.typecode)
+        return values, self.decode_into(values, stream)
+
+    def parse_into(self, instance, view, offset):
+        values = self.get_values(instance)
+        if values is None:
+            values = array(self.typecode)
+            Storable.set(self, instance, values)
         else:
+            del values[:]
+        return self.decode_into(values, view[offset:])
+
+    def decode_into(self, values, stream):
+        """
+        Appends as many valid values from stream as possible to the (empty)
+        typed array values, returning the number of bytes that they took up.
+        """
+        count = len(stream) // self.element_size
+        data = stream[:count * self.element_size]
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        values.fromstring(data)
+        if self.byteswap:
+            values.byteswap()
+
+        validator = self.subfield.validator
+        if validator is not None and not check_all(validator, values):
+            for i, value in enumerate(values):
+                if not validator(value):
+                    del values[i:]
+                    break
+        return len(values) * self.element_size
+
+    def serialize(self, instance):
+        values = self.get_values(instance)
+        if self.byteswap:
+            values = array(self.typecode, values)
+            values.byteswap()
+        return values.tostring()
+
+    def dump_value(self, instance):
+        values = self.get_values(instance)
+        return None if values is None else values.tostring()
+
+    def load_value(self, target, dumped):
+        if dumped is None:
+            return
+        values = array(self.typecode)
+        values.fromstring(dumped)
+        Storable.set(self, target, values)
+
+    def iter_spans(self, instance, path, offset, depth, walk):
+        values = self.get_values(instance)
+        yield Span(
+            path,
+            offset,
+            offset + len(values) * self.element_size,
+            self,
+            values.tolist(),
+            depth,
+            None)
+        # Only visit the elements that lie within the walk's range.
+        size = self.element_size
+        first = max(walk.start - offset, 0) // size
+        last = len(values)
+        if walk.end is not None:
+            last = min(last, max(walk.end - offset + size - 1, 0) // size)
+        for i in xrange(first, last):
+            for span in self.subfield.iter_spans(
+                    self.element_target(values, i), path + (i,),
+                    offset + i * size, depth + 1, walk):
+                yield span
+
+    def locate(self, instance, path, rest, offset, depth):
+        if not rest:
+            return super(PrimitiveArrayField, self).locate(
+                instance, path, rest, offset, depth)
+        index = rest[0]
+        values = self.get_values(instance)
+        if isinstance(index, str) or not 0 <= index < len(values):
+            raise ValueError(
+                "Field %s has no element %s (it has %d elements)." % (
+                    format_path(path), format_path(rest[:1]), len(values)))
+        return self.subfield.locate(
+            self.element_target(values, index), path + (index,), rest[1:],
+            offset + index * self.element_size, depth + 1)
+
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        values_a = self.get_values(a)
+        values_b = self.get_values(b)
+        if values_a == values_b:
+            return
+        size = self.element_size
+        for i in xrange(max(len(values_a), len(values_b))):
+            if i >= len(values_b):
+                yield FieldChange(
+                    path + (i,), offset_a + i * size, None,
+                    values_a[i], None)
+            elif i >= len(values_a):
+                yield FieldChange(
+                    path + (i,), None, offset_b + i * size,
+                    None, values_b[i])
+            elif values_a[i] != values_b[i]:
+                for change in self.subfield.iter_changes(
+                        self.element_target(values_a, i),
+                        self.element_target(values_b, i),
+                        path + (i,), offset_a + i * size,
+                        offset_b + i * size):
+                    yield change
+
+    def validate(self, instance, raise_exception=True):
+        validator = self.subfield.validator
+        if validator is None:
+            # A typed array can't hold None, so every value is valid.
+            return True
+        values = self.get_values(instance)
+        if check_all(validator, values):
+            return True
+        validate_value = self.subfield.validate_value
+        for value in values:
+            if not validate_value(
+                    value, raise_exception=raise_exception, instance=instance):
+                return False
+        return True
+
+
+class Int24Field(ByteAlignedStructField):
+    """
+    A three-byte integer, which the struct module has no format for.
+    """
+    integral = True
+
+    def __init__(
+        self,
+        signed,
+        endianness,
+        index,
+        default=0,
+        validate=None
+    ):
+        super(Int24Field, self).__init__(
+            format_string='3s',
+            size=3,
+            signed=signed,
+            endianness=endianness,
+            index=index,
+            default=default,
+            validate=validate)
+
+    def parse_and_get_size(self, stream):
+        return self.from_fused(unpack_from('3s', stream, 0)[0]), 3
+
+    @property
+    def fused_format(self):
+        return None, '3s'
+
+    def column_format(self):
+        return '<i' if self.signed else '<I'
+
+    def from_fused(self, value):
+        if self.endianness == Little:
+            value = value[::-1]
+        result = (ord(value[0]) << 16) | (ord(value[1]) << 8) | ord(value[2])
+        if self.signed and result & 0x800000:
+            result -= 0x1000000
+        return result
+
+    def serialize_value(self, value):
+        if self.signed and value < 0:
+            value += 0x1000000
+        if not 0 <= value <= 0xFFFFFF:
+            raise struct_error(
+                "Field %s cannot hold %s in 3 bytes." % (self.field_name, value))
+        data = chr(value >> 16) + chr((value >> 8) & 0xFF) + chr(value & 0xFF)
+        if self.endianness == Little:
+            data = data[::-1]
+        return data
+
+
+def checksum_algorithm(name):
+    """
+    Returns an (update, initial value) pair for a checksum algorithm, where
+    update(data, value) continues a checksum with more data.
+    """
+    import zlib
+    algorithms = {
+        'crc32': (zlib.crc32, 0),
+        'adler32': (zlib.adler32, 1),
+    }
+    if name not in algorithms:
+        raise ValueError(
+            "Unknown checksum algorithm %r (expected one of %s)." % (
+                name, ", ".join(sorted(algorithms))))
+    return algorithms[name]
+
+
+# Python 2's zlib can't read memoryviews, so checksums of data in them are
+# computed from copies of this much of the data at a time.
+CHECKSUM_CHUNK_SIZE = 64 * 1024
+
+
+def checksum_pieces(data, start, end):
+    """
+    Returns the bytes of data between start and end as pieces that zlib
+    can read, without copying them unless data is a memoryview (in which
+    case they're copied a chunk at a time, rather than all at once).
+    """
+    if isinstance(data, memoryview):
+        return (
+            data[piece:min(piece + CHECKSUM_CHUNK_SIZE, end)].tobytes()
+            for piece in xrange(start, end, CHECKSUM_CHUNK_SIZE)
+        )
+    return [buffer(data, start, end - start)]
+
+
+class ChecksumField(ByteAlignedStructField):
+    """
+    A four-byte checksum (computed with algorithm) of the bytes of the
+    fields from over[0] to over[1] inclusive, or if over is None, of every
+    field before this one. The checksum is computed as the covered fields
+    are serialized, and checked against the parsed data when parsing
+    (unless verify is False, for input that's trusted).
+    """
+    def __init__(
+        self,
+        algorithm,
+        over,
+        endianness,
+        index,
+        verify=True
+    ):
+        super(ChecksumField, self).__init__(
+            format_string=(
+                (LITTLE_ENDIAN if endianness is Little else BIG_ENDIAN) +
+                'I'),
+            size=4,
+            signed=False,
+            endianness=endianness,
+            index=index)
+        self.update, self.initial = checksum_algorithm(algorithm)
+        self.algorithm = algorithm
+        self.over = over
+        self.verify = verify
+
+    schema_attributes = \
+        ByteAlignedStructField.schema_attributes + ('algorithm', 'over')
+
+    def covered_range(self, binary_properties):
+        """
+        Returns the indices of the first and last of binary_properties
+        (a struct's list of (name, property) pairs) that this covers.
+        """
+        names = [name for name, _ in binary_properties]
+        if self.over is None:
+            return 0, names.index(self.field_name) - 1
+        first, last = self.over
+        for name in (first, last):
+            if name not in names:
+                raise ValueError(
+                    'Checksum "%s" covers field "%s", which does not exist.'
+                    % (self.field_name, name))
+        return names.index(first), names.index(last)
+
+    def compute(self, pieces):
+        """
+        Returns the checksum of the strings (or buffers) in pieces.
+        """
+        value = self.initial
+        for piece in pieces:
+            value = self.update(piece, value)
+        return value & 0xFFFFFFFF
+
+    # Checksums are checked against the data they were parsed from (see
+    # Struct.verify_checksums), rather than the current values of the fields
+    # they cover, which is remembered until the checksum is set again.
+
+    def record_match(self, instance, matches):
+        instance._struct_values[(hash(self), 'matches')] = matches
+
+    def set(self, instance, value):
+        super(ChecksumField, self).set(instance, value)
+        instance._struct_values.pop((hash(self), 'matches'), None)
+
+    def validate(self, instance, raise_exception=True):
+        values = getattr(instance, '_struct_values', {})
+        if values.get((hash(self), 'matches'), True):
             return True
+        if raise_exception:
+            raise ValueError(
+                'Checksum "%s" does not match the data that %s was parsed '
+                'from.' % (self.field_name, instance))
+        return False
+
+
+class VarintField(
+    property,
+    BinaryProperty,
+    LogicalProperty,
+    Validatable,
+    Nameable,
+    Parseable,
+    Serializable,
+    Storable
+):
+    """
+    A variable-length (LEB128) integer, as used by protobuf and DWARF:
+    seven bits per byte, least significant group first, with the top bit
+    of each byte set if more bytes follow. Signed varints are either
+    zigzag-encoded (like protobuf's sint types) or use signed LEB128.
+    """
+
+    # No 64-bit value needs more than 10 bytes; anything
+    # longer than that is garbage rather than a varint.
+    max_size = 10
+    min_size = 1
+    static_size = None
+
+    def __init__(
+        self,
+        index,
+        signed=False,
+        zigzag=True,
+        default=0,
+        validate=None
+    ):
+        super(VarintField, self).__init__(
+            fget=self.get, fset=self.set)
+        self.index = index
+        self.signed = signed
+        self.zigzag = zigzag
+        self.default = default
+        self.validator = compile_validator(validate, integral=True)
+
+    schema_attributes = ('signed', 'zigzag')
+
+    def column_format(self):
+        return '<q' if self.signed else '<Q'
+
+    @property
+    def sort_order(self):
+        return self.index
+
+    def initialize_with_default(self, instance):
+        self.set(instance, self.default)
+
+    def get_size(self, instance):
+        return len(self.serialize_value(self.get(instance)))
+
+    def decode(self, data, offset):
+        """
+        Decodes a varint from data (a bytearray) at offset,
+        returning (value, offset just past the varint).
+        """
+        result = 0
+        shift = 0
+        limit = min(len(data), offset + self.max_size)
+        position = offset
+        while position < limit:
+            byte = data[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        else:
+            raise ValueError(
+                "Field %s contains an unterminated varint." % (
+                    self.field_name))
+
+        if self.signed:
+            if self.zigzag:
+                result = (result >> 1) ^ -(result & 1)
+            elif byte & 0x40:
+                result -= 1 << shift
+        return result, position
+
+    def parse_and_get_size(self, stream):
+        value, size = self.decode(bytearray(stream[:self.max_size]), 0)
+        return value, size
+
+    def parse_array(self, stream):
+        """
+        Decodes as many varints as possible from stream at once,
+        stopping at the first invalid one. Returns (values, size).
+        """
+        data = bytearray(stream)
+        decode = self.decode
+        validator = self.validator
+        values = []
+        offset = 0
+        end = len(data)
+        while offset < end:
+            try:
+                value, next_offset = decode(data, offset)
+            except ValueError:
+                break
+            if validator is not None and not validator(value):
+                break
+            values.append(value)
+            offset = next_offset
+        return values, offset
+
+    def parse_steps(self, buffer, offset, result):
+        size = 1
+        while True:
+            yield offset + size
+            buffer.require(offset, size)
+            if not ord(buffer.view(offset + size - 1, 1).tobytes()) & 0x80:
+                break
+            if size == self.max_size:
+                raise ValueError(
+                    "Field %s contains an unterminated varint." % (
+                        self.field_name))
+            size += 1
+        result.append(self.parse_and_get_size(buffer.view(offset, size)))
+
+    def serialize_value(self, value):
+        if self.signed:
+            if self.zigzag:
+                value = (value << 1) if value >= 0 else ((-value) << 1) - 1
+            else:
+                data = []
+                while True:
+                    byte = value & 0x7F
+                    value >>= 7
+                    if (value == 0 and not byte & 0x40) or \
+                            (value == -1 and byte & 0x40):
+                        data.append(chr(byte))
+                        return ''.join(data)
+                    data.append(chr(byte | 0x80))
+        if value < 0:
+            raise ValueError(
+                "Field %s cannot hold negative values." % self.field_name)
+        data = []
+        while value > 0x7F:
+            data.append(chr((value & 0x7F) | 0x80))
+            value >>= 7
+        data.append(chr(value))
+        return ''.join(data)
 
     def __repr__(self):
         attrs = (
             "field_name",
-            "subfield",
+            "signed",
+            "zigzag",
             "index",
-            "default",
         )
 
         return "<%s %s>" % (
@@ -469,6 +2059,50 @@ class ArrayField(
         )
 
 
+class FusedFields(object):
+    """
+    A run of adjacent fixed-size fields that share a byte order, which
+    are parsed all at once with a single precompiled struct.Struct.
+    """
+    def __init__(self, fields):
+        orders = [p.fused_format[0] for _, p in fields if p.fused_format[0]]
+        self.fields = fields
+        self.format = CompiledFormat(
+            (orders[0] if orders else '<') +
+            ''.join([p.fused_format[1] for _, p in fields]))
+        self.size = self.format.size
+        self.outputs = [
+            (name, p.from_fused)
+            for name, p in fields
+            if p.produces_value
+        ]
+        self.storage_outputs = [
+            (hash(p), p.from_fused)
+            for _, p in fields
+            if p.produces_value
+        ]
+
+    def unpack_into(self, kwargs, data, offset):
+        values = self.format.unpack_from(data, offset)
+        for (name, convert), value in zip(self.outputs, values):
+            kwargs[name] = value if convert is None else convert(value)
+
+    def store_into(self, storage, data, offset):
+        """
+        Like unpack_into, but writes the values straight into a struct's
+        storage (see Storable), bypassing the fields' setters.
+        """
+        values = self.format.unpack_from(data, offset)
+        for (key, convert), value in zip(self.storage_outputs, values):
+            storage[key] = value if convert is None else convert(value)
+
+    def __repr__(self):
+        return "<%s format=%s fields=%s>" % (
+            self.__class__.__name__,
+            self.format.format,
+            [name for name, _ in self.fields])
+
+
 class Empty(property, DummyProperty, Serializable, Storable):
     def __init__(self, index, size):
         super(Empty, self).__init__(
@@ -481,12 +2115,41 @@ class Empty(property, DummyProperty, Serializable, Storable):
     def initialize_with_default(self, instance):
         pass
 
+    schema_attributes = ('size',)
+
+    def column_format(self):
+        return '%dx' % self.size
+
+    def dump_value(self, instance):
+        return None
+
+    def load_value(self, target, dumped):
+        pass
+
     def serialize(self, instance):
         return "\x00" * self.size
 
+    def iter_spans(self, instance, path, offset, depth, walk):
+        data = None
+        if walk.serialize:
+            # Only materialize the zeroes that were actually asked for.
+            first = max(walk.start, offset)
+            last = offset + self.size
+            if walk.end is not None:
+                last = min(walk.end, last)
+            data = "\x00" * max(last - first, 0)
+        yield Span(
+            path, offset, offset + self.size, self, None, depth, data)
+
     def parse_and_get_size(self, instance):
         return None, self.size
 
+    @property
+    def fused_format(self):
+        return None, '%dx' % self.size
+
+    produces_value = False
+
     @property
     def min_size(self):
         return self.size
@@ -497,7 +2160,23 @@ class Bit(object):
 
     def __init__(self, default=False, validate=None):
         self.default = default
-        self.validator = validate
+        self.validator = compile_validator(validate, integral=True)
+
+
+class Bits(Bit):
+    """
+    An unsigned integer made up of `size` adjacent bits of a Bitfield.
+    """
+
+    def __init__(self, size, default=0, validate=None):
+        if size < 1:
+            raise ValueError("Bits must be at least one bit wide.")
+        if not 0 <= default < (1 << size):
+            raise ValueError(
+                "Default value %s does not fit in %d bits." % (default, size))
+        self.size = size
+        self.default = default
+        self.validator = compile_validator(validate, integral=True)
 
 
 class FieldProxy(property, LogicalProperty, Nameable):
@@ -513,15 +2192,26 @@ class ProxyTarget:
 
 
 class BitProxy(FieldProxy, Validatable):
-    def __init__(self, parent, bit_index, default=False, validate=None):
+    def __init__(
+        self,
+        parent,
+        bit_index,
+        default=False,
+        validate=None,
+        width=1
+    ):
         super(BitProxy, self).__init__(
             fget=self.get,
             fset=self.set)
         self.parent = parent
         self.bit_index = bit_index
-        self.bitmask = 1 << (7 - self.bit_index)
+        self.width = width
+        # Bit 0 is the most significant bit of the parent's integer value.
+        self.shift = parent.field_count - bit_index - width
+        self.max_value = (1 << width) - 1
+        self.bitmask = self.max_value << self.shift
         self.default = default
-        self.validator = validate
+        self.validator = compile_validator(validate, integral=True)
 
     size = 1
 
@@ -529,33 +2219,63 @@ class BitProxy(FieldProxy, Validatable):
     def index(self):
         return self.parent.index
 
+    def from_int(self, value):
+        """
+        Extracts this member's value from the parent Bitfield's integer.
+        """
+        if self.width == 1:
+            return bool(value & self.bitmask)
+        return (value & self.bitmask) >> self.shift
+
     def get(self, instance):
         value = self.parent.get(instance)
-        if isinstance(value, str):
-            asint = ord(value)
-        else:
-            asint = value
-        return bool(asint & self.bitmask)
+        if value is None:
+            # The bitfield wasn't parsed (see Struct.parse_projected).
+            return None
+        return self.from_int(value)
 
     def set(self, instance, value):
-        existing_field_value = self.parent.get(instance)
-        existing_field_value &= ~self.bitmask
-        if value:
-            existing_field_value |= self.bitmask
-        return self.parent.set(instance, existing_field_value)
+        value = int(value)
+        if not 0 <= value <= self.max_value:
+            raise ValueError(
+                "Value %s does not fit in the %d bit(s) of %s." % (
+                    value, self.width, self.field_name))
+        existing_field_value = self.parent.get(instance) & ~self.bitmask
+        return self.parent.set(
+            instance, existing_field_value | (value << self.shift))
+
 
+BITFIELD_FORMATS = {
+    1: 'B',
+    2: 'H',
+    4: 'I',
+    8: 'Q',
+}
 
-class Bitfield(property, ProxyTarget, BinaryProperty, Parseable,
-               Serializable,
+
+class Bitfield(property, ProxyTarget, BinaryProperty, Validatable,
+               Parseable, Serializable,
                Storable, Nameable):
-    size = 1
-    min_size = 1
-    field_count = 8
+    validator = None
 
-    def __init__(self, index, *members):
+    def __init__(self, index, *members, **kwargs):
         super(Bitfield, self).__init__(
             fget=self.get,
             fset=self.set)
+        size = kwargs.pop('size', 1)
+        endianness = kwargs.pop('endianness', Little)
+        if kwargs:
+            raise TypeError(
+                "Unexpected keyword arguments to Bitfield: %s" % (
+                    ", ".join(sorted(kwargs))))
+        if size not in BITFIELD_FORMATS:
+            raise ValueError("Bitfield size must be 1, 2, 4 or 8 bytes.")
+        self.size = size
+        self.field_count = size * 8
+        self.endianness = endianness
+        self.format_string = (
+            ('<' if endianness is Little else '>') + BITFIELD_FORMATS[size])
+        self.compiled = CompiledFormat(self.format_string)
         if sum([m.size for m in members]) != self.field_count:
             raise ValueError(
                 "Members passed to Bitfield must sum to %d "
@@ -565,38 +2285,152 @@ class Bitfield(property, ProxyTarget, BinaryProperty, Parseable,
         self.members = members
         self.index = index
 
+        # Each member's offset in bits from the most significant bit.
+        self.layout = []
+        bit_index = 0
+        for member in members:
+            if not isinstance(member, (Bit, Empty)):
+                raise TypeError(
+                    "Bitfield members must be bits or empty space "
+                    "(got: %s)." % (member,))
+            self.layout.append((bit_index, member))
+            bit_index += member.size
+
+    @property
+    def min_size(self):
+        return self.size
+
     @property
     def sort_order(self):
         return self.index
 
     def parse_and_get_size(self, stream):
-        return (unpack_from('B', stream, 0)[0], self.size)
+        return (self.compiled.unpack_from(stream, 0)[0], self.size)
+
+    def parse_array(self, stream):
+        """
+        Unpacks as many whole bitfields as fit in stream in one call,
+        returning (values, size).
+        """
+        count = len(stream) // self.size
+        values = list(unpack_from(
+            '%s%d%s' % (self.format_string[0], count, self.format_string[1]),
+            stream, 0))
+        return values, count * self.size
 
-    def serialize(self, instance):
-        return pack('B', self.get(instance))
+    @property
+    def fused_format(self):
+        if self.size > 1:
+            return self.format_string[0], self.format_string[1:]
+        return None, self.format_string[1:]
+
+    def serialize_value(self, value):
+        return self.compiled.pack(value)
+
+    def column_format(self):
+        return self.format_string
+
+    @property
+    def array_typecode(self):
+        return array_typecode_for(self.format_string, self.size)
+
+    def validate_value(self, value, raise_exception=False, instance='unknown'):
+        if value is not None and not 0 <= value < (1 << self.field_count):
+            if raise_exception:
+                raise ValueError(
+                    "Value %s does not fit in %d-bit bitfield %s." % (
+                        value, self.field_count, self))
+            return False
+        return super(Bitfield, self).validate_value(
+            value, raise_exception, instance)
+
+    def describe(self):
+        return (
+            self.__class__.__name__,
+            self.format_string,
+            tuple([
+                (member.__class__.__name__, member.size,
+                 describe_validator(getattr(member, 'validator', None)))
+                for member in self.members
+            ]))
+
+    def signature(self, offset):
+        return self.literal_signature(offset)
+
+    proxies = ()
+
+    def unpack(self, value):
+        """
+        Splits an integer (like those read from an array of bitfields) into
+        a dict mapping each member's name to its value, using the masks
+        precomputed by expand.
+        """
+        return dict([
+            (proxy.field_name, proxy.from_int(value))
+            for proxy in self.proxies
+        ])
+
+    def members_of(self, instance):
+        """
+        Returns a dict of every member's value in instance, decoding the
+        underlying integer only once.
+        """
+        return self.unpack(self.get(instance))
+
+    def iter_spans(self, instance, path, offset, depth, walk):
+        data = self.serialize(instance) if walk.serialize else None
+        end = offset + self.size
+        value = self.get(instance)
+        yield Span(
+            path, offset, end, self, value, depth,
+            walk.clip(offset, data) if data is not None else None)
+        for proxy in self.proxies:
+            yield Span(
+                path[:-1] + (proxy.field_name,),
+                offset,
+                end,
+                proxy,
+                proxy.from_int(value),
+                depth,
+                None)
 
     def initialize_with_default(self, instance):
         default = 0
-        defaults = [member.default for member in self.members]
-        for i, bit_default in enumerate(defaults):
-            default <<= 1
-            default |= 1 if bit_default else 0
+        for bit_index, member in self.layout:
+            if isinstance(member, Bit):
+                shift = self.field_count - bit_index - member.size
+                default |= int(member.default) << shift
         self.set(instance, default)
 
     def __repr__(self):
-        return "<%s index=%d members=%s>" % (
+        return "<%s index=%d size=%d members=%s>" % (
             self.__class__.__name__,
             self.index,
+            self.size,
             " ".join([str(member) for member in self.members])
         )
 
+    def iter_changes(self, a, b, path, offset_a, offset_b):
+        value_a, value_b = self.get(a), self.get(b)
+        if value_a == value_b:
+            return
+        found = False
+        for proxy in self.proxies:
+            old, new = proxy.from_int(value_a), proxy.from_int(value_b)
+            if old != new:
+                found = True
+                yield FieldChange(
+                    path[:-1] + (proxy.field_name,),
+                    offset_a, offset_b, old, new)
+        if not found:
+            yield FieldChange(path, offset_a, offset_b, value_a, value_b)
+
     def expand(self):
-        results = []
-        index = 0
-        for m in self.members:
-            if isinstance(m, Bit):
-                results.append(BitProxy(self, index, m.default, m.validator))
-                index += 1
-            elif isinstance(m, Empty):
-                index += m.size
+        results = [
+            BitProxy(self, bit_index, member.default, member.validator,
+                     member.size)
+            for bit_index, member in self.layout
+            if isinstance(member, Bit)
+        ]
+        self.proxies = tuple(results)
         return results
@@ -5,11 +5,19 @@ from field_classes import ByteAlignedStructField, \
     Empty, \
     Bitfield, \
     Bit, \
+    Bits, \
     EmbeddedField, \
+    PointerField, \
+    CompressedField, \
     SwitchField, \
-    ArrayField
+    ArrayField, \
+    PrimitiveArrayField, \
+    Int24Field, \
+    ChecksumField, \
+    VarintField
 
 from bases import SpaceOccupyingProperty, BinaryProperty
+from compression import get_codec
 
 from constants import (
     Big,
@@ -20,39 +28,81 @@ from constants import (
     LITTLE_ENDIAN_SIGNED_INT,
     BIG_ENDIAN_UNSIGNED_INT,
     BIG_ENDIAN_SIGNED_INT,
+    LITTLE_ENDIAN,
+    BIG_ENDIAN,
+    UNSIGNED_SHORT,
+    SIGNED_SHORT,
+    UNSIGNED_INT,
+    SIGNED_INT,
+    UNSIGNED_LONG_LONG,
+    SIGNED_LONG_LONG,
+    FLOAT,
+    DOUBLE,
 )
 
 
+INTEGER_FORMATS = {
+    (1, False): UNSIGNED_CHAR,
+    (1, True): SIGNED_CHAR,
+    (2, False): UNSIGNED_SHORT,
+    (2, True): SIGNED_SHORT,
+    (4, False): UNSIGNED_INT,
+    (4, True): SIGNED_INT,
+    (8, False): UNSIGNED_LONG_LONG,
+    (8, True): SIGNED_LONG_LONG,
+}
+
+FLOAT_FORMATS = {
+    4: FLOAT,
+    8: DOUBLE,
+}
+
+
 def empty(size=1):
     index = infer_index_from_position()
     return Empty(index, size)
 
 
-def bit():
-    return Bit()
+def bit(default=False, validate=None):
+    return Bit(default, validate)
+
+
+def bits(size, default=0, validate=None):
+    return Bits(size, default, validate)
 
 
 def bitfield(*members, **kwargs):
+    """
+    Packs members (bit(), bits(n) and empty(n), each measured in bits,
+    most significant first) into a single integer. Pass size= (in bytes:
+    1, 2, 4 or 8) and endianness= for bitfields wider than one byte.
+    """
     index = infer_index_from_position()
-    return Bitfield(index, *members)
+    return Bitfield(index, *members, **kwargs)
 
 
-def unsigned_char():
-    index = infer_index_from_position(stack_depth=1)
+def unsigned_char(default=0, validate=None):
+    index = infer_index_from_position()
     return ByteAlignedStructField(
         index=index,
         format_string=UNSIGNED_CHAR,
         size=1,
-        signed=False)
+        signed=False,
+        endianness=Little,
+        default=default,
+        validate=validate)
 
 
-def signed_char():
-    index = infer_index_from_position(stack_depth=1)
+def signed_char(default=0, validate=None):
+    index = infer_index_from_position()
     return ByteAlignedStructField(
         index=index,
         format_string=SIGNED_CHAR,
         size=1,
-        signed=True)
+        signed=True,
+        endianness=Little,
+        default=default,
+        validate=validate)
 
 
 def little_endian_unsigned_integer(default=0, validate=None):
@@ -103,14 +153,34 @@ def big_endian_signed_integer(default=0, validate=None):
         validate=validate)
 
 
-def string(size, null_terminated=True, default='', validate=None):
+def string(
+    size,
+    null_terminated=True,
+    default='',
+    validate=None,
+    encoding=None,
+    errors='strict',
+    intern=False,
+    view=False
+):
+    """
+    A fixed-size string. Pass encoding (and errors, as for str.decode) to
+    parse unicode values, intern=True to intern repeated values, or
+    view=True to parse large blobs that aren't null terminated as
+    memoryviews instead of copies (except from streams, whose buffered data
+    is discarded once it's parsed).
+    """
     index = infer_index_from_position()
     return StringField(
         index=index,
         size=size,
         null_terminated=null_terminated,
         default=default,
-        validate=validate)
+        validate=validate,
+        encoding=encoding,
+        errors=errors,
+        intern=intern,
+        view=view)
 
 
 def embed(struct_type, default=None, validate=None):
@@ -122,6 +192,37 @@ def embed(struct_type, default=None, validate=None):
         validate=validate)
 
 
+def pointer_to(struct_type, offset_field, relative=False, null=None):
+    """
+    A struct found at the offset held by the field named offset_field,
+    which is only parsed when first read. Pass relative=True if the offset
+    counts from the start of this struct rather than the start of the data.
+    """
+    index = infer_index_from_position()
+    return PointerField(
+        struct_type,
+        offset_field,
+        index=index,
+        relative=relative,
+        null=null)
+
+
+def compressed(subtype, codec='zlib', length_field=None):
+    """
+    A field (or struct) stored compressed with codec ('zlib', 'gzip',
+    'deflate', 'bz2' or 'lzma'), preceded by its compressed size in the
+    format of length_field (like integer(size=4)) if one is given. It's
+    only decompressed when it's first read.
+    """
+    subfield = \
+        subtype if isinstance(subtype, BinaryProperty) else embed(subtype)
+    return CompressedField(
+        subfield,
+        get_codec(codec),
+        index=infer_index_from_position(),
+        length_field=length_field)
+
+
 def one_of(*types, **kwargs):
     coerced_types = [
         type if isinstance(type, BinaryProperty) else embed(type)
@@ -129,16 +230,22 @@ def one_of(*types, **kwargs):
     ]
     return SwitchField(
         coerced_types,
-        index=infer_index_from_position(stack_depth=1),
+        index=infer_index_from_position(),
         default=kwargs.get("default"))
 
 switch = one_of
 
 
 def array_of(subtype, **kwargs):
-    return ArrayField(
-        subtype if isinstance(subtype, BinaryProperty) else embed(subtype),
-        index=infer_index_from_position(stack_depth=1),
+    subfield = \
+        subtype if isinstance(subtype, BinaryProperty) else embed(subtype)
+    if getattr(subfield, 'array_typecode', None) is not None:
+        field_class = PrimitiveArrayField
+    else:
+        field_class = ArrayField
+    return field_class(
+        subfield,
+        index=infer_index_from_position(),
         default=kwargs.get("default"))
 
 array = array_of
@@ -152,18 +259,96 @@ def infer_index_from_position(stack_depth=0):
     ])
 
 
-def integer(signed=False, endianness=Little, default=0, validate=None):
+def integer(
+    signed=False,
+    endianness=Little,
+    default=0,
+    validate=None,
+    size=4
+):
+    if endianness is not Little and endianness is not Big:
+        raise ValueError("endianness must be Little or Big")
+    if size != 4:
+        return sized_integer(size, signed, endianness, default, validate)
     if signed:
         if endianness is Little:
             return little_endian_signed_integer(default, validate)
-        elif endianness is Big:
-            return big_endian_signed_integer(default, validate)
         else:
-            raise ValueError("endianness must be Little or Big")
+            return big_endian_signed_integer(default, validate)
     else:
         if endianness is Little:
             return little_endian_unsigned_integer(default, validate)
-        elif endianness is Big:
-            return big_endian_unsigned_integer(default, validate)
         else:
-            raise ValueError("endianness must be Little or Big")
+            return big_endian_unsigned_integer(default, validate)
+
+
+def sized_integer(size, signed, endianness, default=0, validate=None):
+    index = infer_index_from_position(stack_depth=1)
+    if size == 3:
+        return Int24Field(
+            index=index,
+            signed=signed,
+            endianness=endianness,
+            default=default,
+            validate=validate)
+    if (size, signed) not in INTEGER_FORMATS:
+        raise ValueError("size must be one of 1, 2, 3, 4 or 8 bytes")
+    return ByteAlignedStructField(
+        index=index,
+        format_string=(
+            (LITTLE_ENDIAN if endianness is Little else BIG_ENDIAN) +
+            INTEGER_FORMATS[(size, signed)]),
+        size=size,
+        signed=signed,
+        endianness=endianness,
+        default=default,
+        validate=validate)
+
+
+def floating_point(size=4, endianness=Little, default=0.0, validate=None):
+    index = infer_index_from_position()
+    if endianness is not Little and endianness is not Big:
+        raise ValueError("endianness must be Little or Big")
+    if size not in FLOAT_FORMATS:
+        raise ValueError("size must be 4 (float) or 8 (double) bytes")
+    return ByteAlignedStructField(
+        index=index,
+        format_string=(
+            (LITTLE_ENDIAN if endianness is Little else BIG_ENDIAN) +
+            FLOAT_FORMATS[size]),
+        size=size,
+        signed=True,
+        endianness=endianness,
+        default=default,
+        validate=validate)
+
+
+def checksum(algorithm='crc32', over=None, endianness=Little, verify=True):
+    """
+    A four-byte checksum ('crc32' or 'adler32') of the fields from over[0]
+    to over[1] (inclusive), or of every preceding field if over is None.
+    It's computed when serializing and checked when parsing, unless
+    verify is False.
+    """
+    if endianness is not Little and endianness is not Big:
+        raise ValueError("endianness must be Little or Big")
+    if isinstance(over, str):
+        over = (over, over)
+    elif over is not None:
+        over = tuple(over)
+    return ChecksumField(
+        algorithm,
+        over,
+        endianness,
+        index=infer_index_from_position(),
+        verify=verify)
+
+
+def varint(signed=False, zigzag=True, default=0, validate=None):
+    index = infer_index_from_position()
+    return VarintField(
+        index=index,
+        signed=signed,
+        zigzag=zigzag,
+        default=default,
+        validate=validate)
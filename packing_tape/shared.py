@@ -0,0 +1,181 @@
+"""
+Storage of parsed structs in memory shared between processes, so that
+worker processes can hand their results to their parent without pickling.
+
+A RecordStore is a file-backed memory map holding a fixed number of slots,
+each big enough for one serialized instance of a struct with a static size.
+Workers write instances into slots; the parent reads them back as
+RecordViews, which decode each field from the shared memory only when it's
+accessed (without copying the rest of the record).
+
+A store can be passed to a worker process like any other argument (for
+example, to multiprocessing.Pool.map): it's pickled as its path, and the
+worker maps the same file.
+"""
+
+import mmap
+import os
+import tempfile
+
+from field_classes import EmbeddedField, FieldProxy, parsed_value
+
+# On Linux, files in /dev/shm are never written to disk.
+SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def field_layout(struct_type):
+    """
+    Returns a dict of each binary property's name to its offset within
+    every instance of struct_type and the property itself.
+    """
+    def compute_field_layout():
+        return dict([
+            (name, (offset, property))
+            for name, offset, property in struct_type.static_layout()
+        ])
+    return struct_type.memoize(compute_field_layout)
+
+
+class RecordStore(object):
+    """
+    capacity instances of struct_type, stored in a memory map of the file at
+    path (or of a new temporary file, which is deleted when the store that
+    created it is closed).
+    """
+    def __init__(self, struct_type, capacity, path=None):
+        record_size = struct_type.static_size()
+        if record_size is None:
+            raise ValueError(
+                "%s has no static size, so it can't be stored in a "
+                "RecordStore." % struct_type.__name__)
+        if struct_type.contains_pointers():
+            raise ValueError(
+                "%s contains pointers, whose targets would not be stored "
+                "in a RecordStore." % struct_type.__name__)
+        if capacity < 1:
+            raise ValueError("A RecordStore must hold at least one record.")
+        self.struct_type = struct_type
+        self.capacity = capacity
+        self.record_size = record_size
+        self.owner = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(
+                prefix='packing-tape-', suffix='.records',
+                dir=SHARED_MEMORY_DIR)
+            try:
+                os.ftruncate(fd, capacity * record_size)
+                self.data = mmap.mmap(fd, capacity * record_size)
+            finally:
+                os.close(fd)
+        else:
+            with open(path, 'r+b') as f:
+                self.data = mmap.mmap(f.fileno(), capacity * record_size)
+        self.path = path
+
+    def __reduce__(self):
+        return RecordStore, (self.struct_type, self.capacity, self.path)
+
+    def __len__(self):
+        return self.capacity
+
+    def slot_offset(self, index):
+        if index < 0:
+            index += self.capacity
+        if not 0 <= index < self.capacity:
+            raise IndexError(
+                "Record %d is outside of this store (which holds %d)." % (
+                    index, self.capacity))
+        return index * self.record_size
+
+    def put(self, index, instance):
+        """
+        Stores instance (which must be an instance of struct_type) in the
+        slot at index.
+        """
+        self.put_bytes(index, instance.serialize())
+
+    def put_bytes(self, index, data):
+        """
+        Stores a serialized instance in the slot at index, as is.
+        """
+        if len(data) != self.record_size:
+            raise ValueError(
+                "Records of %s are %d bytes long (got %d bytes)." % (
+                    self.struct_type.__name__, self.record_size, len(data)))
+        offset = self.slot_offset(index)
+        self.data[offset:offset + self.record_size] = data
+
+    def __getitem__(self, index):
+        return RecordView(
+            self.struct_type, self.data, self.slot_offset(index))
+
+    def __iter__(self):
+        for index in xrange(self.capacity):
+            yield self[index]
+
+    def load(self, index):
+        """
+        Returns a copy of the record at index, parsed into a struct_type.
+        """
+        return self[index].load()
+
+    def close(self):
+        """
+        Unmaps the store (after which its views can no longer be read), and
+        deletes its file if this store created it.
+        """
+        self.data.close()
+        if self.owner and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RecordView(object):
+    """
+    A read-only view of one record of a RecordStore, whose fields are
+    decoded from shared memory each time they're accessed. Embedded structs
+    are views too, and bits of bitfields are read from their bitfield.
+    """
+    __slots__ = ('_struct_type', '_data', '_offset', '_fields')
+
+    def __init__(self, struct_type, data, offset):
+        self._struct_type = struct_type
+        self._data = data
+        self._offset = offset
+        self._fields = field_layout(struct_type)
+
+    def __getattr__(self, name):
+        property = getattr(self._struct_type, name, None)
+        if isinstance(property, FieldProxy):
+            parent = property.parent
+            return property.from_int(getattr(self, parent.field_name))
+        if name not in self._fields:
+            raise AttributeError(
+                "%s has no field %s." % (self._struct_type.__name__, name))
+        field_offset, property = self._fields[name]
+        offset = self._offset + field_offset
+        if isinstance(property, EmbeddedField):
+            return RecordView(property.struct_type, self._data, offset)
+        value, _ = property.parse_and_get_size(
+            buffer(self._data, offset, property.static_size))
+        return parsed_value(value)
+
+    def serialize(self):
+        return self._data[
+            self._offset:self._offset + self._struct_type.static_size()]
+
+    def load(self):
+        """
+        Returns a copy of this record, parsed into a struct.
+        """
+        return self._struct_type.parse_from(self.serialize())
+
+    def __repr__(self):
+        return "<%s of %s at %d>" % (
+            self.__class__.__name__, self._struct_type.__name__,
+            self._offset)
@@ -0,0 +1,207 @@
+"""
+Parsing of structs from data that arrives a piece at a time.
+
+Every field (and Struct) has a parse_steps method: a generator that, rather
+than reading data itself, yields the offset that the buffer must be filled
+up to before it can continue (or None, meaning "until the end of the data").
+Whatever is driving the parse fills the StreamBuffer as requested and then
+resumes the generator. This keeps the parsing logic independent of where
+the data comes from: the functions below drive it from blocking file-like
+objects, but any other source of data can be used in the same way.
+"""
+
+from field_classes import parsed_value
+
+
+class StreamBuffer(object):
+    """
+    Holds the data that has been read so far, addressed by its offset from
+    the start of the stream. Data that is no longer needed can be discarded,
+    after which offsets before base are no longer accessible.
+    """
+    def __init__(self):
+        self.data = bytearray()
+        self.base = 0
+        self.eof = False
+
+    @property
+    def end(self):
+        return self.base + len(self.data)
+
+    def append(self, chunk):
+        self.data.extend(chunk)
+
+    def view(self, offset, size=None):
+        start = offset - self.base
+        if size is None:
+            return memoryview(self.data)[start:]
+        return memoryview(self.data)[start:start + size]
+
+    def require(self, offset, size):
+        if self.end < offset + size:
+            raise ValueError(
+                "Not enough data left to decode (needed at least %d bytes "
+                "at offset %d, had %d)" % (size, offset, self.end - offset))
+
+    def discard(self, offset):
+        """
+        Drops any data before offset.
+        """
+        if offset > self.base:
+            del self.data[:offset - self.base]
+            self.base = offset
+
+
+def reader_for(stream):
+    if hasattr(stream, 'read'):
+        return stream.read
+    return stream.recv
+
+
+def fill(buffer, read, need):
+    """
+    Reads from the stream until buffer extends to need (or, if need is None,
+    until the end of the stream). Never reads past need, so anything after
+    the data being parsed is left in the stream.
+    """
+    while not buffer.eof and (need is None or buffer.end < need):
+        chunk = read(65536 if need is None else need - buffer.end)
+        if chunk:
+            buffer.append(chunk)
+        else:
+            buffer.eof = True
+
+
+def parse_stream(cls, stream, allow_invalid=False, raise_exception=True):
+    buffer = StreamBuffer()
+    read = reader_for(stream)
+    result = []
+    for need in cls.parse_steps(
+            buffer, 0, result, allow_invalid, raise_exception):
+        fill(buffer, read, need)
+    return result[0][0]
+
+
+def iter_stream(cls, stream):
+    buffer = StreamBuffer()
+    read = reader_for(stream)
+
+    offset = 0
+    for property_name, property in cls.binary_properties():
+        if hasattr(property, 'element_steps'):
+            break
+        result = []
+        for need in property.parse_steps(buffer, offset, result):
+            fill(buffer, read, need)
+        offset += result[0][1]
+    else:
+        raise ValueError("%s has no array fields." % cls.__name__)
+
+    for value in iter_elements(property, buffer, read, offset):
+        yield value
+
+
+def iter_elements(property, buffer, read, offset=0):
+    """
+    Yields the elements of the array property at offset, reading data with
+    read as it's needed and discarding it once each element is parsed.
+    """
+    buffer.discard(offset)
+    elements = []
+    for need in property.element_steps(buffer, offset, elements):
+        for value, size in elements:
+            offset += size
+            yield parsed_value(value)
+        del elements[:]
+        buffer.discard(offset)
+        fill(buffer, read, need)
+    for value, _ in elements:
+        yield parsed_value(value)
+
+
+class Parser(object):
+    """
+    A push-style parser for a sequence of back-to-back instances of a
+    struct: data is passed to feed() in chunks of any size, and each call
+    returns the instances that were completed by that chunk. Progress is
+    kept between calls, so no field is ever parsed more than once.
+
+    Call close() once there is no more data, to finish off any instance
+    that needs to know where the data ends (like one that ends in an array).
+    """
+    def __init__(self, struct_type, allow_invalid=False, raise_exception=True):
+        self.struct_type = struct_type
+        self.allow_invalid = allow_invalid
+        self.raise_exception = raise_exception
+
+        self.buffer = StreamBuffer()
+        self.offset = 0
+        self.steps = None
+        self.result = None
+        self.need = 0
+        self.run()
+
+    @property
+    def needed(self):
+        """
+        The number of bytes that must be fed before any more progress can be
+        made, or None if the parser needs to see the end of the data first.
+        """
+        if self.need is None:
+            return None
+        return max(self.need - self.buffer.end, 0)
+
+    @property
+    def buffered(self):
+        """
+        The number of bytes that have been fed, but not yet
+        consumed by a completed instance.
+        """
+        return self.buffer.end - self.offset
+
+    def feed(self, chunk):
+        if self.buffer.eof:
+            raise ValueError("Cannot feed a Parser after it has been closed.")
+        self.buffer.append(chunk)
+        return self.run()
+
+    def close(self):
+        self.buffer.eof = True
+        return self.run()
+
+    def run(self):
+        completed = []
+        while True:
+            if self.buffer.eof and self.buffer.end == self.offset:
+                # Nothing left, and nothing partially parsed.
+                self.steps = None
+                self.need = 0
+                break
+            if self.steps is None:
+                self.result = []
+                self.steps = self.struct_type.parse_steps(
+                    self.buffer,
+                    self.offset,
+                    self.result,
+                    self.allow_invalid,
+                    self.raise_exception)
+                self.need = 0
+
+            if not self.buffer.eof and (
+                    self.need is None or self.buffer.end < self.need):
+                break
+
+            try:
+                self.need = next(self.steps)
+            except StopIteration:
+                instance, size = self.result[0]
+                if size == 0:
+                    raise ValueError(
+                        "%s consumed no data; cannot parse a sequence "
+                        "of them." % self.struct_type.__name__)
+                completed.append(instance)
+                self.offset += size
+                self.buffer.discard(self.offset)
+                self.steps = None
+                self.need = 0
+        return completed
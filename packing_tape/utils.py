@@ -16,6 +16,28 @@ def chunks(l, n):
         yield l[i:i + n]
 
 
+def regroup(pieces, n):
+    """
+    Yield successive n-sized chunks from an iterable of strings,
+    joining or splitting the incoming pieces as necessary.
+    """
+    pending = ''
+    for piece in pieces:
+        i = 0
+        if pending:
+            i = n - len(pending)
+            pending += piece[:i]
+            if len(pending) < n:
+                continue
+            yield pending
+        while i + n <= len(piece):
+            yield piece[i:i + n]
+            i += n
+        pending = piece[i:]
+    if pending:
+        yield pending
+
+
 def colorize(i, char, colors):
     """
     Apply the colors from the colors array onto the given
@@ -36,28 +58,36 @@ def colorize(i, char, colors):
 
 
 def yield_xxd_bufs(buf, start, line_length, colors):
-    for chunk in chunks(buf, line_length):
-        hexdata = [('%02x' % ord(i)) for i in chunk]
-        header = ('%07x' % (start))
-        datastring = ' '.join([
-            ''.join([
-                colorize(start + i + j, char, colors)
-                for j, char in enumerate(hexdata[i:i + 2])
-
-            ]) if i < len(hexdata) else '    '
-            for i in range(0, line_length, 2)
-        ])
-        as_text = ''.join([
-            colorize(
-                start + i,
-                c if c in string.printable[:-5] else '.',
-                colors)
-            for i, c in enumerate(chunk)
-        ])
-        yield '{0}: {1:<39}  {2}'.format(header, datastring, as_text)
+    return yield_xxd_lines(chunks(buf, line_length), start, line_length, colors)
+
+
+def yield_xxd_lines(lines, start, line_length, colors):
+    for chunk in lines:
+        yield format_xxd_line(chunk, start, line_length, colors)
         start += line_length
 
 
+def format_xxd_line(chunk, start, line_length, colors):
+    hexdata = [('%02x' % ord(i)) for i in chunk]
+    header = ('%07x' % (start))
+    datastring = ' '.join([
+        ''.join([
+            colorize(start + i + j, char, colors)
+            for j, char in enumerate(hexdata[i:i + 2])
+
+        ]) if i < len(hexdata) else '    '
+        for i in range(0, line_length, 2)
+    ])
+    as_text = ''.join([
+        colorize(
+            start + i,
+            c if c in string.printable[:-5] else '.',
+            colors)
+        for i, c in enumerate(chunk)
+    ])
+    return '{0}: {1:<39}  {2}'.format(header, datastring, as_text)
+
+
 def to_colors_dict(colors):
     d = {}
     for (start, end), color in colors:
@@ -91,3 +121,44 @@ def as_xxd(buf, start=0, line_length=16, colors=[]):
     """
     colors = to_colors_dict(list(pre_process_color_array(colors)))
     return '\n'.join(yield_xxd_bufs(buf, start, line_length, colors))
+
+
+def iter_xxd(pieces, start=0, line_length=16, colors=[]):
+    """
+    Like as_xxd, but takes an iterable of strings (which are treated as one
+    contiguous buffer beginning at offset "start") and yields each line of
+    the hex dump as soon as enough data is available to render it.
+    """
+    colors = to_colors_dict(list(pre_process_color_array(colors)))
+    return yield_xxd_lines(
+        regroup(pieces, line_length), start, line_length, colors)
+
+
+def iter_colored_xxd(pieces, start=0, line_length=16):
+    """
+    Like iter_xxd, but takes an iterable of (string, color) pairs and
+    colors each string's bytes with its color (or not at all, if None).
+    Colors are tracked one line at a time, so memory use doesn't depend
+    on the size of the input.
+    """
+    line = []
+    line_size = 0
+    colors = {}
+    for data, color in pieces:
+        i = 0
+        while i < len(data):
+            take = min(line_length - line_size, len(data) - i)
+            if color is not None:
+                for j in xrange(line_size, line_size + take):
+                    colors[start + j] = color
+            line.append(data[i:i + take])
+            line_size += take
+            i += take
+            if line_size == line_length:
+                yield format_xxd_line(''.join(line), start, line_length, colors)
+                start += line_length
+                line = []
+                line_size = 0
+                colors = {}
+    if line:
+        yield format_xxd_line(''.join(line), start, line_length, colors)
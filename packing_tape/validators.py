@@ -0,0 +1,276 @@
+"""
+Validators that can be passed as the validate= argument to fields.
+
+Plain functions (like lambdas) work just as well as validators, but
+they're opaque: packing_tape can call them, but can't tell what they
+accept. The validators in this module describe the values they accept,
+which allows things like Struct.scan to search for them directly, lets
+SwitchField pick an alternative by looking at the data first, and lets
+arrays of numbers be checked all at once (with NumPy, if it's installed).
+
+Validators can be combined with all_of, any_of and not_ (or &, | and ~).
+"""
+
+
+# Ranges with at most this many integers in them are described by their
+# literal values when they validate integer fields, so that (for instance)
+# scan can search for them.
+MAX_LITERAL_RANGE = 256
+
+
+class Validator(object):
+    """
+    Base class for validators. literal_values is either None or the
+    complete set of values that this validator will accept.
+    """
+    literal_values = None
+
+    def __call__(self, value):
+        raise NotImplementedError("Must implement __call__!")
+
+    def values(self, integral=False):
+        """
+        Returns the complete set of values that this validator will accept
+        (or None, if it can't say), given that it's only ever passed
+        integers if integral is True.
+        """
+        return self.literal_values
+
+    def check_all(self, values):
+        """
+        Returns True if every one of values (a sequence, like a typed
+        array) is accepted. Subclasses override this with faster checks.
+        """
+        for value in values:
+            if not self(value):
+                return False
+        return True
+
+    def __and__(self, other):
+        return all_of(self, other)
+
+    def __or__(self, other):
+        return any_of(self, other)
+
+    def __invert__(self):
+        return not_(self)
+
+
+class OneOfValues(Validator):
+    def __init__(self, values):
+        self.literal_values = frozenset(values)
+
+    def __call__(self, value):
+        return value in self.literal_values
+
+    def check_all(self, values):
+        array = numpy_array(values)
+        if array is not None:
+            return bool(numpy.in1d(array, list(self.literal_values)).all())
+        return self.literal_values.issuperset(values)
+
+    def __repr__(self):
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join(sorted([repr(v) for v in self.literal_values])))
+
+
+class InRange(Validator):
+    """
+    Accepts values between low and high (inclusive). Either bound can be
+    None, to leave that end of the range open.
+    """
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def values(self, integral=False):
+        # Only a field that holds integers can't hold (say) 2.5.
+        if integral and isinstance(self.low, (int, long)) \
+                and isinstance(self.high, (int, long)) \
+                and self.high - self.low < MAX_LITERAL_RANGE:
+            return frozenset(xrange(self.low, self.high + 1))
+        return None
+
+    def __call__(self, value):
+        try:
+            return (self.low is None or value >= self.low) and \
+                (self.high is None or value <= self.high)
+        except TypeError:
+            return False
+
+    def check_all(self, values):
+        if not len(values):
+            return True
+        array = numpy_array(values)
+        try:
+            if array is not None:
+                lowest, highest = array.min(), array.max()
+            else:
+                lowest, highest = min(values), max(values)
+            return (self.low is None or lowest >= self.low) and \
+                (self.high is None or highest <= self.high)
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return "<%s %r %r>" % (self.__class__.__name__, self.low, self.high)
+
+
+class AllOf(Validator):
+    def __init__(self, validators):
+        self.validators = tuple(validators)
+        self.literal_values = self.values()
+
+    def values(self, integral=False):
+        literal = [
+            values for values in [
+                validator_values(v, integral) for v in self.validators
+            ]
+            if values is not None
+        ]
+        if not literal:
+            return None
+        # Narrow down the smallest set of values with the others.
+        return frozenset([
+            value for value in min(literal, key=len) if self(value)
+        ])
+
+    def __call__(self, value):
+        for validator in self.validators:
+            if not validator(value):
+                return False
+        return True
+
+    def check_all(self, values):
+        for validator in self.validators:
+            if not check_all(validator, values):
+                return False
+        return True
+
+    def __repr__(self):
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join([describe(v) for v in self.validators]))
+
+
+class AnyOf(Validator):
+    def __init__(self, validators):
+        self.validators = tuple(validators)
+        self.literal_values = self.values()
+
+    def values(self, integral=False):
+        literal = [validator_values(v, integral) for v in self.validators]
+        if None in literal:
+            return None
+        return frozenset().union(*literal)
+
+    def __call__(self, value):
+        for validator in self.validators:
+            if validator(value):
+                return True
+        return False
+
+    def __repr__(self):
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " ".join([describe(v) for v in self.validators]))
+
+
+class Not(Validator):
+    def __init__(self, validator):
+        self.validator = validator
+
+    def __call__(self, value):
+        return not self.validator(value)
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, describe(self.validator))
+
+
+def one_of_values(*values):
+    return OneOfValues(values)
+
+
+def equals(value):
+    return OneOfValues((value,))
+
+
+def in_range(low=None, high=None):
+    return InRange(low, high)
+
+
+def all_of(*validators):
+    return AllOf(validators)
+
+
+def any_of(*validators):
+    validators = [compile_validator(v) for v in validators]
+    if all([isinstance(v, OneOfValues) for v in validators]):
+        # A single set lookup, rather than one per validator.
+        return OneOfValues(frozenset().union(*[
+            v.literal_values for v in validators
+        ]))
+    return AnyOf(validators)
+
+
+def not_(validator):
+    return Not(validator)
+
+
+def validator_values(validator, integral=False):
+    if isinstance(validator, Validator):
+        return validator.values(integral)
+    return getattr(validator, 'literal_values', None)
+
+
+def compile_validator(validator, integral=False):
+    """
+    Returns the fastest equivalent of validator: validators that accept
+    only a handful of values (like any_of(equals(1), in_range(4, 6)) on a
+    field that holds integers, as given by integral) become a single set
+    lookup. Anything else is returned unchanged.
+    """
+    if isinstance(validator, (AllOf, AnyOf, InRange)):
+        values = validator.values(integral)
+        if values is not None:
+            return OneOfValues(values)
+    return validator
+
+
+def check_all(validator, values):
+    """
+    Returns True if validator accepts every one of values.
+    Works with plain functions, too, by calling them on each value.
+    """
+    if isinstance(validator, Validator):
+        return validator.check_all(values)
+    for value in values:
+        if not validator(value):
+            return False
+    return True
+
+
+def describe(validator):
+    if isinstance(validator, Validator):
+        return repr(validator)
+    return getattr(validator, '__name__', repr(validator))
+
+
+numpy = None
+
+
+def numpy_array(values):
+    """
+    Returns a NumPy view of values if it's a typed array and NumPy is
+    installed, or None otherwise. NumPy is only imported when first needed.
+    """
+    global numpy
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+    if not numpy or not hasattr(values, 'typecode'):
+        return None
+    return numpy.frombuffer(values, dtype=values.typecode)
@@ -12,26 +12,52 @@ except ImportError:
     AVAILABLE_COLORS = []
 
 
-from field_classes import EmbeddedField, ArrayField, FieldProxy, ProxyTarget
+from field_classes import EmbeddedField, ArrayField, ProxyTarget
 from bases import DummyProperty
 
 
-def generate_colors_and_header(obj, colorize=False, show_legend=False):
-    legend_generator = LegendGenerator(obj, colorize, show_legend)
+def generate_colors_and_header(
+    obj,
+    colorize=False,
+    show_legend=False,
+    start=0,
+    end=None
+):
+    legend_generator = LegendGenerator(
+        obj, colorize, show_legend, start, end)
     return legend_generator.colors, legend_generator.header
 
 
 class LegendGenerator(object):
-    def __init__(self, obj, colorize=False, show_legend=False):
+    """
+    Produces a color for, and a legend entry describing, each field of
+    a Struct. If start or end are passed, only fields that overlap the
+    byte range [start, end) are included.
+
+    This is done in a single pass over the struct's spans, which also
+    serializes the struct: the resulting (data, color) pairs are kept in
+    self.pieces so that the hex dump can be rendered without serializing
+    the struct a second time.
+    """
+    def __init__(
+        self,
+        obj,
+        colorize=False,
+        show_legend=False,
+        start=0,
+        end=None
+    ):
         self.obj = obj
         self.colorize = colorize
         self.show_legend = show_legend
+        self.start = start
+        self.end = end
 
-        self.offset = 0
         self.color_index = 0
 
         self._header = []
         self.colors = []
+        self.pieces = []
         self.used_positions_and_colors = {}
 
         if self.show_legend:
@@ -44,59 +70,61 @@ class LegendGenerator(object):
     def header(self):
         return "\n".join(self._header + [''])
 
-    def generate(self, obj, tab_depth=1):
-        tabs = "\t" * tab_depth
-
-        for (property_name, property) in obj.all_properties():
-            property_value = property.fget(obj)
-
-            # TODO: OH GOD WHY, WE HAVE POLYMORPHIC OBJECTS,
-            # WHY AM I CHECKING isisnstance EVERYWHERE
-            if isinstance(property, EmbeddedField):
-                if self.show_legend:
-                    self._header.append(tabs + str(property_value))
-                self.generate(property_value, tab_depth + 1)
-                continue
-
-            if isinstance(property, ArrayField):
-                if self.show_legend:
-                    self._header.append("%s%d objects:" % (
-                        tabs,
-                        len(property_value)))
-                for sub_object in property_value:
-                    self._header.append("%s%s" % (
-                        "\t" * (tab_depth + 1),
-                        sub_object))
-                    self.generate(sub_object, tab_depth + 2)
-                continue
-
-            if not isinstance(property, FieldProxy):
-                end = self.offset + property.get_size(obj)
-
-            position = (self.offset, end)
-            self.offset = end
-
-            if isinstance(property, ProxyTarget) \
-                    or isinstance(property, DummyProperty):
-                continue
-
-            existing_color = self.used_positions_and_colors.get(position)
-            if existing_color:
-                chosen_color = existing_color
-            else:
-                chosen_color = AVAILABLE_COLORS[
-                    self.color_index % len(AVAILABLE_COLORS)
-                ]
-                self.color_index += 1
-                self.used_positions_and_colors[position] = chosen_color
+    @property
+    def header_lines(self):
+        return list(self._header)
+
+    def generate(self, obj):
+        for span in obj.iter_spans(self.start, self.end, serialize=True):
+            self.add(span)
+
+    def add(self, span):
+        property = span.field
+        tabs = "\t" * span.depth
 
+        if isinstance(property, EmbeddedField):
+            if self.show_legend:
+                self._header.append(tabs + str(span.value))
+            return
+
+        if isinstance(property, ArrayField):
+            if self.show_legend:
+                self._header.append("%s%d objects:" % (
+                    tabs,
+                    len(span.value)))
+            return
+
+        if isinstance(property, ProxyTarget) \
+                or isinstance(property, DummyProperty):
+            if span.data:
+                self.pieces.append((span.data, None))
+            return
+
+        # Bit proxies have no data of their own, but share
+        # a position (and therefore a color) with their parent.
+        position = (span.start, span.end)
+        chosen_color = self.used_positions_and_colors.get(position)
+        if chosen_color is None:
+            chosen_color = AVAILABLE_COLORS[
+                self.color_index % len(AVAILABLE_COLORS)
+            ]
+            self.color_index += 1
+            self.used_positions_and_colors[position] = chosen_color
+
+        if span.data is not None:
             self.colors.append((position, chosen_color))
+            if span.data:
+                self.pieces.append((span.data, chosen_color))
 
+        if self.show_legend:
+            name = span.path[-1]
+            if not isinstance(name, str):
+                name = '[%d]' % name
             self._header.append(
                 "%s%s%s: %s%s" % (
                     tabs,
                     chosen_color,
-                    property_name,
-                    property_value,
+                    name,
+                    span.value,
                     Fore.RESET
                 ))
@@ -1,7 +1,9 @@
+from array import array as typed_array
 from unittest import TestCase
 from packing_tape import Struct
-from packing_tape.constants import Big
-from packing_tape.fields import integer, array, one_of
+from packing_tape.constants import Big, Little
+from packing_tape.fields import integer, array, one_of, floating_point, \
+    string
 
 
 class ArrayStruct(Struct):
@@ -38,3 +40,127 @@ class TestArraySwitchStruct(TestCase):
             "\x00\x00\x00\x28\x00\x00\x00\x28\x00\x00\x00\x28")
         assert valid.is_valid
         assert valid.array1 == [40, 40, 40]
+
+
+class PrimitiveArrayStruct(Struct):
+    name = string(4, null_terminated=False)
+    values = array(integer(signed=True, endianness=Big, size=2))
+
+
+class TestPrimitiveArray(TestCase):
+    data = "name\x00\x01\xFF\xFE\x01\x00"
+
+    def test_parse(self):
+        instance = PrimitiveArrayStruct.parse_from(self.data)
+        assert instance.values == [1, -2, 256]
+        assert len(instance) == 10
+        assert instance.serialize() == self.data
+
+    def test_compact_storage(self):
+        instance = PrimitiveArrayStruct.parse_from(self.data)
+        stored = PrimitiveArrayStruct.values.get_values(instance)
+        assert isinstance(stored, typed_array)
+        assert stored.itemsize == 2
+
+    def test_trailing_bytes_ignored(self):
+        instance = PrimitiveArrayStruct.parse_from(self.data + "\x07")
+        assert instance.values == [1, -2, 256]
+
+    def test_validator_stops_parsing(self):
+        valid = ArrayStruct.parse_from(
+            "\x00\x00\x00\x28\x00\x00\x00\x64\x00\x00\x00\x28")
+        assert valid.array1 == [40]
+        assert len(valid) == 4
+
+    def test_create(self):
+        instance = PrimitiveArrayStruct(name="abcd", values=(3, -3))
+        assert instance.serialize() == "abcd\x00\x03\xFF\xFD"
+        instance.values = [4]
+        assert instance.serialize() == "abcd\x00\x04"
+
+    def test_floats_and_longs(self):
+        class Samples(Struct):
+            floats = array(floating_point(size=8, endianness=Little))
+
+        class Counters(Struct):
+            counters = array(integer(size=8, endianness=Big))
+
+        samples = Samples.parse_from(Samples(floats=[0.5, -1.25]).serialize())
+        assert samples.floats == [0.5, -1.25]
+        counters = Counters.parse_from("\x00" * 7 + "\x01" + "\xFF" * 8)
+        assert counters.counters == [1, 2 ** 64 - 1]
+
+    def test_spans(self):
+        instance = PrimitiveArrayStruct.parse_from(self.data)
+        spans = list(instance.iter_spans(start=6, end=8))
+        assert [span.path for span in spans] == \
+            [("values",), ("values", 1)]
+        assert spans[-1].start == 6 and spans[-1].value == -2
+        assert instance.locate("values[2]").start == 8
+
+    def test_diff(self):
+        a = PrimitiveArrayStruct.parse_from(self.data)
+        b = PrimitiveArrayStruct(name="name", values=[1, -3, 256, 4])
+        changes = Struct.diff(a, b)
+        assert [(c.path, c.old, c.new) for c in changes] == [
+            (("values", 1), -2, -3),
+            (("values", 3), None, 4),
+        ]
+
+
+class Point(Struct):
+    x = integer(endianness=Big, size=2)
+
+
+class PointList(Struct):
+    points = array(Point)
+    values = array(integer(endianness=Big, size=2))
+
+
+class TestElementList(TestCase):
+    def test_indexing_and_len(self):
+        instance = PointList.parse_from(
+            "\x00\x01\x00\x02\x00\x03", allow_invalid=True)
+        points = instance.points
+        assert len(points) == 3
+        assert points[1].x == 2
+        assert points[-1].x == 3
+        assert [p.x for p in points[1:]] == [2, 3]
+        assert [p.x for p in points] == [1, 2, 3]
+
+    def test_write_through(self):
+        instance = PointList(points=[], values=[1, 2])
+        instance.points.append(Point(x=7))
+        instance.points.extend([Point(x=8), Point(x=9)])
+        instance.points[0] = Point(x=6)
+        del instance.points[1]
+        assert [p.x for p in instance.points] == [6, 9]
+
+        values = instance.values
+        values.append(3)
+        values[0] = 10
+        values[1:2] = [20, 21]
+        values.insert(0, 5)
+        assert instance.values == [5, 10, 20, 21, 3]
+        assert values.pop() == 3
+        assert len(instance) == 4 + 8
+        assert instance.serialize() == \
+            "\x00\x06\x00\x09\x00\x05\x00\x0A\x00\x14\x00\x15"
+
+    def test_equality(self):
+        instance = PointList(points=[], values=[1, 2])
+        assert instance.values == [1, 2]
+        assert [1, 2] == instance.values
+        assert instance.values != [1, 3]
+        assert instance.values == PointList(points=[], values=[1, 2]).values
+        assert instance.values + [3] == [1, 2, 3]
+
+    def test_assign_from_view(self):
+        a = PointList(points=[Point(x=1)], values=[1, 2])
+        b = PointList(points=a.points, values=a.values)
+        b.values[0] = 9
+        b.points.append(Point(x=2))
+        assert a.values == [1, 2]
+        assert len(a.points) == 1
+        a.values = a.values
+        assert a.values == [1, 2]
@@ -1,7 +1,7 @@
 from unittest import TestCase
 from packing_tape import Struct
 from packing_tape.constants import Big
-from packing_tape.fields import integer
+from packing_tape.fields import integer, string, one_of, array_of
 
 
 class BasicStruct(Struct):
@@ -19,3 +19,20 @@ class TestBasicStruct(TestCase):
             "\xFF\xFF\xFF\xFF\x01\x02\x03\x04")
         assert instance.int_a == 0xFFFFFFFF
         assert instance.int_b == 0x01020304
+
+
+class MixedStruct(Struct):
+    int_a = integer(signed=False, endianness=Big)
+    either = one_of(integer(signed=False, endianness=Big), string(4))
+    int_b = integer(signed=False, endianness=Big, size=2)
+    values = array_of(integer(signed=False, endianness=Big, size=2))
+
+
+class TestFieldOrder(TestCase):
+    def test_one_of_and_array_of_keep_their_position(self):
+        assert [name for name, _ in MixedStruct.binary_properties()] == \
+            ['int_a', 'either', 'int_b', 'values']
+        instance = MixedStruct.parse_from(
+            "\x00\x00\x00\x01\x00\x00\x00\x02\x00\x03\x00\x04")
+        assert (instance.int_a, instance.either, instance.int_b) == (1, 2, 3)
+        assert instance.values == [4]
@@ -1,7 +1,7 @@
 from unittest import TestCase
 from packing_tape import Struct
 from packing_tape.constants import Big
-from packing_tape.fields import integer, bitfield, bit, empty
+from packing_tape.fields import integer, bitfield, bit, bits, empty, array_of
 
 
 class BitStruct(Struct):
@@ -47,3 +47,75 @@ class TestBitStruct(TestCase):
         assert instance.bit_a is False
         assert "\xFF\xFF\xFF\xFF\x00\x00\x00\x02\x01\x02\x03\x04" == \
             instance.serialize()
+
+
+class RegisterStruct(Struct):
+    control = bitfield(
+        bit(),
+        bits(3),
+        empty(size=12),
+        bits(8, default=0x7F),
+        empty(size=7),
+        bit(),
+        size=4,
+        endianness=Big,
+    )
+
+    enabled, mode, level, ready = control.expand()
+
+
+class RegisterDump(Struct):
+    registers = array_of(bitfield(
+        bits(4),
+        bits(28),
+        size=4,
+    ))
+
+
+class TestWideBitfield(TestCase):
+    def test_defaults(self):
+        instance = RegisterStruct()
+        assert instance.control == 0x7F << 8
+        assert instance.mode == 0
+        assert instance.level == 0x7F
+        assert instance.enabled is False
+
+    def test_parse(self):
+        instance = RegisterStruct.parse_from("\xB0\x00\x12\x01")
+        assert instance.enabled is True
+        assert instance.mode == 3
+        assert instance.level == 0x12
+        assert instance.ready is True
+        assert RegisterStruct.control.members_of(instance) == {
+            'enabled': True, 'mode': 3, 'level': 0x12, 'ready': True}
+
+    def test_mutate(self):
+        instance = RegisterStruct()
+        instance.mode = 5
+        instance.ready = True
+        assert instance.serialize() == "\x50\x00\x7F\x01"
+        with self.assertRaises(ValueError):
+            instance.mode = 8
+
+    def test_endianness(self):
+        class LittleRegister(Struct):
+            flags = bitfield(bits(4), empty(size=11), bit(), size=2)
+            high, low = flags.expand()
+
+        instance = LittleRegister.parse_from("\x01\xF0")
+        assert instance.flags == 0xF001
+        assert instance.high == 0xF
+        assert instance.low is True
+
+    def test_array(self):
+        instance = RegisterDump.parse_from(
+            "\x01\x00\x00\x10\x02\x00\x00\x20\xFF")
+        assert instance.registers == [0x10000001, 0x20000002]
+        assert len(instance) == 8
+        assert instance.serialize() == "\x01\x00\x00\x10\x02\x00\x00\x20"
+
+    def test_bad_members(self):
+        with self.assertRaises(ValueError):
+            bitfield(bits(4), size=2)
+        with self.assertRaises(ValueError):
+            bitfield(bits(24), size=3)
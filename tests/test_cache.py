@@ -0,0 +1,108 @@
+import operator
+import os
+import shutil
+import tempfile
+from functools import partial
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.cache import ParseCache, schema_fingerprint
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, array_of, one_of, \
+    bitfield, bit, bits, empty
+from packing_tape.validators import equals
+
+from tests.test_exs24 import EXSFile, EXSZone
+
+MAGIC_A = 1
+MAGIC_B = 2
+
+calls = []
+
+
+def counted(value):
+    calls.append(value)
+    return value < 0x100
+
+
+class Record(Struct):
+    kind = one_of(
+        integer(endianness=Big, validate=lambda v: v == 1),
+        string(4, null_terminated=False))
+    flags = bitfield(bit(), bits(3), empty(size=4))
+    on, mode = flags.expand()
+    values = array_of(integer(endianness=Big, size=2, validate=counted))
+
+
+class TestParseCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ParseCache(os.path.join(self.directory, "cache.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        data = "\x00\x00\x00\x01\xB0\x00\x05\x00\x06"
+        first = self.cache.parse_from(Record, data)
+        del calls[:]
+        second = self.cache.parse_from(Record, data)
+        assert calls == []
+        assert second is not first
+        assert not list(Struct.diff(first, second))
+        assert second.kind == 1
+        assert second.on is True and second.mode == 3
+        assert second.values == [5, 6]
+        assert second.serialize() == data
+
+    def test_switch_alternative_is_kept(self):
+        data = "abcd\x00\x00\x01"
+        self.cache.parse_from(Record, data)
+        cached = self.cache.parse_from(Record, data)
+        assert cached.kind == "abcd"
+        assert cached.values == [1]
+
+    def test_fingerprint_follows_schema(self):
+        class Changed(Struct):
+            kind = one_of(
+                integer(endianness=Big, validate=lambda v: v == 2),
+                string(4, null_terminated=False))
+            flags = bitfield(bit(), bits(3), empty(size=4))
+            values = array_of(
+                integer(endianness=Big, size=2, validate=counted))
+
+        assert schema_fingerprint(Record) == schema_fingerprint(Record)
+        assert schema_fingerprint(Record) != schema_fingerprint(Changed)
+
+        data = "\x00\x00\x00\x01\x00\x00\x05"
+        self.cache.parse_from(Record, data)
+        assert self.cache.get(Changed, "anything") is None
+        assert self.cache.parse_from(Changed, data).kind == "\x00\x00\x00\x01"
+
+    def test_file(self):
+        filedir = os.path.realpath(os.path.dirname(__file__))
+        path = os.path.join(filedir, '68 Bell Player.exs')
+        parsed = self.cache.parse_file(EXSFile, path)
+        cached = self.cache.parse_file(EXSFile, path)
+        assert len(cached.objects) == 618
+        assert isinstance(cached.objects[1], EXSZone)
+        assert not list(Struct.diff(parsed, cached))
+        assert cached.serialize() == parsed.serialize()
+
+    def test_fingerprint_follows_validators(self):
+        def schema(validate):
+            class Checked(Struct):
+                value = integer(endianness=Big, validate=validate)
+            return schema_fingerprint(Checked)
+
+        def closing_over(limit):
+            return lambda v: v < limit
+
+        assert schema(lambda v: v == MAGIC_A) != \
+            schema(lambda v: v == MAGIC_B)
+        assert schema(closing_over(1)) != schema(closing_over(2))
+        assert schema(closing_over(1)) == schema(closing_over(1))
+        assert schema(partial(operator.eq, 1)) != \
+            schema(partial(operator.eq, 2))
+        assert schema(equals(1) & (lambda v: v > 0)) != \
+            schema(equals(1) & (lambda v: v < 0))
@@ -0,0 +1,132 @@
+import zlib
+from StringIO import StringIO
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, checksum, varint
+from packing_tape.streaming import Parser
+
+
+def crc32(data):
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+class Chunk(Struct):
+    length = integer(endianness=Big)
+    kind = string(4, null_terminated=False)
+    payload = string(8, null_terminated=False)
+    crc = checksum(over=('kind', 'payload'), endianness=Big)
+
+
+class Framed(Struct):
+    header_sum = checksum('adler32', over='body')
+    body = string(6, null_terminated=False)
+    total = checksum()
+
+
+class Trusting(Struct):
+    payload = string(4, null_terminated=False)
+    crc = checksum(verify=False)
+
+
+class Message(Struct):
+    kind = varint()
+    payload = string(4, null_terminated=False)
+    crc = checksum(endianness=Big)
+
+
+class Container(Struct):
+    magic = string(4, null_terminated=False)
+    chunk = embed(Chunk)
+
+
+class TestChecksum(TestCase):
+    def chunk_data(self):
+        return "\x00\x00\x00\x08IDATpayload!" + \
+            ("%08x" % crc32("IDATpayload!")).decode('hex')
+
+    def test_serialize(self):
+        chunk = Chunk(length=8, kind="IDAT", payload="payload!", crc=0)
+        assert chunk.serialize() == self.chunk_data()
+        assert chunk.crc == crc32("IDATpayload!")
+
+    def test_parse(self):
+        chunk = Chunk.parse_from(self.chunk_data())
+        assert chunk.payload == "payload!"
+        assert chunk.is_valid
+
+    def test_mismatch(self):
+        corrupt = self.chunk_data().replace("pay", "PAY")
+        with self.assertRaises(ValueError):
+            Chunk.parse_from(corrupt)
+        assert Chunk.parse_from(corrupt, raise_exception=False) is None
+        chunk = Chunk.parse_from(corrupt, allow_invalid=True)
+        assert not chunk.is_valid
+        chunk.serialize()
+        assert chunk.is_valid
+
+    def test_embedded(self):
+        data = "PNG!" + self.chunk_data()
+        assert Container.parse_from(data).chunk.kind == "IDAT"
+        with self.assertRaises(ValueError):
+            Container.parse_from(data.replace("IDAT", "IEND"))
+
+    def test_parse_into(self):
+        chunk = Chunk.parse_from(self.chunk_data())
+        assert chunk.parse_into("junk" + self.chunk_data(), 4) == 20
+        corrupt = self.chunk_data()[:-1] + "\x00"
+        assert chunk.parse_into(corrupt, raise_exception=False) is None
+
+    def message_data(self):
+        return "\x05ping" + ("%08x" % crc32("\x05ping")).decode('hex')
+
+    def test_stream(self):
+        assert Message.parse_stream(StringIO(self.message_data())).kind == 5
+        corrupt = self.message_data().replace("ping", "pong")
+        with self.assertRaises(ValueError):
+            Message.parse_stream(StringIO(corrupt))
+        message = Message.parse_stream(StringIO(corrupt), allow_invalid=True)
+        assert not message.is_valid
+
+    def test_parser(self):
+        corrupt = self.message_data().replace("ping", "pong")
+        parser = Parser(Message, raise_exception=False)
+        message, rejected = parser.feed(self.message_data() + corrupt)
+        assert message.payload == "ping"
+        assert rejected is None
+        with self.assertRaises(ValueError):
+            Parser(Message).feed(corrupt)
+
+    def test_checksums_before_and_after(self):
+        framed = Framed(header_sum=0, body="abcdef", total=0)
+        data = framed.serialize()
+        body_sum = zlib.adler32("abcdef") & 0xFFFFFFFF
+        assert data[:4] == ("%08x" % body_sum).decode('hex')[::-1]
+        assert framed.total == crc32(data[:10])
+        assert Framed.parse_from(data).body == "abcdef"
+
+    def test_skip_verification(self):
+        trusted = Trusting.parse_from("abcd\x00\x00\x00\x00")
+        assert trusted.crc == 0
+        assert trusted.is_valid
+
+    def test_nested(self):
+        class Nested(Struct):
+            outer = checksum(over=('a', 'c'), endianness=Big)
+            a = string(2, null_terminated=False)
+            inner = checksum(over=('b', 'c'), endianness=Big)
+            b = string(2, null_terminated=False)
+            c = string(2, null_terminated=False)
+
+        assert [index for index, _, _ in Nested.checksum_plan()] == [2, 0]
+        data = Nested(a="ab", b="cd", c="ef").serialize()
+        assert data[6:10] == ("%08x" % crc32("cdef")).decode('hex')
+        assert data[:4] == ("%08x" % crc32(data[4:])).decode('hex')
+        assert Nested.parse_from(data).c == "ef"
+
+    def test_covering_each_other(self):
+        with self.assertRaises(ValueError):
+            class Circular(Struct):
+                first = checksum(over=('a', 'second'))
+                a = string(2, null_terminated=False)
+                second = checksum(over=('first', 'a'))
@@ -0,0 +1,180 @@
+import csv
+import sys
+import types
+from StringIO import StringIO
+from struct import unpack_from
+from unittest import TestCase, skipIf
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, empty, \
+    bitfield, bit, bits, varint
+from packing_tape.columns import read_npy_header
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ObjectHeader(Struct):
+    kind = integer(endianness=Big, size=2)
+    name = string(4, null_terminated=False)
+
+
+class Sample(Struct):
+    object_header = embed(ObjectHeader)
+    flags = bitfield(bit(), bits(7))
+    padding = empty(1)
+    level = integer(signed=True, size=2)
+
+
+class Sampler(Struct):
+    samples = array_of(Sample)
+
+
+class Odd(Struct):
+    offset = integer(size=3)
+    count = varint()
+
+
+class Odds(Struct):
+    odds = array_of(Odd)
+
+
+class Levels(Struct):
+    levels = array_of(integer(endianness=Big, size=2))
+
+
+def sampler(count):
+    return Sampler(samples=[
+        Sample(
+            object_header=ObjectHeader(kind=i, name="s%03d" % i),
+            flags=i % 256,
+            level=-i)
+        for i in xrange(count)
+    ])
+
+
+class TestColumns(TestCase):
+    def test_npy_fixed_layout(self):
+        instance = sampler(5)
+        sink = StringIO()
+        assert instance.export_columns('samples', sink, chunk_size=2) == 5
+        data = sink.getvalue()
+        header, start = read_npy_header(data)
+        assert start % 64 == 0
+        assert header['shape'] == (5,)
+        assert header['descr'] == [
+            ('object_header.kind', '>u2'),
+            ('object_header.name', '|S4'),
+            ('flags', '|u1'),
+            ('', '|V1'),
+            ('level', '<i2'),
+        ]
+        assert data[start:] == "".join([
+            sample.serialize() for sample in instance.samples])
+
+    def test_npy_packed_rows(self):
+        instance = Odds(odds=[Odd(offset=70000, count=3), Odd(count=2 ** 40)])
+        sink = StringIO()
+        instance.export_columns('odds', sink)
+        header, start = read_npy_header(sink.getvalue())
+        assert header['descr'] == [('offset', '<u4'), ('count', '<u8')]
+        assert unpack_from('<IQIQ', sink.getvalue(), start) == \
+            (70000, 3, 0, 2 ** 40)
+
+    def test_npy_primitive_array(self):
+        instance = Levels(levels=[1, 2, 0x0102])
+        sink = StringIO()
+        instance.export_columns('levels', sink, chunk_size=2)
+        header, start = read_npy_header(sink.getvalue())
+        assert header['descr'] == '>u2'
+        assert sink.getvalue()[start:] == "\x00\x01\x00\x02\x01\x02"
+        assert instance.levels == [1, 2, 0x0102]
+
+    def test_csv(self):
+        sink = StringIO()
+        assert sampler(3).export_columns(
+            'samples', sink, format='csv', chunk_size=2) == 3
+        rows = list(csv.reader(StringIO(sink.getvalue())))
+        assert rows[0] == [
+            'object_header.kind', 'object_header.name', 'flags', 'level']
+        assert rows[1:] == [
+            ['0', 's000', '0', '0'],
+            ['1', 's001', '1', '-1'],
+            ['2', 's002', '2', '-2'],
+        ]
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            sampler(1).export_columns('nope', StringIO())
+        with self.assertRaises(ValueError):
+            sampler(1).export_columns('samples', StringIO(), format='xls')
+
+    @skipIf(numpy is None, "needs numpy")
+    def test_loads_with_numpy(self):
+        sink = StringIO()
+        sampler(4).export_columns('samples', sink)
+        loaded = numpy.lib.format.read_array(StringIO(sink.getvalue()))
+        assert list(loaded['level']) == [0, -1, -2, -3]
+        assert loaded['object_header.name'][2] == 's002'
+
+
+class StubField(object):
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+
+
+class StubWriter(object):
+    def __init__(self, sink, schema):
+        self.sink = sink
+        self.schema = schema
+        self.closed = False
+
+    def write_batch(self, batch):
+        self.sink.batches.append(batch)
+
+    def close(self):
+        self.closed = True
+
+
+def stub_pyarrow():
+    """
+    A stand-in for pyarrow that records what write_arrow asks of it.
+    """
+    module = types.ModuleType('pyarrow')
+    module.schema = lambda fields: [StubField(*field) for field in fields]
+    for name in ('binary', 'int16', 'uint8', 'uint16'):
+        setattr(module, name, lambda name=name: name)
+    module.array = lambda values, type: (type, list(values))
+    module.record_batch = lambda arrays, schema: arrays
+    module.ipc = types.ModuleType('pyarrow.ipc')
+    module.ipc.new_file = StubWriter
+    return module
+
+
+class TestArrow(TestCase):
+    def setUp(self):
+        self.saved = sys.modules.get('pyarrow')
+        sys.modules['pyarrow'] = stub_pyarrow()
+
+    def tearDown(self):
+        if self.saved is None:
+            del sys.modules['pyarrow']
+        else:
+            sys.modules['pyarrow'] = self.saved
+
+    def test_batches(self):
+        sink = StringIO()
+        sink.batches = []
+        assert sampler(3).export_columns(
+            'samples', sink, format='arrow', chunk_size=2) == 3
+        assert len(sink.batches) == 2
+        assert sink.batches[0] == [
+            ('uint16', [0, 1]),
+            ('binary', ['s000', 's001']),
+            ('uint8', [0, 1]),
+            ('int16', [0, -1]),
+        ]
+        assert sink.batches[1][3] == ('int16', [-2])
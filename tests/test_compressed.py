@@ -0,0 +1,154 @@
+import bz2
+import zlib
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, compressed
+from packing_tape.compression import get_codec
+from packing_tape.streaming import Parser
+
+
+class Point(Struct):
+    x = integer(endianness=Big, size=2)
+    y = integer(endianness=Big, size=2)
+
+
+class Shape(Struct):
+    name = string(8, null_terminated=False)
+    origin = embed(Point)
+
+
+class Block(Struct):
+    kind = string(4, null_terminated=False)
+    shape = compressed(embed(Shape), length_field=integer(endianness=Big))
+    points = compressed(array_of(Point), codec='bz2')
+
+
+class Packet(Struct):
+    shape = compressed(embed(Shape), length_field=integer(endianness=Big))
+
+
+def points_data(count):
+    return "".join([
+        Point(x=i % 1000, y=i % 1000 * 2).serialize()
+        for i in xrange(count)
+    ])
+
+
+class TestCompressed(TestCase):
+    shape = "triangle\x00\x01\x00\x02"
+
+    def block_data(self, points=3):
+        shape = zlib.compress(self.shape)
+        return "BLCK" + "\x00\x00\x00" + chr(len(shape)) + shape + \
+            bz2.compress(points_data(points))
+
+    def test_parse(self):
+        block = Block.parse_from(self.block_data())
+        assert block.kind == "BLCK"
+        assert block.shape.name == "triangle"
+        assert block.shape.origin.y == 2
+        assert [(p.x, p.y) for p in block.points] == [(0, 0), (1, 2), (2, 4)]
+
+    def test_lazy(self):
+        data = self.block_data()
+        block = Block.parse_from(data)
+        state = vars(block)['_struct_values'][hash(Block.shape)]
+        assert not state.decoded
+        # Untouched fields are written out exactly as they were read.
+        assert block.serialize() == data
+        assert not state.decoded
+
+        block.shape.origin.x = 7
+        assert state.decoded
+        assert block.serialize() != data
+        assert Block.parse_from(block.serialize()).shape.origin.x == 7
+
+    def test_unchanged_after_reading(self):
+        data = self.block_data()
+        block = Block.parse_from(data)
+        assert block.shape.origin.x == 1
+        assert len(block.points) == 3
+        assert block.serialize() == data
+        assert len(block) == len(data)
+
+    def test_set(self):
+        block = Block(
+            kind="BLCK",
+            shape=Shape(name="square!!", origin=Point(x=3, y=4)),
+            points=[Point(x=5, y=6)])
+        copy = Block.parse_from(block.serialize())
+        assert copy.shape.name == "square!!"
+        assert copy.points[0].y == 6
+
+    def test_iter_elements(self):
+        block = Block.parse_from(self.block_data(points=50000))
+        points = Block.points.iter_elements(block)
+        first = next(points)
+        assert (first.x, first.y) == (0, 0)
+        assert sum(1 for _ in points) == 49999
+
+    def test_invalid_data(self):
+        class Strict(Struct):
+            shape = compressed(
+                embed(Shape, validate=lambda s: s.name == "square!!"))
+
+        strict = Strict.parse_from(zlib.compress(self.shape))
+        with self.assertRaises(ValueError):
+            strict.shape
+
+    def test_codecs(self):
+        for name in ('zlib', 'gzip', 'deflate', 'bz2'):
+            codec = get_codec(name)
+            assert codec.decompress(codec.compress(self.shape)) == self.shape
+        with self.assertRaises(ValueError):
+            get_codec('rot13')
+
+    def test_unset(self):
+        class Note(Struct):
+            count = integer(endianness=Big)
+            text = compressed(string(8))
+
+        note = Note(count=1)
+        assert Note.parse_from(note.serialize()).text == ""
+        assert len(note) == len(note.serialize())
+        with self.assertRaises(ValueError):
+            len(Block(kind="BLCK", points=[]))
+
+    def test_size_is_cached(self):
+        class Note(Struct):
+            text = compressed(string(64))
+
+        subfield = Note.text.subfield
+        calls = []
+
+        def serialize(instance):
+            calls.append(instance)
+            return type(subfield).serialize(subfield, instance)
+
+        note = Note(text="hello " * 10)
+        subfield.serialize = serialize
+        try:
+            for _ in range(5):
+                len(note)
+            assert len(calls) == 1
+            assert note.text == "hello " * 10
+            len(note)
+            assert len(calls) == 1
+            note.text = "goodbye"
+            assert Note.parse_from(note.serialize()).text == "goodbye"
+            assert len(calls) == 2
+        finally:
+            del subfield.serialize
+
+    def test_streamed(self):
+        shape = zlib.compress(self.shape)
+        packet = "\x00\x00\x00" + chr(len(shape)) + shape
+        parser = Parser(Packet)
+        assert parser.feed(packet[:6]) == []
+        assert parser.needed == len(packet) - 6
+        first, = parser.feed(packet[6:] + packet[:2])
+        assert first.shape.name == "triangle"
+        second, = parser.feed(packet[2:])
+        assert second.shape.origin.y == 2
+        assert parser.close() == []
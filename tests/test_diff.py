@@ -0,0 +1,60 @@
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, one_of, \
+    bitfield, bit, empty
+
+
+class Point(Struct):
+    x = integer(signed=False, endianness=Big)
+    y = integer(signed=False, endianness=Big)
+
+
+class Label(Struct):
+    text = string(size=8, validate=lambda s: s.startswith('L'))
+
+
+class Shape(Struct):
+    flags = bitfield(empty(size=6), bit(), bit())
+    filled, visible = flags.expand()
+    origin = embed(Point)
+    points = array_of(one_of(embed(Label), embed(Point)))
+
+
+def make_shape(**kwargs):
+    values = dict(
+        filled=False,
+        visible=True,
+        origin=Point(x=1, y=2),
+        points=[Point(x=3, y=4), Label(text='Lone'), Point(x=5, y=6)])
+    values.update(kwargs)
+    return Shape(**values)
+
+
+class TestDiff(TestCase):
+    def test_identical(self):
+        assert list(Struct.diff(make_shape(), make_shape())) == []
+
+    def test_changes(self):
+        a = make_shape()
+        b = make_shape(filled=True)
+        b.origin.y = 7
+        b.points[2].x = 8
+        changes = [(c.name, c.offset_a, c.old, c.new)
+                   for c in Struct.diff(a, b)]
+        assert changes == [
+            ('filled', 0, False, True),
+            ('origin.y', 5, 2, 7),
+            ('points[2].x', 25, 5, 8),
+        ]
+
+    def test_switch_and_length_changes(self):
+        a = make_shape()
+        b = make_shape(points=[Label(text='Lone'), Point(x=3, y=4)])
+        changes = list(Struct.diff(a, b))
+        assert [c.name for c in changes] == [
+            'points[0]', 'points[1]', 'points[2]']
+        assert isinstance(changes[0].old, Point)
+        assert isinstance(changes[0].new, Label)
+        assert (changes[2].offset_a, changes[2].offset_b) == (25, None)
+        assert changes[2].new is None
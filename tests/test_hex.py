@@ -0,0 +1,77 @@
+from StringIO import StringIO
+from unittest import TestCase, skipIf
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, empty, array_of
+from packing_tape.utils import as_xxd
+from packing_tape.xxd import LegendGenerator, AVAILABLE_COLORS
+
+
+class Record(Struct):
+    int_a = integer(signed=False, endianness=Big)
+    name = string(size=12)
+
+
+class HexStruct(Struct):
+    header = integer(signed=False, endianness=Big)
+    padding = empty(size=1024)
+    records = array_of(Record)
+
+
+class TestHexRange(TestCase):
+    def setUp(self):
+        self.instance = HexStruct(
+            header=0xDEADBEEF,
+            records=[Record(int_a=i, name='record %d' % i) for i in range(8)])
+        self.data = self.instance.serialize()
+
+    def test_full_dump_unchanged(self):
+        assert self.instance.as_hex(show_legend=False) == as_xxd(self.data)
+
+    def test_iter_serialized_range(self):
+        for start, end in ((0, 4), (3, 1030), (1028, 1060), (1100, None)):
+            chunks = self.instance.iter_serialized(start, end)
+            assert "".join(c for _, c in chunks) == self.data[start:end]
+
+    def test_range(self):
+        start, end = 1028 + 16, 1028 + 48
+        dump = self.instance.as_hex(show_legend=False, start=start, end=end)
+        assert dump == as_xxd(self.data[start:end], start=start)
+        assert dump.startswith('0000414: 0000 0001 7265 636f')
+
+    def test_stream(self):
+        stream = StringIO()
+        result = self.instance.as_hex(
+            show_legend=False, start=4, end=36, stream=stream)
+        assert result is None
+        assert stream.getvalue() == as_xxd(
+            self.data[4:36], start=4) + "\n"
+
+    @skipIf(not AVAILABLE_COLORS, 'colorama is not installed')
+    def test_legend_only_includes_range(self):
+        lines = list(self.instance.iter_hex(
+            colorize=True, start=1028 + 32, end=1028 + 48))
+        legend = "\n".join(lines)
+        assert 'record 2' in legend
+        assert 'record 1' not in legend
+        assert 'header' not in legend
+
+    @skipIf(not AVAILABLE_COLORS, 'colorama is not installed')
+    def test_colorized_single_pass(self):
+        legend = LegendGenerator(self.instance, colorize=True)
+        expected = as_xxd(self.data, colors=legend.colors)
+        assert "".join(data for data, _ in legend.pieces) == self.data
+        assert self.instance.as_hex(colorize=True, show_legend=False) == \
+            expected
+
+    def test_spans(self):
+        spans = list(self.instance.iter_spans())
+        assert [s.name for s in spans[:5]] == [
+            'header',
+            'padding',
+            'records',
+            'records[0]',
+            'records[0].int_a',
+        ]
+        assert (spans[4].start, spans[4].end) == (1028, 1032)
+        assert all(s.data is None for s in spans)
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `import packing_tape` takes about 7ms on a typical machine; this leaves
+# plenty of room for slow machines while catching heavy new imports.
+IMPORT_TIME_BUDGET = 0.03
+
+LAZY_MODULES = ['packing_tape.utils', 'packing_tape.xxd', 'hashlib']
+
+
+def run(code):
+    return subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT).strip()
+
+
+class TestImports(TestCase):
+    def test_hex_dump_machinery_is_lazy(self):
+        loaded = run(
+            "import sys\n"
+            "import packing_tape\n"
+            "print(' '.join(sorted(sys.modules)))").split()
+        for module in LAZY_MODULES + ['colorama']:
+            assert module not in loaded, module
+
+        loaded = run(
+            "import sys\n"
+            "from packing_tape import Struct\n"
+            "from packing_tape.fields import integer\n"
+            "class Thing(Struct):\n"
+            "    value = integer()\n"
+            "Thing(value=1).as_hex()\n"
+            "print(' '.join(sorted(sys.modules)))").split()
+        assert 'packing_tape.xxd' in loaded
+        assert 'packing_tape.utils' in loaded
+
+    def test_import_time_budget(self):
+        best = min([
+            float(run(
+                "import time\n"
+                "start = time.time()\n"
+                "import packing_tape\n"
+                "print(time.time() - start)"))
+            for _ in xrange(5)
+        ])
+        assert best < IMPORT_TIME_BUDGET, \
+            "import packing_tape took %.1fms" % (best * 1000)
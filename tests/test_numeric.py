@@ -0,0 +1,86 @@
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big, Little
+from packing_tape.fields import integer, floating_point, varint, array_of, \
+    string
+from packing_tape.streaming import Parser
+
+
+class SizedStruct(Struct):
+    int16 = integer(size=2, signed=True, endianness=Big)
+    int24 = integer(size=3, signed=True, endianness=Little)
+    uint24 = integer(size=3, endianness=Big)
+    int64 = integer(size=8, endianness=Little)
+    single = floating_point(endianness=Big)
+    double = floating_point(size=8)
+
+
+class VarintStruct(Struct):
+    unsigned = varint()
+    zigzag = varint(signed=True)
+    leb128 = varint(signed=True, zigzag=False)
+    name = string(size=4, null_terminated=False)
+
+
+class VarintArrayStruct(Struct):
+    values = array_of(varint(validate=lambda v: v < 1000))
+
+
+class TestSizedIntegers(TestCase):
+    def test_round_trip(self):
+        instance = SizedStruct(
+            int16=-2,
+            int24=-3,
+            uint24=0x010203,
+            int64=2 ** 40 + 5,
+            single=1.5,
+            double=-0.25)
+        data = instance.serialize()
+        assert data == (
+            '\xff\xfe' '\xfd\xff\xff' '\x01\x02\x03'
+            '\x05\x00\x00\x00\x00\x01\x00\x00'
+            '\x3f\xc0\x00\x00' '\x00\x00\x00\x00\x00\x00\xd0\xbf')
+        parsed = SizedStruct.parse_from(data)
+        assert (parsed.int16, parsed.int24, parsed.uint24, parsed.int64) == \
+            (-2, -3, 0x010203, 2 ** 40 + 5)
+        assert (parsed.single, parsed.double) == (1.5, -0.25)
+
+    def test_fused_plan(self):
+        (fused, fields), = SizedStruct.parse_plan()[:1]
+        assert fused.format.format == '>h3s3s'
+        assert [name for name, _ in fields] == ['int16', 'int24', 'uint24']
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, integer, size=5)
+
+
+class TestVarints(TestCase):
+    def test_round_trip(self):
+        instance = VarintStruct(
+            unsigned=300, zigzag=-65, leb128=-123456, name='abcd')
+        data = instance.serialize()
+        assert data == '\xac\x02' '\x81\x01' '\xc0\xbb\x78' 'abcd'
+        assert len(instance) == 11
+        parsed = VarintStruct.parse_from(data)
+        assert (parsed.unsigned, parsed.zigzag, parsed.leb128) == \
+            (300, -65, -123456)
+
+    def test_unterminated(self):
+        self.assertRaises(ValueError, VarintStruct.parse_from, '\xff' * 12)
+
+    def test_incremental(self):
+        data = VarintStruct(
+            unsigned=2 ** 60, zigzag=1, leb128=-1, name='wxyz').serialize()
+        parser = Parser(VarintStruct)
+        completed = []
+        for i, char in enumerate(data):
+            # Varints are read a byte at a time; the string all at once.
+            assert parser.needed == (1 if i < len(data) - 4 else 4 - (
+                i - (len(data) - 4)))
+            completed.extend(parser.feed(char))
+        assert completed[0].unsigned == 2 ** 60
+
+    def test_array(self):
+        parsed = VarintArrayStruct.parse_from('\x01\xe7\x07\x96\x01\xe8\x07')
+        assert parsed.values == [1, 999, 150]
+        assert parsed.serialize() == '\x01\xe7\x07\x96\x01'
@@ -0,0 +1,96 @@
+import os
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, one_of
+
+from tests.test_exs24 import EXSFile
+
+
+class Header(Struct):
+    kind = integer(endianness=Big, size=2)
+    name = string(4, null_terminated=False)
+
+
+class Packet(Struct):
+    header = embed(Header)
+    payload = one_of(
+        integer(endianness=Big, size=2, validate=lambda v: v < 0x100),
+        string(2, null_terminated=False))
+    samples = array_of(
+        integer(endianness=Big, size=2, validate=lambda v: v < 0x10))
+    headers = array_of(Header)
+
+
+class TestParseInto(TestCase):
+    first = "\x00\x01abcd\x00\x07"
+    second = "\x00\x02wxyz\xFF\xFF\x00\x05\x00\x06"
+
+    def test_matches_parse_from(self):
+        instance = Packet.parse_from(self.first)
+        assert instance.parse_into(self.second) == len(self.second)
+        assert not list(Struct.diff(instance, Packet.parse_from(self.second)))
+        assert instance.header.kind == 2
+        assert instance.payload == "\xFF\xFF"
+        assert instance.samples == [5, 6]
+
+    def test_reuses_storage(self):
+        instance = Packet.parse_from(self.first + "\x01\x03ijkl")
+        header = instance.header
+        samples = Packet.samples.get_values(instance)
+        headers = Packet.headers.get_storage_targets(instance)
+        element = headers[0]
+
+        instance.parse_into("\x00\x09efgh\x00\x07\x01\x04mnop")
+        assert instance.header is header
+        assert instance.header.name == "efgh"
+        assert Packet.samples.get_values(instance) is samples
+        assert Packet.headers.get_storage_targets(instance) is headers
+        assert headers == [element]
+        assert instance.headers[0].name == "mnop"
+
+    def test_leaves_defaults_alone(self):
+        class Defaulted(Struct):
+            header = embed(Header, default=Header(kind=7, name="dflt"))
+            count = integer(endianness=Big, size=2)
+
+        instance = Defaulted(count=1)
+        assert instance.parse_into("\x00\x09efgh\x00\x02") == 8
+        assert instance.header.kind == 9
+        assert Defaulted.header.default.kind == 7
+        assert Defaulted(count=1).header.kind == 7
+        assert instance.parse_into("\x00\x03ijkl\x00\x02") == 8
+        assert instance.header.kind == 3
+
+    def test_offset(self):
+        instance = Packet.parse_from(self.first)
+        size = instance.parse_into("junk" + self.first + "\x00\x08", 4)
+        assert size == len(self.first) + 2
+        assert instance.header.name == "abcd"
+        assert instance.samples == [8]
+
+    def test_not_enough_data(self):
+        instance = Packet.parse_from(self.second)
+        with self.assertRaises(ValueError):
+            instance.parse_into("\x00\x01ab")
+        assert instance.parse_into(
+            "\x00\x01ab", raise_exception=False) is None
+
+    def test_invalid(self):
+        class Strict(Struct):
+            value = integer(endianness=Big, size=2, validate=lambda v: v < 9)
+
+        instance = Strict(value=1)
+        assert instance.parse_into("\x00\x0A", raise_exception=False) is None
+        assert instance.parse_into("\x00\x0A", allow_invalid=True) == 2
+        assert instance.value == 10
+
+    def test_exs(self):
+        filedir = os.path.realpath(os.path.dirname(__file__))
+        with open(os.path.join(filedir, '68 Bell Player.exs')) as f:
+            indata = f.read()
+        instance = EXSFile.parse_from(indata)
+        objects = EXSFile.objects.get_storage_targets(instance)
+        assert instance.parse_into(indata) == len(indata)
+        assert EXSFile.objects.get_storage_targets(instance) is objects
+        assert not list(Struct.diff(instance, EXSFile.parse_from(indata)))
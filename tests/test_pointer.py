@@ -0,0 +1,112 @@
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, pointer_to
+
+
+class Record(Struct):
+    name = string(4, null_terminated=False)
+    value = integer(endianness=Big, size=2)
+
+
+class Entry(Struct):
+    offset = integer(endianness=Big, size=2)
+    record = pointer_to(Record, 'offset', null=0)
+
+
+class Header(Struct):
+    magic = string(4, null_terminated=False)
+    count = integer(endianness=Big, size=2)
+
+
+class TableOfContents(Struct):
+    header = embed(Header)
+    entries = array_of(Entry)
+
+
+class Node(Struct):
+    skip = integer(endianness=Big, size=1)
+    next = pointer_to(Record, 'skip', relative=True)
+
+
+parsed_names = []
+
+
+class CountedRecord(Struct):
+    name = string(
+        4, null_terminated=False,
+        validate=lambda name: parsed_names.append(name) or True)
+
+
+class CountedEntry(Struct):
+    offset = integer(endianness=Big, size=2)
+    record = pointer_to(CountedRecord, 'offset', null=0)
+
+
+class TestPointer(TestCase):
+    # A header, three entries (the last of which is null), then two records.
+    data = (
+        "TOC!\x00\x03"
+        "\x00\x0C\x00\x12\x00\x00"
+        "abcd\x00\x01"
+        "efgh\x00\x02")
+
+    def test_dereference(self):
+        toc = TableOfContents.parse_from(self.data[:12])
+        toc.bind_source(self.data)
+        assert [e.offset for e in toc.entries] == [12, 18, 0]
+        assert toc.entries[0].record.name == "abcd"
+        assert toc.entries[1].record.value == 2
+        assert toc.entries[2].record is None
+
+    def test_lazy_and_cached(self):
+        del parsed_names[:]
+        entries = [
+            CountedEntry.parse_from(self.data[6:12][i:i + 2])
+            for i in (0, 2)
+        ]
+        for entry in entries:
+            entry.bind_source(self.data, 6)
+        assert parsed_names == []
+        assert entries[1].record is entries[1].record
+        assert parsed_names == ["efgh"]
+
+        entries[1].bind_source(self.data, 6)
+        assert entries[1].record.name == "efgh"
+        assert parsed_names == ["efgh", "efgh"]
+
+    def test_bound_when_parsed(self):
+        class File(Struct):
+            header = embed(Header)
+            first = embed(Entry)
+            second = embed(Entry)
+
+        parsed = File.parse_from(self.data)
+        assert parsed.first.record.name == "abcd"
+        assert parsed.second.record.name == "efgh"
+
+        # Offsets count from the start of the data, not of the struct.
+        moved = self.data[:6] + "\x00\x16\x00\x10" + self.data[10:]
+        parsed.parse_into("XXXX" + moved, 4)
+        assert parsed.first.record.name == "efgh"
+        assert parsed.second.record.name == "abcd"
+
+    def test_relative(self):
+        node = Node.parse_from("\x03??wxyz\x00\x09")
+        assert node.next.name == "wxyz"
+        assert node.next.value == 9
+
+        node.parse_into("\x02?ijkl\x00\x07")
+        assert node.next.name == "ijkl"
+
+    def test_out_of_range(self):
+        node = Node.parse_from("\x09")
+        with self.assertRaises(ValueError):
+            node.next
+
+    def test_not_parsed(self):
+        entry = Entry(offset=12)
+        assert entry.record is None
+        entry.record = Record(name="mine", value=3)
+        assert entry.record.name == "mine"
+        assert entry.serialize() == "\x00\x0C"
@@ -0,0 +1,105 @@
+import os
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, varint, \
+    bitfield, bit, bits
+
+from tests.test_exs24 import EXSFile, EXSZone
+
+
+class Inner(Struct):
+    a = integer(endianness=Big, size=2)
+    b = integer(endianness=Big, size=2, validate=lambda v: v != 0xBAD)
+
+
+class Record(Struct):
+    length = varint()
+    inner = embed(Inner)
+    flags = bitfield(bit(), bits(7))
+    ready, level = flags.expand()
+    name = string(4, null_terminated=False)
+    values = array_of(integer(endianness=Big, size=2))
+
+
+class TestProjection(TestCase):
+    data = "\x81\x01\x00\x01\x0B\xAD\x85abcd\x00\x02\x00\x03"
+
+    def test_projected_fields(self):
+        record = Record.parse_from(self.data, fields=["inner.a", "name"])
+        assert record.inner.a == 1
+        assert record.name == "abcd"
+        assert record.inner.b is None
+        assert record.length is None
+        assert record.values is None
+
+    def test_skipped_validators_do_not_run(self):
+        with self.assertRaises(ValueError):
+            Record.parse_from(self.data)
+        record = Record.parse_from(self.data, fields=["inner.a"])
+        assert record.inner.a == 1
+        with self.assertRaises(ValueError):
+            Record.parse_from(self.data, fields=["inner"])
+        assert Record.parse_from(
+            self.data, fields=["inner"], raise_exception=False) is None
+
+    def test_stops_after_last_field(self):
+        record = Record.parse_from(self.data[:8], fields=["ready", "level"])
+        assert record.ready is True
+        assert record.level == 5
+        assert record.flags == 0x85
+        with self.assertRaises(ValueError):
+            Record.parse_from(self.data[:6], fields=["name"])
+        assert Record.parse_from(
+            self.data[:6], fields=["name"], allow_invalid=True).name is None
+
+    def test_unparsed_bits(self):
+        record = Record.parse_from(self.data, fields=["name"])
+        assert record.flags is None
+        assert record.ready is None
+        assert record.level is None
+
+    def test_path_lists(self):
+        record = Record.parse_from(
+            self.data, fields=[["inner", "a"], ("name",)])
+        assert record.inner.a == 1
+        assert record.name == "abcd"
+        assert Record.compile_projection([["inner", "a"]]) is \
+            Record.compile_projection(["inner.a"])
+
+    def test_unicode_paths(self):
+        record = Record.parse_from(self.data, fields=[u"inner.a", [u"name"]])
+        assert record.inner.a == 1
+        assert record.name == "abcd"
+
+    def test_arrays_are_parsed_whole(self):
+        record = Record.parse_from(self.data, fields=["values"])
+        assert record.values == [2, 3]
+        with self.assertRaises(ValueError):
+            EXSFile.parse_from("", fields=["objects.object_header"])
+
+    def test_bad_paths(self):
+        for path in ("nothing", "name.first", "inner.c", "inner[0]"):
+            with self.assertRaises(ValueError):
+                Record.parse_from(self.data, fields=[path])
+
+    def test_no_fields(self):
+        with self.assertRaises(ValueError) as context:
+            Record.parse_from(self.data, fields=[])
+        assert "No fields" in str(context.exception)
+
+    def test_exs_zone(self):
+        filedir = os.path.realpath(os.path.dirname(__file__))
+        with open(os.path.join(filedir, '68 Bell Player.exs')) as f:
+            indata = f.read()
+        full = EXSFile.parse_from(indata)
+        offset = full.locate("objects[1]").start
+        zone = full.objects[1]
+        assert isinstance(zone, EXSZone)
+
+        projected = EXSZone.parse_from(
+            indata[offset:],
+            fields=["object_header.name", "object_header.size"])
+        assert projected.object_header.name == zone.object_header.name
+        assert projected.object_header.size == zone.object_header.size
+        assert projected.object_header.atom is None
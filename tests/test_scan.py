@@ -0,0 +1,79 @@
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, empty
+from packing_tape.validators import one_of_values, equals
+
+
+class ObjectHeader(Struct):
+    size = integer()
+    atom = string(
+        size=4,
+        null_terminated=False,
+        validate=one_of_values('TBOS', 'JBOS'))
+    name = string(size=8)
+
+
+class Zone(Struct):
+    object_header = embed(ObjectHeader)
+    version = integer(signed=False, endianness=Big, validate=equals(2))
+    unknown = empty(4)
+
+
+class Unsigned(Struct):
+    value = integer(validate=lambda v: v == 0x01020304)
+
+
+class TestScan(TestCase):
+    def setUp(self):
+        self.zones = [
+            Zone(object_header=ObjectHeader(
+                size=24, atom='TBOS', name='zone %d' % i), version=2)
+            for i in range(3)
+        ]
+        self.blob = (
+            'garbage TBOS' +
+            self.zones[0].serialize() +
+            'JBOS' * 7 +
+            self.zones[1].serialize() +
+            self.zones[2].serialize()[:-1])
+
+    def test_signature(self):
+        assert Zone.signature() == [
+            (4, frozenset(['TBOS', 'JBOS'])),
+            (16, frozenset(['\x00\x00\x00\x02'])),
+        ]
+        assert Unsigned.signature() == []
+
+    def test_scan(self):
+        results = list(Zone.scan(self.blob))
+        assert [offset for offset, _ in results] == [12, 64]
+        assert [z.object_header.name for _, z in results] == [
+            'zone 0', 'zone 1']
+
+    def test_scan_without_signature(self):
+        blob = '\x00\x04\x03\x02\x01\x04\x03\x02\x01\x00'
+        assert [(offset, instance.value)
+                for offset, instance in Unsigned.scan(blob)] == [
+            (1, 0x01020304), (5, 0x01020304)]
+
+
+class Terminated(Struct):
+    atom = string(size=4, validate=one_of_values('TBOS', 'JB'))
+    version = integer(signed=False, endianness=Big, validate=equals(2))
+
+
+class TestTerminatedLiterals(TestCase):
+    def test_signature_matches_parsed_data(self):
+        assert Terminated.signature() == [
+            (0, frozenset(['TBOS', 'JB\x00\x00'])),
+            (4, frozenset(['\x00\x00\x00\x02'])),
+        ]
+
+    def test_scan_full_width_value(self):
+        blob = 'junk' + 'TBOS\x00\x00\x00\x02' + 'JB\x00\x00\x00\x00\x00\x02'
+        found = [
+            (offset, instance.atom)
+            for offset, instance in Terminated.scan(blob)
+        ]
+        assert found == [(4, 'TBOS'), (12, 'JB')]
@@ -0,0 +1,47 @@
+import pickle
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, array_of, \
+    bitfield, bit, bits, empty
+
+
+class Point(Struct):
+    x = integer(endianness=Big, size=2)
+    y = integer(endianness=Big, size=2)
+
+
+class Shape(Struct):
+    name = string(4, null_terminated=False)
+    flags = bitfield(bit(), bits(3), empty(size=4))
+    visible, kind = flags.expand()
+    points = array_of(Point)
+
+
+class TestFingerprint(TestCase):
+    data = "tri!\xB0\x00\x01\x00\x02\x00\x03\x00\x04"
+
+    def test_fingerprint(self):
+        fingerprint = Shape.schema_fingerprint()
+        assert len(fingerprint) == 40
+        assert fingerprint != Point.schema_fingerprint()
+
+        class Renamed(Struct):
+            x = integer(endianness=Big, size=2)
+            y = integer(endianness=Big, size=2)
+        assert Renamed.schema_fingerprint() == Point.schema_fingerprint()
+
+        class Wider(Struct):
+            x = integer(endianness=Big, size=4)
+            y = integer(endianness=Big, size=2)
+        assert Wider.schema_fingerprint() != Point.schema_fingerprint()
+
+
+class TestPickle(TestCase):
+    def test_pickle_struct(self):
+        shape = Shape.parse_from(TestFingerprint.data)
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            copy = pickle.loads(pickle.dumps(shape, protocol))
+            assert copy.points[1].y == 4
+            assert copy.kind == 3
+            assert copy.serialize() == shape.serialize()
@@ -0,0 +1,101 @@
+import pickle
+from multiprocessing import Pool
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, bitfield, bit, \
+    bits, one_of, array_of
+from packing_tape.shared import RecordStore
+
+
+class Header(Struct):
+    kind = integer(endianness=Big, size=2)
+    name = string(4, null_terminated=False)
+
+
+class Record(Struct):
+    header = embed(Header)
+    flags = bitfield(bit(), bits(7))
+    ready, level = flags.expand()
+    value = one_of(
+        integer(endianness=Big, size=2, validate=lambda v: v < 100),
+        string(2, null_terminated=False))
+
+
+class Records(Struct):
+    records = array_of(Record)
+
+
+def record_data(i):
+    return Record(
+        header=Header(kind=i, name="r%03d" % i),
+        ready=i % 2 == 0,
+        level=i % 128,
+        value=i % 100).serialize()
+
+
+def parse_into_store(args):
+    # Runs in a worker process, with its own mapping of the store.
+    store, start, count = args
+    for i in xrange(start, start + count):
+        store.put(i, Record.parse_from(record_data(i)))
+    return count
+
+
+class TestRecordStore(TestCase):
+    def test_views(self):
+        with RecordStore(Record, 3) as store:
+            store.put(0, Record.parse_from(record_data(5)))
+            store.put_bytes(2, "\x00\x07nameXzz")
+            view = store[0]
+            assert view.header.kind == 5
+            assert view.header.name == "r005"
+            assert view.ready is False
+            assert view.level == 5
+            assert view.value == 5
+            assert store[-1].value == "zz"
+            assert store[-1].ready is False
+            assert store[-1].level == ord("X")
+            assert store.load(0).serialize() == record_data(5)
+            with self.assertRaises(AttributeError):
+                view.nope
+
+    def test_views_read_shared_memory(self):
+        with RecordStore(Record, 1) as store:
+            view = store[0]
+            store.put(0, Record.parse_from(record_data(1)))
+            assert view.header.kind == 1
+            store.put(0, Record.parse_from(record_data(2)))
+            assert view.header.kind == 2
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            RecordStore(Records, 1)
+        with RecordStore(Record, 2) as store:
+            with self.assertRaises(IndexError):
+                store[2]
+            with self.assertRaises(ValueError):
+                store.put_bytes(0, "short")
+
+    def test_pickled_as_path(self):
+        with RecordStore(Header, 2) as store:
+            copy = pickle.loads(pickle.dumps(store))
+            copy.put(1, Header(kind=3, name="copy"))
+            assert store[1].name == "copy"
+            copy.close()
+            assert store[1].kind == 3
+
+    def test_worker_processes(self):
+        with RecordStore(Record, 40) as store:
+            pool = Pool(4)
+            try:
+                counts = pool.map(
+                    parse_into_store,
+                    [(store, start, 10) for start in xrange(0, 40, 10)])
+            finally:
+                pool.close()
+                pool.join()
+            assert sum(counts) == 40
+            assert [view.header.name for view in store] == \
+                ["r%03d" % i for i in xrange(40)]
+            assert store[39].value == 39
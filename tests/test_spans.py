@@ -0,0 +1,58 @@
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, one_of, \
+    bitfield, bit, empty
+from packing_tape.field_classes import StringField
+
+
+class Header(Struct):
+    size = integer(signed=False, endianness=Big)
+    name = string(size=8)
+
+
+class Small(Struct):
+    header = embed(Header)
+
+
+class Large(Struct):
+    header = embed(Header)
+    payload = string(size=16)
+
+
+class Container(Struct):
+    flags = bitfield(empty(size=7), bit())
+    ready, = flags.expand()
+    objects = array_of(one_of(
+        embed(Small, validate=lambda s: s.header.size == 12),
+        embed(Large, validate=lambda s: s.header.size == 28)))
+
+
+class TestFieldSpans(TestCase):
+    def setUp(self):
+        self.instance = Container(
+            ready=True,
+            objects=[
+                Small(header=Header(size=12, name='a')),
+                Large(header=Header(size=28, name='b'), payload='x'),
+                Small(header=Header(size=12, name='c')),
+            ])
+        self.data = self.instance.serialize()
+
+    def test_field_spans(self):
+        spans = dict((s.path, s) for s in self.instance.field_spans())
+        assert spans['objects[2].header.name'] == (
+            'objects[2].header.name', 45, 53, StringField)
+        assert spans['ready'][1:3] == (0, 1)
+        for path, start, end, _ in spans.values():
+            assert (start, end) == self.instance.locate(path)[1:3]
+
+    def test_locate(self):
+        span = self.instance.locate('objects[1].payload')
+        assert span.value == 'x'
+        assert self.data[span.start:span.end] == 'x' + '\x00' * 15
+        assert self.instance.locate(('objects', 2)).value.header.name == 'c'
+
+    def test_locate_missing(self):
+        for path in ('objects[3]', 'objects[0].payload', 'nothing'):
+            self.assertRaises(ValueError, self.instance.locate, path)
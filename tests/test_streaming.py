@@ -0,0 +1,126 @@
+import os
+import socket
+import threading
+from StringIO import StringIO
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.streaming import Parser
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, array_of, one_of
+
+from tests.test_exs24 import EXSFile, EXSHeader
+
+
+class Record(Struct):
+    id = integer(signed=False, endianness=Big)
+    name = one_of(
+        string(size=4, validate=lambda s: s.startswith('a')),
+        string(size=8, validate=lambda s: s.startswith('b')))
+
+
+class Records(Struct):
+    count = integer(signed=False, endianness=Big)
+    records = array_of(Record)
+
+
+class TrickleReader(object):
+    """
+    A file-like object that returns at most a few bytes per read,
+    like a slow socket would.
+    """
+    def __init__(self, data, chunk_size=3):
+        self.stream = StringIO(data)
+        self.chunk_size = chunk_size
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.chunk_size
+        return self.stream.read(min(size, self.chunk_size))
+
+
+def exs_data():
+    filedir = os.path.realpath(os.path.dirname(__file__))
+    return open(os.path.join(filedir, '68 Bell Player.exs')).read()
+
+
+class TestStreaming(TestCase):
+    def setUp(self):
+        self.records = Records(count=3, records=[
+            Record(id=1, name='ace'),
+            Record(id=2, name='banana'),
+            Record(id=3, name='ant'),
+        ])
+        self.data = self.records.serialize()
+
+    def test_parse_stream(self):
+        parsed = Records.parse_stream(TrickleReader(self.data))
+        assert [r.name for r in parsed.records] == ['ace', 'banana', 'ant']
+        assert parsed.serialize() == self.data
+
+        # Only as much as is needed should be read from the stream.
+        stream = StringIO(self.records.records[0].serialize() + 'trailing')
+        assert Record.parse_stream(stream).name == 'ace'
+        assert stream.read() == 'trailing'
+
+    def test_iter_stream(self):
+        assert [r.id for r in Records.iter_stream(
+            TrickleReader(self.data, 5))] == [1, 2, 3]
+
+    def test_exs_over_socket(self):
+        data = exs_data()
+        reader, writer = socket.socketpair()
+
+        def write():
+            for i in xrange(0, len(data), 1000):
+                writer.sendall(data[i:i + 1000])
+            writer.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            objects = list(EXSFile.iter_stream(reader))
+        finally:
+            thread.join()
+            reader.close()
+        assert len(objects) == 618
+        assert isinstance(objects[0], EXSHeader)
+        assert [o.serialize() for o in objects] == [
+            o.serialize() for o in EXSFile.parse_from(data).objects]
+
+
+class TestParser(TestCase):
+    def test_feed(self):
+        records = [
+            Record(id=1, name='ace'),
+            Record(id=2, name='banana'),
+            Record(id=3, name='ant'),
+        ]
+        data = ''.join([r.serialize() for r in records])
+
+        parser = Parser(Record)
+        assert parser.needed == 4
+        assert parser.feed(data[:6]) == []
+        assert parser.needed == 2
+        completed = parser.feed(data[6:9])
+        assert [r.id for r in completed] == [1]
+        assert parser.buffered == 1
+
+        completed = []
+        for i in xrange(9, len(data)):
+            completed.extend(parser.feed(data[i]))
+        assert [r.name for r in completed] == ['banana', 'ant']
+        assert parser.close() == []
+
+    def test_close_with_partial_data(self):
+        parser = Parser(Record)
+        parser.feed('\x00\x00\x00\x01ac')
+        self.assertRaises(ValueError, parser.close)
+
+    def test_variable_size(self):
+        data = exs_data()
+        parser = Parser(EXSFile)
+        for i in xrange(0, len(data), 4096):
+            assert parser.feed(data[i:i + 4096]) == []
+        exs_file, = parser.close()
+        assert len(exs_file.objects) == 618
+        assert list(Struct.diff(exs_file, EXSFile.parse_from(data))) == []
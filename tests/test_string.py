@@ -1,7 +1,8 @@
 from unittest import TestCase
 from packing_tape import Struct
 from packing_tape.constants import Big
-from packing_tape.fields import integer, string
+from packing_tape.fields import integer, string, varint
+from packing_tape.streaming import Parser
 
 
 class StringStruct(Struct):
@@ -24,3 +25,81 @@ class TestStringStruct(TestCase):
         assert instance.int_a == 0xFFFFFFFF
         assert instance.int_b == 0x01020304
         assert instance.str_a == 'flop'
+
+
+class Named(Struct):
+    name = string(size=8, intern=True)
+    title = string(size=8, encoding='utf-8')
+
+
+class Blob(Struct):
+    size = integer(signed=False, endianness=Big, size=2)
+    data = string(size=6, null_terminated=False, view=True)
+
+
+class TestStringOptions(TestCase):
+    def test_interned(self):
+        data = "sample1\x00" + "caf\xc3\xa9\x00\x00\x00"
+        a = Named.parse_from(data)
+        b = Named.parse_from(data)
+        assert a.name == "sample1"
+        assert a.name is b.name
+
+    def test_encoding(self):
+        instance = Named.parse_from("x\x00\x00\x00\x00\x00\x00\x00"
+                                    "caf\xc3\xa9\x00\x00\x00")
+        assert instance.title == u"caf\xe9"
+        instance.title = u"na\xefve"
+        assert instance.serialize()[8:] == "na\xc3\xafve\x00\x00"
+        with self.assertRaises(ValueError):
+            string(size=4, encoding='utf-8', intern=True)
+
+    def test_multibyte_encoding(self):
+        class Wide(Struct):
+            name = string(size=8, encoding='utf-16-le')
+
+        data = Wide(name=u"AB").serialize()
+        assert data == "A\x00B\x00\x00\x00\x00\x00"
+        assert Wide.parse_from(data).name == u"AB"
+
+    def test_errors_in_schema(self):
+        class Strict(Struct):
+            name = string(size=8, encoding='ascii')
+
+        class Lenient(Struct):
+            name = string(size=8, encoding='ascii', errors='replace')
+
+        assert Strict.schema_fingerprint() != Lenient.schema_fingerprint()
+        assert Lenient.parse_from("ab\xff\x00\x00\x00\x00\x00").name == \
+            u"ab\ufffd"
+
+    def test_view(self):
+        data = memoryview(bytearray("\x00\x06blob\x00\x01"))
+        instance = Blob.parse_from(data)
+        assert isinstance(instance.data, memoryview)
+        assert instance.data.tobytes() == "blob\x00\x01"
+        data[2] = "B"
+        assert instance.data.tobytes() == "Blob\x00\x01"
+        assert instance.serialize() == "\x00\x06Blob\x00\x01"
+        assert Blob.load_values(instance.dump_values()).serialize() == \
+            instance.serialize()
+        copy = Blob.parse_from("\x00\x06blob\x00\x01")
+        assert copy.data.tobytes() == "blob\x00\x01"
+        with self.assertRaises(ValueError):
+            string(size=4, view=True)
+
+    def test_view_streamed(self):
+        class Tagged(Struct):
+            tag = varint()
+            data = string(size=4, null_terminated=False, view=True)
+
+        parser = Parser(Blob)
+        first, second = parser.feed("\x00\x06blob\x00\x01\x00\x06more!!")
+        assert first.data.tobytes() == "blob\x00\x01"
+        assert second.data.tobytes() == "more!!"
+        assert parser.feed("\x00\x06") == []
+
+        parser = Parser(Tagged)
+        first, second = parser.feed("\x01abcd\x02efgh")
+        assert (first.tag, first.data.tobytes()) == (1, "abcd")
+        assert (second.tag, second.data.tobytes()) == (2, "efgh")
@@ -2,6 +2,7 @@ from unittest import TestCase
 from packing_tape import Struct
 from packing_tape.constants import Big, Little
 from packing_tape.fields import integer, one_of, string, embed
+from packing_tape.validators import equals
 
 
 class SwitchStruct(Struct):
@@ -101,3 +102,93 @@ class TestVariableSizeSwitchStruct(TestCase):
         assert valid.is_valid
         assert valid.value == "fairly long string"
         assert valid.serialize() == "fairly long string\x00\x00"
+
+
+class CountingValidator(object):
+    def __init__(self, validator):
+        self.validator = validator
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        return self.validator(value)
+
+
+small = CountingValidator(lambda x: x < 50)
+large = CountingValidator(lambda x: x > 100)
+
+
+class CountingSwitchStruct(Struct):
+    int_a = one_of(
+        integer(signed=False, endianness=Big, validate=small),
+        integer(signed=False, endianness=Little, validate=large))
+
+
+class TestSwitchValidation(TestCase):
+    def setUp(self):
+        small.calls = large.calls = 0
+
+    def test_set_validates_once(self):
+        instance = CountingSwitchStruct(int_a=110)
+        assert (small.calls, large.calls) == (1, 1)
+        assert instance.is_valid
+        assert instance.validate()
+        assert (small.calls, large.calls) == (1, 1)
+
+    def test_set_invalidates(self):
+        instance = CountingSwitchStruct(int_a=110)
+        instance.int_a = 10
+        assert instance.int_a == 10
+        assert CountingSwitchStruct.int_a.get_real_type(instance) is \
+            CountingSwitchStruct.int_a.subfields[0]
+        instance.int_a = 75
+        assert instance.int_a is None
+        assert not instance.is_valid
+
+    def test_parse_validates_once(self):
+        instance = CountingSwitchStruct.parse_from("\x00\x00\x00\x01")
+        assert instance.int_a == 1
+        assert instance.is_valid
+        assert (small.calls, large.calls) == (1, 0)
+
+        instance = CountingSwitchStruct.parse_from("\xFF\x00\x00\x00")
+        assert instance.int_a == 0xFF
+        assert (small.calls, large.calls) == (2, 1)
+
+    def test_parse_into_validates_once(self):
+        instance = CountingSwitchStruct.parse_from("\x00\x00\x00\x01")
+        instance.parse_into("\xFF\x00\x00\x00")
+        assert instance.int_a == 0xFF
+        assert instance.is_valid
+        assert (small.calls, large.calls) == (2, 1)
+
+    def test_embedded_structs_are_revalidated(self):
+        instance = ComplexSwitchStruct(
+            value=EmbeddedSwitchStruct1(string='good'))
+        assert instance.is_valid
+        instance.value.string = 'bad'
+        assert not instance.is_valid
+
+
+class TerminatedA(Struct):
+    atom = string(size=4, validate=equals('AAAA'))
+    value = integer(signed=False, endianness=Big)
+
+
+class TerminatedB(Struct):
+    atom = string(size=4, validate=equals('BBBB'))
+    value = integer(signed=False, endianness=Little)
+
+
+class TerminatedSwitchStruct(Struct):
+    body = one_of(embed(TerminatedA), embed(TerminatedB))
+
+
+class TestTerminatedLiteralSwitch(TestCase):
+    def test_parse_full_width_values(self):
+        a = TerminatedSwitchStruct.parse_from('AAAA\x00\x00\x00\x01')
+        assert isinstance(a.body, TerminatedA)
+        assert a.body.value == 1
+        b = TerminatedSwitchStruct.parse_from('BBBB\x01\x00\x00\x00')
+        assert isinstance(b.body, TerminatedB)
+        assert b.body.value == 1
@@ -0,0 +1,98 @@
+import os
+from multiprocessing.pool import ThreadPool
+from unittest import TestCase
+from packing_tape import Struct
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, array_of, one_of
+
+from tests.test_exs24 import EXSFile
+
+THREADS = 8
+
+
+class Base(Struct):
+    kind = integer(endianness=Big, size=2)
+
+
+class Derived(Base):
+    name = string(4, null_terminated=False)
+
+
+class TestFinalization(TestCase):
+    def test_metadata_is_computed_at_class_creation(self):
+        class Point(Struct):
+            x = integer(endianness=Big, size=2)
+            y = integer(endianness=Big, size=2)
+
+        cached = vars(Point)['__cached']
+        for key in ('compute_binary_properties', 'compute_parse_plan',
+                    'compute_static_size', 'heavy_propagate_names'):
+            assert key in cached, key
+        assert Point.x.field_name == 'x'
+        assert isinstance(Point.binary_properties(), tuple)
+
+    def test_subclasses_have_their_own_metadata(self):
+        assert [name for name, _ in Base.binary_properties()] == ['kind']
+        assert [name for name, _ in Derived.binary_properties()] == \
+            ['kind', 'name']
+        assert Base.static_size() == 2
+        assert Derived.static_size() == 6
+        assert Derived.parse_from("\x00\x01abcd").name == "abcd"
+
+
+class TestThreads(TestCase):
+    def setUp(self):
+        filedir = os.path.realpath(os.path.dirname(__file__))
+        with open(os.path.join(filedir, '68 Bell Player.exs')) as f:
+            self.data = f.read()
+
+    def run_in_threads(self, function, count=THREADS * 2):
+        pool = ThreadPool(THREADS)
+        try:
+            return pool.map(function, range(count))
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_parse_and_serialize(self):
+        expected = EXSFile.parse_from(self.data)
+
+        def parse(_):
+            instance = EXSFile.parse_from(self.data)
+            return instance, instance.serialize()
+
+        for instance, serialized in self.run_in_threads(parse):
+            assert not list(Struct.diff(expected, instance))
+            assert serialized == expected.serialize()
+
+    def test_first_use_from_many_threads(self):
+        # Classes created here have never computed their lazy metadata
+        # (signatures, projections and so on), so the threads race to.
+        class Header(Struct):
+            magic = string(4, null_terminated=False,
+                           validate=lambda v: v == 'HEAD')
+            count = integer(endianness=Big, size=2)
+
+        class Item(Struct):
+            value = one_of(
+                integer(endianness=Big, size=2, validate=lambda v: v < 100),
+                string(2, null_terminated=False))
+
+        class Message(Struct):
+            header = embed(Header)
+            items = array_of(Item)
+
+        data = "HEAD\x00\x03" + "\x00\x01\x00\x02zz"
+
+        def parse(i):
+            if i % 3 == 0:
+                return Message.parse_from(data, fields=['header.count'])
+            if i % 3 == 1:
+                return [instance for _, instance in Message.scan(data)][0]
+            return Message.parse_from(data)
+
+        results = self.run_in_threads(parse)
+        for i, message in enumerate(results):
+            assert message.header.count == 3
+            if i % 3:
+                assert [item.value for item in message.items] == [1, 2, 'zz']
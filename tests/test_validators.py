@@ -0,0 +1,170 @@
+from array import array
+from unittest import TestCase
+from packing_tape import Struct, validators
+from packing_tape.constants import Big
+from packing_tape.fields import integer, string, embed, one_of, array_of, \
+    unsigned_char, floating_point, bitfield, bit, bits
+from packing_tape.validators import one_of_values, equals, in_range, \
+    all_of, any_of, not_, compile_validator, check_all, OneOfValues
+
+
+class TestValidators(TestCase):
+    def test_in_range(self):
+        validator = in_range(3, 5)
+        assert [validator(v) for v in (2, 3, 5, 6)] == \
+            [False, True, True, False]
+        assert validator(4.5)
+        assert validator.literal_values is None
+        assert validator.values(integral=True) == frozenset([3, 4, 5])
+        assert not validator("a string")
+        assert in_range(low=0)(10 ** 9)
+        assert in_range(0, 10 ** 9).values(integral=True) is None
+
+    def test_combinators(self):
+        validator = all_of(in_range(0, 10), not_(equals(5)))
+        assert validator(4) and not validator(5) and not validator(11)
+        assert validator.literal_values is None
+        assert validator.values(integral=True) == \
+            frozenset(range(0, 5) + range(6, 11))
+
+        validator = equals(1) | in_range(4, 6)
+        assert validator(4.5)
+        assert validator.literal_values is None
+        assert validator.values(integral=True) == frozenset([1, 4, 5, 6])
+
+        validator = any_of(equals('a'), lambda v: v.startswith('b'))
+        assert validator('a') and validator('bc') and not validator('c')
+        assert validator.literal_values is None
+
+        assert (~equals(1))(2)
+        assert (in_range(0, 9) & equals(3)).literal_values == frozenset([3])
+
+    def test_compile(self):
+        validator = all_of(in_range(0, 3), in_range(2, 5))
+        assert compile_validator(validator) is validator
+        validator = compile_validator(validator, integral=True)
+        assert isinstance(validator, OneOfValues)
+        assert validator.literal_values == frozenset([2, 3])
+        function = lambda v: v > 0
+        assert compile_validator(function) is function
+
+    def test_check_all(self):
+        values = array('H', [1, 2, 3])
+        assert check_all(in_range(1, 3), values)
+        assert not check_all(in_range(2, 3), values)
+        assert check_all(one_of_values(1, 2, 3, 4), values)
+        assert not check_all(one_of_values(1, 2), values)
+        assert check_all(lambda v: v < 4, values)
+        assert check_all(in_range(10, 20), array('H'))
+
+    def test_check_all_with_numpy(self):
+        class FakeArray(object):
+            # Only has what NumPy arrays have, so builtin min() would fail.
+            def __init__(self, items):
+                self.items = items
+
+            def min(self):
+                calls.append('min')
+                return min(self.items)
+
+            def max(self):
+                calls.append('max')
+                return max(self.items)
+
+        class FakeNumpy(object):
+            @staticmethod
+            def frombuffer(values, dtype):
+                assert dtype == values.typecode
+                return FakeArray(values.tolist())
+
+        calls = []
+        original = validators.numpy
+        validators.numpy = FakeNumpy()
+        try:
+            values = array('H', [1, 2, 3])
+            assert check_all(in_range(1, 3), values)
+            assert not check_all(in_range(2, 3), values)
+            assert not check_all(in_range(1, 2), values)
+        finally:
+            validators.numpy = original
+        assert calls == ['min', 'max', 'min', 'max', 'min', 'max']
+
+
+class Tagged(Struct):
+    tag = string(4, null_terminated=False, validate=equals('TAGG'))
+    value = integer(endianness=Big)
+
+
+class Other(Struct):
+    tag = string(4, null_terminated=False, validate=equals('OTHR'))
+    count = integer(endianness=Big, size=2)
+
+
+class Message(Struct):
+    kind = unsigned_char(validate=in_range(1, 3))
+    body = one_of(
+        embed(Tagged),
+        embed(Other),
+        string(6, null_terminated=False, validate=lambda v: v.isalpha()))
+
+
+class Samples(Struct):
+    values = array_of(
+        integer(endianness=Big, size=2, validate=in_range(0, 999)))
+
+
+class Reading(Struct):
+    level = floating_point(endianness=Big, validate=in_range(0, 10))
+
+
+class TestFields(TestCase):
+    def test_float_range(self):
+        assert not Reading.level.literal_values
+        assert Reading.signature() == []
+        assert Reading(level=2.5).level == 2.5
+        assert Reading.parse_from("\x40\x20\x00\x00").level == 2.5
+        assert [instance.level for _, instance in
+                Reading.scan("\x40\x20\x00\x00")] == [2.5]
+        with self.assertRaises(ValueError):
+            Reading(level=10.5)
+
+    def test_discriminator(self):
+        offset, size, table, others = Message.body.discriminator
+        assert (offset, size) == (0, 4)
+        assert [s.struct_type for s in table['TAGG'][:1]] == [Tagged]
+        assert len(table['TAGG']) == 2
+        assert len(others) == 1
+
+        assert Message.parse_from("\x01TAGG\x00\x00\x00\x07").body.value == 7
+        assert Message.parse_from("\x02OTHR\x00\x03").body.count == 3
+        assert Message.parse_from("\x03abcdef").body == "abcdef"
+        with self.assertRaises(ValueError):
+            Message.parse_from("\x01TAGG\x00!")
+
+    def test_switch_signature(self):
+        assert Message.signature() == [
+            (0, frozenset(['\x01', '\x02', '\x03'])),
+        ]
+
+        class Either(Struct):
+            body = one_of(embed(Tagged), embed(Other))
+        assert Either.signature() == [(0, frozenset(['TAGG', 'OTHR']))]
+
+    def test_bit_options(self):
+        class Flags(Struct):
+            flags = bitfield(
+                bit(default=True), bit(validate=equals(False)), bits(6))
+            on, off, rest = flags.expand()
+
+        flags = Flags()
+        assert flags.on is True
+        assert flags.is_valid
+        flags.off = True
+        assert not flags.is_valid
+
+    def test_bulk_arrays(self):
+        samples = Samples.parse_from("\x00\x01\x03\xE7\x03\xE8\x00\x02")
+        assert samples.values == [1, 999]
+        assert samples.is_valid
+        samples.values.append(1000)
+        assert not samples.is_valid